@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+A tool for measuring the throughput of the plugins device identification.
+
+Every built plugin found in the plugins directory is loaded the same way provd
+loads it, but against a stub wazo_provd package. Each request of the corpus is
+then replayed through the DHCP, HTTP or TFTP device info extractor of every
+plugin, and the device info merged from their answers through the pg associator
+of every plugin, like provd does for each request it receives.
+
+The corpus is a file with one JSON object per line, one of:
+
+  {"dhcp": "<vendor class identifier (option 60)>"}
+  {"http": "<User-Agent>", "path": "<request path>"}
+  {"tftp": "<filename>"}
+
+The extractors cache what they extract, so the replay is measured twice: with
+warm caches, like a server seeing the same devices over and over, and with
+cold caches, cleared before each round, like a server seeing new devices.
+
+Run it on two revisions of the tree to compare them. Only twisted needs to be
+importable.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import time
+import tracemalloc
+import uuid
+from argparse import ArgumentParser
+from collections.abc import Callable, Sequence
+from enum import Enum, IntEnum
+from types import ModuleType, SimpleNamespace
+from typing import Any, NamedTuple
+
+# Requests seen on real devices, a few of them from other vendors
+DEFAULT_CORPUS: list[dict[str, str]] = [
+    {'dhcp': 'Cisco Systems, Inc. IP Phone CP-7941G\x00'},
+    {'dhcp': 'Cisco Systems, Inc. IP Phone CP-8961\x00'},
+    {'dhcp': 'Cisco SPA504G'},
+    {'dhcp': 'digium_D40_1_4_1_0_57389'},
+    {'dhcp': 'Gigaset N510 IP PRO'},
+    {'dhcp': 'dslforum.org'},
+    {'dhcp': 'yealink'},
+    {'http': 'Aastra6731i MAC:00-08-5D-23-74-29 V:3.2.0.70-SIP', 'path': '/aastra.cfg'},
+    {'http': 'Fanvil X4 2.10.2.6887 0c383e07e16c', 'path': '/0c383e07e16c.cfg'},
+    {'http': 'Fanvil X6U Pro 0.0.10 0c383e2cd782', 'path': '/f0X6U00000000.cfg'},
+    {
+        'http': 'FileTransport PolycomVVX-VVX_400-UA/4.1.4.7430 Type/Application',
+        'path': '/0004f2e5a2b6-phone.cfg',
+    },
+    {'http': 'Mozilla/4.0 (compatible; snom320-SIP 8.4.18 1.1.3-s)', 'path': '/'},
+    {
+        'http': (
+            'Mozilla/4.0 (compatible; snom710-SIP 8.7.5.35 1.1.5-IFX-05.01.12 '
+            '000413741767)'
+        ),
+        'path': '/snom710-000413741767.htm',
+    },
+    {
+        'http': 'Mozilla/4.0 (compatible; Snom M900 05.20.0001 000413b60680)',
+        'path': '/000413b60680.xml',
+    },
+    {'http': 'Yealink SIP-T20P 9.72.0.30 00:15:65:5e:16:7c', 'path': '/y0.cfg'},
+    {
+        'http': 'Yealink SIP-T31G 124.85.257.55 80:5e:c0:d5:7d:72',
+        'path': '/805ec0d57d72.cfg',
+    },
+    {'http': 'Yealink W60B 77.81.0.35 80:5e:c0:09:ab:dc', 'path': '/y0.cfg'},
+    {'http': 'VP530P 23.70.0.40 00:15:65:31:4b:c0', 'path': '/y0.cfg'},
+    {
+        'http': 'Grandstream Model HW GXP2130 SW 1.0.7.25 DevId 000b828a1b2c',
+        'path': '/cfg000b828a1b2c.xml',
+    },
+    {
+        'http': 'Cisco/SPA504G-7.4.9c (001122334455)(CCQ1234567)',
+        'path': '/spa504G.cfg',
+    },
+    {'http': 'Thomson ST2030 hw2 fw1.66 00-14-7F-E3-4A-73', 'path': '/ST2030S'},
+    {'http': 'HTEK UC903 2.0.4.4.18 001fc1123456', 'path': '/cfg001fc1123456.xml'},
+    {'http': 'Wget/1.20.3 (linux-gnu)', 'path': '/index.html'},
+    {'tftp': 'SEP001122334455.cnf.xml'},
+    {'tftp': 'CTLSEP001122334455.tlv'},
+    {'tftp': 'ITLFile.tlv'},
+    {'tftp': 'Communicator/SEPDEFAULT.cnf.xml'},
+    {'tftp': '/Cisco/CP-7832/001122334455.xml'},
+    {'tftp': 'spa504G.cfg'},
+    {'tftp': 'ipst_config.cfg'},
+    {'tftp': '46xxsettings.txt'},
+    {'tftp': 'pxelinux.0'},
+]
+
+_EXTRACTOR_ATTRIBUTES = {
+    'dhcp': 'dhcp_dev_info_extractor',
+    'http': 'http_dev_info_extractor',
+    'tftp': 'tftp_dev_info_extractor',
+}
+
+# Classes of the extractor caches, from plugins/shared/extraction.py. Each
+# plugin executes its own copy of it, so they are recognized by their name.
+_CACHE_CLASS_NAMES = {'ExtractionCache', 'VDICache'}
+
+
+def _norm_mac(mac: str) -> str:
+    digits = mac.replace(':', '').replace('-', '').lower()
+    if len(digits) != 12 or digits.strip('0123456789abcdef'):
+        raise ValueError(f'invalid MAC string: {mac}')
+    return ':'.join(digits[i : i + 2] for i in range(0, 12, 2))
+
+
+def _format_mac(mac: str, separator: str = ':', uppercase: bool = False) -> str:
+    mac = _norm_mac(mac).replace(':', separator)
+    return mac.upper() if uppercase else mac
+
+
+def _install_stub_provd() -> None:
+    # Just enough of wazo_provd for the plugins to be loaded and identify devices
+    class _Anything:
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+    _UTC = SimpleNamespace(as_minutes=0, as_hours=0, as_seconds=0, as_hms=[0, 0, 0])
+
+    class DeviceSupport(IntEnum):
+        NONE = 0
+        IMPROBABLE = 100
+        UNKNOWN = 200
+        PROBABLE = 300
+        INCOMPLETE = 400
+        COMPLETE = 500
+        EXACT = 600
+
+    class BasePgAssociator:
+        def associate(self, dev_info: dict[str, str]) -> int:
+            vendor = dev_info.get('vendor')
+            if vendor is None:
+                return DeviceSupport.NONE
+            model = dev_info.get('model')
+            version = dev_info.get('version')
+            return self._do_associate(vendor, model, version)
+
+        def _do_associate(
+            self, vendor: str, model: str | None, version: str | None
+        ) -> int:
+            raise NotImplementedError()
+
+    modules: dict[str, dict[str, Any]] = {
+        'wazo_provd': {},
+        'wazo_provd.devices': {},
+        'wazo_provd.devices.config': {
+            'RawConfigError': type('RawConfigError', (Exception,), {}),
+        },
+        'wazo_provd.devices.ident': {
+            'DHCPRequest': dict,
+            'RequestType': Enum('RequestType', 'HTTP TFTP DHCP'),
+        },
+        'wazo_provd.devices.pgasso': {
+            'BasePgAssociator': BasePgAssociator,
+            'DeviceSupport': DeviceSupport,
+        },
+        'wazo_provd.plugins': {
+            'FetchfwPluginHelper': _Anything,
+            'Plugin': _Anything,
+            'StandardPlugin': _Anything,
+            'TemplatePluginHelper': _Anything,
+        },
+        'wazo_provd.servers': {},
+        'wazo_provd.servers.http': {'HTTPNoListingFileService': _Anything},
+        'wazo_provd.servers.http_site': {'Request': _Anything},
+        'wazo_provd.servers.tftp': {},
+        'wazo_provd.servers.tftp.packet': {'Packet': dict},
+        'wazo_provd.servers.tftp.service': {
+            'TFTPFileService': _Anything,
+            'TFTPNullService': _Anything,
+            'TFTPRequest': dict,
+        },
+        'wazo_provd.services': {
+            'JsonConfigPersister': _Anything,
+            'PersistentConfigureServiceDecorator': _Anything,
+        },
+        'wazo_provd.synchronize': {},
+        'wazo_provd.tzinform': {
+            'TextTimezoneInfoDB': _Anything,
+            'Time': _Anything,
+            'TimezoneNotFoundError': type('TimezoneNotFoundError', (Exception,), {}),
+            # some plugins build their timezone tables when they are loaded
+            'get_timezone_info': lambda tz_name: {'utcoffset': _UTC, 'dst': None},
+        },
+        'wazo_provd.util': {
+            'format_mac': _format_mac,
+            'is_normed_uuid': lambda uuid_: str(uuid.UUID(uuid_)) == uuid_,
+            'norm_mac': _norm_mac,
+            'norm_uuid': lambda uuid_: str(uuid.UUID(uuid_)),
+        },
+    }
+    for name, attributes in modules.items():
+        module = ModuleType(name)
+        module.__dict__.update(attributes)
+        # some plugins still import the provd package of wazo < 24.02
+        for module_name in (name, name.replace('wazo_provd', 'provd', 1)):
+            sys.modules[module_name] = module
+            parent_name, _, child_name = module_name.rpartition('.')
+            if parent_name:
+                setattr(sys.modules[parent_name], child_name, module)
+
+
+class _Request:
+    # Just enough of wazo_provd.servers.http_site.Request for the extractors
+    def __init__(self, ua: bytes, path: bytes) -> None:
+        self._ua = ua
+        self.path = path
+        self.args: dict[bytes, list[bytes]] = {}
+
+    def getHeader(self, name: bytes) -> bytes | None:
+        return self._ua if name == b'User-Agent' else None
+
+
+class LoadedPlugin(NamedTuple):
+    id: str
+    extractors: dict[str, Any]
+    pg_associator: Any
+
+
+def _load_plugin(plugin_dir: str) -> LoadedPlugin | None:
+    def execfile_(filename: str, globals_: dict[str, Any]) -> None:
+        path = os.path.join(plugin_dir, filename)
+        with open(path) as fobj:
+            exec(compile(fobj.read(), path, 'exec'), globals_)
+
+    pg_globals: dict[str, Any] = {'execfile_': execfile_}
+    execfile_('entry.py', pg_globals)
+    for obj in pg_globals.values():
+        if isinstance(obj, type) and obj.__dict__.get('IS_PLUGIN'):
+            extractors = {}
+            for kind, attribute in _EXTRACTOR_ATTRIBUTES.items():
+                extractor = getattr(obj, attribute, None)
+                if extractor is not None:
+                    extractors[kind] = extractor
+            pg_associator = getattr(obj, 'pg_associator', None)
+            if extractors or pg_associator is not None:
+                plugin_id = os.path.basename(plugin_dir)
+                return LoadedPlugin(plugin_id, extractors, pg_associator)
+    return None
+
+
+def load_plugins(plugins_dir: str, pattern: str | None = None) -> list[LoadedPlugin]:
+    _install_stub_provd()
+    plugins = []
+    for plugin_id in sorted(os.listdir(plugins_dir)):
+        if pattern and not re.search(pattern, plugin_id):
+            continue
+        plugin_dir = os.path.join(plugins_dir, plugin_id)
+        if not os.path.isfile(os.path.join(plugin_dir, 'entry.py')):
+            continue
+        plugin = _load_plugin(plugin_dir)
+        if plugin is not None:
+            plugins.append(plugin)
+    return plugins
+
+
+def _new_request(record: dict[str, str]) -> tuple[str, Any]:
+    if 'dhcp' in record:
+        return 'dhcp', {'options': {60: record['dhcp']}}
+    if 'http' in record:
+        path = record.get('path', '/')
+        return 'http', _Request(record['http'].encode(), path.encode())
+    if 'tftp' in record:
+        return 'tftp', {'packet': {'filename': record['tftp'].encode()}}
+    raise ValueError(f'invalid corpus record: {record}')
+
+
+def _read_corpus(corpus_file: str | None) -> list[tuple[str, Any]]:
+    if corpus_file is None:
+        return [_new_request(record) for record in DEFAULT_CORPUS]
+    with open(corpus_file) as fobj:
+        return [_new_request(json.loads(line)) for line in fobj if line.strip()]
+
+
+def _clear_caches(plugins: Sequence[LoadedPlugin]) -> None:
+    for plugin in plugins:
+        for extractor in plugin.extractors.values():
+            for value in vars(extractor).values():
+                if type(value).__name__ in _CACHE_CLASS_NAMES:
+                    value.clear()
+
+
+def _replay(
+    plugins: Sequence[LoadedPlugin],
+    requests: Sequence[tuple[str, Any]],
+    measure: Callable[[int, Callable[..., Any], Any], Any],
+) -> None:
+    # measure(plugin index, function, argument) must return function(argument)
+    for kind, request in requests:
+        dev_info: dict[str, str] = {}
+        for index, plugin in enumerate(plugins):
+            extractor = plugin.extractors.get(kind)
+            if extractor is not None:
+                result = measure(index, extractor._do_extract, request)
+                if result:
+                    for key, value in result.items():
+                        dev_info.setdefault(key, value)
+        if dev_info:
+            for index, plugin in enumerate(plugins):
+                if plugin.pg_associator is not None:
+                    measure(index, plugin.pg_associator.associate, dev_info)
+
+
+class Stats(NamedTuple):
+    ops: int
+    ops_per_sec: float
+    p99_usec: float
+    bytes_per_op: float
+
+
+def _compute_stats(latencies: list[int], allocated: int, alloc_ops: int) -> Stats:
+    if not latencies:
+        return Stats(0, 0.0, 0.0, 0.0)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+    return Stats(
+        len(latencies),
+        len(latencies) / (sum(latencies) / 1e9),
+        p99 / 1e3,
+        allocated / alloc_ops if alloc_ops else 0.0,
+    )
+
+
+def run_benchmark(
+    plugins: Sequence[LoadedPlugin],
+    requests: Sequence[tuple[str, Any]],
+    rounds: int,
+    cold: bool = False,
+) -> tuple[list[Stats], Stats]:
+    """Return the stats of every plugin and the total stats.
+
+    If cold is true, the caches of the extractors are cleared before each
+    round, else they are filled before the first one.
+    """
+    latencies: list[list[int]] = [[] for _ in plugins]
+    allocated = [0] * len(plugins)
+    alloc_ops = [0] * len(plugins)
+    perf_counter_ns = time.perf_counter_ns
+
+    def measure_time(index: int, fun: Callable[..., Any], arg: Any) -> Any:
+        start = perf_counter_ns()
+        result = fun(arg)
+        latencies[index].append(perf_counter_ns() - start)
+        return result
+
+    def measure_memory(index: int, fun: Callable[..., Any], arg: Any) -> Any:
+        # the peak includes the memory freed before returning, i.e. temporaries
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fun(arg)
+        allocated[index] += tracemalloc.get_traced_memory()[1] - before
+        alloc_ops[index] += 1
+        return result
+
+    if not cold:
+        _replay(plugins, requests, lambda index, fun, arg: fun(arg))
+    for _ in range(rounds):
+        if cold:
+            _clear_caches(plugins)
+        _replay(plugins, requests, measure_time)
+    # tracemalloc slows down everything, so allocations get their own round
+    if cold:
+        _clear_caches(plugins)
+    tracemalloc.start()
+    try:
+        _replay(plugins, requests, measure_memory)
+    finally:
+        tracemalloc.stop()
+
+    all_latencies = [latency for lats in latencies for latency in lats]
+    plugins_stats = [
+        _compute_stats(*args) for args in zip(latencies, allocated, alloc_ops)
+    ]
+    total_stats = _compute_stats(all_latencies, sum(allocated), sum(alloc_ops))
+    return plugins_stats, total_stats
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '-c',
+        '--corpus',
+        help='file with one JSON request per line (default: a built-in corpus)',
+    )
+    parser.add_argument(
+        '-n',
+        '--rounds',
+        type=int,
+        default=100,
+        help='number of passes over the corpus',
+    )
+    parser.add_argument(
+        '-p',
+        '--plugins',
+        default='_build/plugins',
+        help='directory of the built plugins (default: %(default)s)',
+    )
+    parser.add_argument(
+        'pattern',
+        nargs='?',
+        help='only load the plugins whose id matches this regular expression',
+    )
+    opts = parser.parse_args()
+
+    # Some requests make the extractors log a warning, which is not what is measured
+    logging.disable(logging.WARNING)
+    plugins = load_plugins(opts.plugins, opts.pattern)
+    if not plugins:
+        sys.exit(f'No plugins found in {opts.plugins}; run "make build" first')
+    requests = _read_corpus(opts.corpus)
+
+    width = max(len(plugin.id) for plugin in plugins)
+    for caches, cold in (('warm', False), ('cold', True)):
+        plugins_stats, total_stats = run_benchmark(plugins, requests, opts.rounds, cold)
+        print(f'{caches} caches:')
+        print(f'{"plugin":<{width}} {"ops":>9} {"ops/s":>11} {"p99 µs":>8} {"B/op":>7}')
+        rows = [(plugin.id, stats) for plugin, stats in zip(plugins, plugins_stats)]
+        rows.append(('total', total_stats))
+        for name, stats in rows:
+            print(
+                f'{name:<{width}} {stats.ops:>9} {stats.ops_per_sec:>11.0f} '
+                f'{stats.p99_usec:>8.2f} {stats.bytes_per_op:>7.0f}'
+            )
+        print()
+    print(f'{len(requests)} requests, {len(plugins)} plugins, {opts.rounds} rounds')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,20 +8,40 @@ A tool for building provd plugins.
 from __future__ import annotations
 
 import argparse
+import bz2
+import fcntl
+import functools
 import glob
+import gzip
 import hashlib
+import importlib.metadata
+import importlib.util
+import inspect
 import json
+import lzma
 import os
+import re
 import shutil
+import stat
+import sys
 import tarfile
+import tempfile
 import traceback
 from argparse import ArgumentParser
-from collections.abc import Sequence
-from itertools import zip_longest
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+from itertools import groupby
 from pathlib import Path
-from subprocess import check_call
 from sys import exit, stderr
-from typing import TYPE_CHECKING, Any
+from typing import IO, TYPE_CHECKING, Any, NamedTuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable
@@ -68,13 +88,24 @@ if TYPE_CHECKING:
 
 BUILD_FILENAME = 'build.py'
 DB_FILENAME = 'plugins.db'
+DB_GZIP_SUFFIX = '.gz'
+DB_HASH_SUFFIX = '.sha256'
+DB_DELTA_SUFFIX = '.delta'
+INDEX_FILENAME = 'plugins.index'
+INDEX_FORMAT_VERSION = 3
 PLUGIN_INFO_FILENAME = 'plugin-info'
 PACKAGE_SUFFIX = '.tar.bz2'
+PACKAGE_FORMATS = {
+    'bz2': PACKAGE_SUFFIX,
+    'gz': '.tar.gz',
+    'xz': '.tar.xz',
+    'zst': '.tar.zst',
+}
+CHUNK_SIZE = 64 * 1024
+FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+REPRODUCIBLE_MTIME = int(os.environ.get('SOURCE_DATE_EPOCH', 0))
 WAZO_TEST_PLUGINS = 'wazo-test-plugins'
-
-
-def cmp(a: Any, b: Any) -> bool:
-    return (a > b) - (a < b)
+TZDATA_FILE = '/usr/share/zoneinfo/tzdata.zi'
 
 
 def count(iterable: Iterable, function: Callable[[Any], bool] = bool):
@@ -107,16 +138,199 @@ def _list_build_plugins(directory: str) -> list[str]:
     return build_plugins
 
 
+def _is_path_match(rel_path: str, pattern: str) -> bool:
+    # Match like an rsync filter pattern: a pattern starting with '/' is
+    # anchored to the root of the copy, else it matches the end of the path
+    path_parts = rel_path.split('/')
+    if pattern.startswith('/'):
+        pattern_parts = pattern[1:].split('/')
+        if len(pattern_parts) != len(path_parts):
+            return False
+    else:
+        pattern_parts = pattern.rstrip('/').split('/')
+        if len(pattern_parts) > len(path_parts):
+            return False
+        path_parts = path_parts[-len(pattern_parts) :]
+    return all(map(fnmatchcase, path_parts, pattern_parts))
+
+
+def _is_path_copied(
+    rel_path: str, include: Sequence[str], exclude: Sequence[str]
+) -> bool:
+    if os.path.basename(rel_path).startswith('.'):
+        return False
+    if any(_is_path_match(rel_path, pattern) for pattern in include):
+        return True
+    return not any(_is_path_match(rel_path, pattern) for pattern in exclude)
+
+
+def _clone_file(src: str, dst: str) -> bool:
+    # Try to create dst as a copy-on-write clone (reflink) of src
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def _copy_file(src: str, dst: str, hardlink: bool) -> None:
+    # dst is always unlinked first, so that a hardlinked file is never
+    # written through
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    if os.path.islink(src):
+        os.symlink(os.readlink(src), dst)
+        return
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    if not _clone_file(src, dst):
+        shutil.copyfile(src, dst)
+    shutil.copymode(src, dst)
+
+
+def copy_tree(
+    src: str,
+    dst: str,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    hardlink: bool = False,
+) -> None:
+    """Copy the content of the src directory into the dst directory.
+
+    This is the in-process equivalent of `rsync -rlp --exclude '.*'
+    [--include PATTERN...] [--exclude PATTERN...] src/ dst`: hidden files are
+    never copied, and a path matching an include pattern is copied even if it
+    matches an exclude pattern. Symlinks are copied as symlinks.
+
+    Files are reflinked when the filesystem supports it, or hardlinked if
+    hardlink is true.
+
+    """
+    if not os.path.isdir(src):
+        raise NotADirectoryError(f"'{src}' is not a directory")
+    for dirpath, dirnames, filenames in os.walk(src):
+        rel_dir = os.path.relpath(dirpath, src)
+        dst_dir = os.path.normpath(os.path.join(dst, rel_dir))
+        os.makedirs(dst_dir, exist_ok=True)
+        shutil.copymode(dirpath, dst_dir)
+        copied_dirnames = []
+        for name in sorted(dirnames + filenames):
+            rel_path = name if rel_dir == os.curdir else f'{rel_dir}/{name}'
+            if not _is_path_copied(rel_path, include, exclude):
+                continue
+            src_path = os.path.join(dirpath, name)
+            if name in dirnames and not os.path.islink(src_path):
+                copied_dirnames.append(name)
+            else:
+                _copy_file(src_path, os.path.join(dst_dir, name), hardlink)
+        dirnames[:] = copied_dirnames
+
+
+def expand_template(
+    src: str, dst: str | os.PathLike[str], placeholders: dict[str, str]
+) -> None:
+    """Write the src file to dst, with each placeholder replaced by its value.
+
+    e.g. expand_template(src, dst, {'#MODEL#': 'D785'})
+
+    """
+    with open(src, 'rb') as f:
+        content = f.read()
+    for placeholder, value in placeholders.items():
+        content = content.replace(placeholder.encode(), value.encode())
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    with open(dst, 'wb') as f:
+        f.write(content)
+
+
+def write_json_data(src: str, function_name: str, dst: str | os.PathLike[str]) -> None:
+    """Write to dst the JSON encoding of the value returned by the function
+    named function_name of the python file src.
+
+    This is used to compute at build time data that a plugin would otherwise
+    compute every time it is loaded. The src file is executed with the modules
+    available to the build script; if one of its imports is missing (e.g.
+    wazo-provd is not installed), a warning is printed and nothing is written.
+    This is intentional: plugins using precomputed data must fall back to
+    computing it themselves when it is absent, so that they can still be built
+    without wazo-provd. Since the data depends on the build host, targets using
+    this function have precompute_environment() in their build cache key.
+
+    """
+    namespace: dict[str, Any] = {'__name__': '__pgbuild__'}
+    try:
+        with open(src, 'rb') as f:
+            exec(compile(f.read(), src, 'exec'), namespace)
+    except ImportError as e:
+        print(f"warning: not writing '{dst}': {e}", file=stderr)
+        return
+    data = namespace[function_name]()
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    with open(dst, 'w') as f:
+        json.dump(data, f)
+        f.write('\n')
+
+
+@functools.lru_cache(maxsize=None)
+def pgbuild_digest() -> str:
+    """Return the sha256 of the source of this script."""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def precompute_environment() -> str:
+    """Return what the data written by write_json_data depends on outside of
+    the build plugins: the version of wazo-provd, if it can be imported, and
+    the version of the timezone database of the build host.
+
+    """
+    versions = []
+    for module, distribution in [('wazo_provd', 'wazo-provd'), ('provd', 'provd')]:
+        if importlib.util.find_spec(module) is None:
+            version = None
+        else:
+            try:
+                version = importlib.metadata.version(distribution)
+            except importlib.metadata.PackageNotFoundError:
+                version = 'unknown'
+        versions.append(f'{module}={version}')
+    try:
+        with open(TZDATA_FILE) as f:
+            # e.g. "# version 2024a"
+            versions.append(f'tzdata={f.readline().strip()}')
+    except OSError:
+        versions.append('tzdata=None')
+    return '\0'.join(versions)
+
+
+def _code_names(code: Any) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, type(code)):
+            names.update(_code_names(const))
+    return names
+
+
 class BuildPlugin:
-    def __init__(self, path):
+    def __init__(self, path, hardlink=False):
         """Create a new BuildPlugin object.
 
         path -- the path to a build_plugin [directory]
+        hardlink -- if true, hardlink the files copied by copy_tree when possible
 
         """
-        self._load_build_plugin(path)
         self._build_plugin_path = path
+        self._hardlink = hardlink
         self.name = os.path.basename(path)
+        self._load_build_plugin(path)
 
     def _load_build_plugin(self, path: str) -> None:
         targets: dict[str, TargetDict] = {}
@@ -134,10 +348,37 @@ class BuildPlugin:
 
             return aux
 
+        abs_path = os.path.abspath(path)
+
+        def _copy_tree(
+            src: str,
+            dst: str,
+            include: Sequence[str] = (),
+            exclude: Sequence[str] = (),
+        ) -> None:
+            copy_tree(
+                os.path.join(abs_path, src), dst, include, exclude, self._hardlink
+            )
+
+        def _expand_template(
+            src: str, dst: str | os.PathLike[str], placeholders: dict[str, str]
+        ) -> None:
+            expand_template(os.path.join(abs_path, src), dst, placeholders)
+
+        def _write_json_data(
+            src: str, function_name: str, dst: str | os.PathLike[str]
+        ) -> None:
+            write_json_data(os.path.join(abs_path, src), function_name, dst)
+
         build_file = os.path.join(path, BUILD_FILENAME)
         exec(
             compile(open(build_file, "rb").read(), build_file, 'exec'),
-            {'target': _target},
+            {
+                'target': _target,
+                'copy_tree': _copy_tree,
+                'expand_template': _expand_template,
+                'write_json_data': _write_json_data,
+            },
         )
         self.targets = targets
 
@@ -165,6 +406,57 @@ class BuildPlugin:
         if target['std_dirs']:
             self._mk_std_dirs(abs_path)
 
+    def input_digest(self, target_id: str) -> str:
+        """Return a digest of everything the target plugin is built from.
+
+        The inputs are the build plugin's whole build.py, the source of
+        pgbuild itself (copy_tree, expand_template, ...) and the files and
+        directories of the build plugin the target function refers to. If no
+        such path can be found, the whole build plugin directory is used.
+        Targets calling write_json_data also depend on precompute_environment().
+
+        """
+        target = self.targets[target_id]
+        digest = hashlib.sha256()
+        digest.update(f"{target['pg_id']}\0{target['std_dirs']}\0".encode())
+        digest.update(f"{pgbuild_digest()}\0".encode())
+        _update_file_digest(
+            digest,
+            os.path.join(self._build_plugin_path, BUILD_FILENAME),
+            BUILD_FILENAME,
+        )
+        try:
+            digest.update(inspect.getsource(target['fun']).encode())
+        except OSError:
+            digest.update(target['fun'].__code__.co_code)
+        if 'write_json_data' in _code_names(target['fun'].__code__):
+            digest.update(f"{precompute_environment()}\0".encode())
+        input_paths = sorted(self._target_input_paths(target['fun'].__code__))
+        for input_path in input_paths or [os.curdir]:
+            _update_tree_digest(
+                digest, os.path.join(self._build_plugin_path, input_path)
+            )
+        return digest.hexdigest()
+
+    def _target_input_paths(self, code: Any) -> set[str]:
+        # Every string constant of the target function that names an existing
+        # path relative to the build plugin directory is considered an input,
+        # e.g. 'common/', 'v86/', 'common/templates/common/foo.tpl.btpl' or
+        # '../shared/'
+        input_paths = set()
+        for const in code.co_consts:
+            if isinstance(const, type(code)):
+                input_paths.update(self._target_input_paths(const))
+            elif (
+                isinstance(const, str)
+                and const
+                and (const.startswith('../') or not const.startswith(('/', '.', '-')))
+            ):
+                input_path = os.path.normpath(const)
+                if os.path.exists(os.path.join(self._build_plugin_path, input_path)):
+                    input_paths.add(input_path)
+        return input_paths
+
     @staticmethod
     def _mk_std_dirs(abs_path: str) -> None:
         for directory in [
@@ -177,6 +469,90 @@ class BuildPlugin:
             os.makedirs(Path(abs_path) / directory, exist_ok=True)
 
 
+def _update_tree_digest(digest: Any, top: str) -> None:
+    # Hidden files are ignored, like they are by the build plugins
+    if os.path.isfile(top):
+        _update_file_digest(digest, top, os.path.basename(top))
+        return
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+        for filename in sorted(filenames):
+            if not filename.startswith('.'):
+                file = os.path.join(dirpath, filename)
+                _update_file_digest(digest, file, os.path.relpath(file, top))
+
+
+def _update_file_digest(digest: Any, file: str, name: str) -> None:
+    digest.update(f"{name}\0".encode())
+    if os.path.islink(file):
+        digest.update(f"-> {os.readlink(file)}\0".encode())
+        return
+    digest.update(f"{os.stat(file).st_mode & 0o777:o}\0".encode())
+    with open(file, 'rb') as f:
+        for chunk in iter(functools.partial(f.read, CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+
+class BuildCache:
+    """A persistent cache of built target plugins, keyed on the digest of
+    their inputs.
+
+    Each entry is a copy of a built plugin directory. The digest of the
+    plugin directory last written to a destination is also kept, so that an
+    up-to-date plugin directory does not even need to be restored.
+
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self._cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(os.path.join(self._cache_dir, 'stamps'), exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, key)
+
+    def _stamp_path(self, path: str) -> str:
+        path_hash = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        return os.path.join(self._cache_dir, 'stamps', path_hash)
+
+    def is_up_to_date(self, key: str, path: str) -> bool:
+        try:
+            with open(self._stamp_path(path)) as f:
+                stamp = f.read()
+        except FileNotFoundError:
+            return False
+        return stamp == key and os.path.isdir(path)
+
+    def restore(self, key: str, path: str) -> bool:
+        """Copy the cached plugin directory for key to path.
+
+        Return False if there's no such entry in the cache.
+
+        """
+        entry_path = self._entry_path(key)
+        if not os.path.isdir(entry_path):
+            return False
+        shutil.copytree(entry_path, path, symlinks=True)
+        self._write_stamp(key, path)
+        return True
+
+    def store(self, key: str, path: str) -> None:
+        entry_path = self._entry_path(key)
+        if not os.path.isdir(entry_path):
+            # copy then rename, so that concurrent builds never see a partial entry
+            tmp_path = tempfile.mkdtemp(prefix=f'.{key}-', dir=self._cache_dir)
+            os.rmdir(tmp_path)
+            shutil.copytree(path, tmp_path, symlinks=True)
+            try:
+                os.rename(tmp_path, entry_path)
+            except OSError:
+                shutil.rmtree(tmp_path, True)
+        self._write_stamp(key, path)
+
+    def _write_stamp(self, key: str, path: str) -> None:
+        with open(self._stamp_path(path), 'w') as f:
+            f.write(key)
+
+
 def build_op(
     opts: argparse.Namespace, args: list[str], src_dir: str, dest_dir: str
 ) -> None:
@@ -203,7 +579,7 @@ def build_op(
     build_plugins = {}
     for build_plugin_path, targets in build_plugin_targets.items():
         try:
-            build_plugin = BuildPlugin(build_plugin_path)
+            build_plugin = BuildPlugin(build_plugin_path, opts.hardlink)
         except Exception as e:
             print(
                 f"error: while loading build plugin '{build_plugin_path}': {e}",
@@ -224,19 +600,214 @@ def build_op(
                     exit(1)
 
     # build, build plugins
-    for build_plugin_path, targets in build_plugin_targets.items():
-        print(f"Processing targets for build plugin '{build_plugin_path}'...")
-        build_plugin = build_plugins[build_plugin_path]
-        for target_id in targets or []:
+    jobs = [
+        (build_plugin_path, target_id, build_plugins[build_plugin_path])
+        for build_plugin_path, targets in build_plugin_targets.items()
+        for target_id in targets or []
+    ]
+    if opts.jobs > 1:
+        _build_parallel(jobs, package_dir, opts.jobs, opts.cache_dir, opts.hardlink)
+    else:
+        _build_serial(jobs, package_dir, opts.cache_dir)
+
+    if opts.dedup:
+        _dedup_files(
+            [
+                os.path.join(package_dir, build_plugin.targets[target_id]['pg_id'])
+                for _, target_id, build_plugin in jobs
+            ]
+        )
+
+
+def _build_serial(
+    jobs: list[tuple[str, str, BuildPlugin]], package_dir: str, cache_dir: str | None
+) -> None:
+    build_cache = BuildCache(cache_dir) if cache_dir else None
+
+    last_build_plugin_path = None
+    for build_plugin_path, target_id, build_plugin in jobs:
+        if build_plugin_path != last_build_plugin_path:
+            print(f"Processing targets for build plugin '{build_plugin_path}'...")
+            last_build_plugin_path = build_plugin_path
+        path = os.path.join(package_dir, build_plugin.targets[target_id]['pg_id'])
+        print(f"  - Building target '{target_id}' in directory '{path}'...")
+        error = _build_target(build_plugin, target_id, package_dir, build_cache)
+        if error:
+            print(f"error while building target '{target_id}':", file=stderr)
+            print(error, end='', file=stderr)
+
+
+def _file_digest(file: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for chunk in iter(functools.partial(f.read, CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _dedup_files(paths: Sequence[str]) -> None:
+    """Report the files with identical content and mode found under paths,
+    and replace the duplicates with hardlinks to a single file.
+
+    This only deduplicates the build directory: the hardlinked files are
+    still packaged, and so downloaded and installed, as separate copies.
+
+    """
+    files_by_size: dict[int, list[tuple[str, os.stat_result]]] = defaultdict(list)
+    nb_files = 0
+    for path in paths:
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                file = os.path.join(dirpath, filename)
+                file_stat = os.lstat(file)
+                if stat.S_ISREG(file_stat.st_mode) and file_stat.st_size:
+                    nb_files += 1
+                    files_by_size[file_stat.st_size].append((file, file_stat))
+
+    # only files sharing their size with another file need to be hashed
+    files_by_content: dict[tuple[str, int], list[Any]] = defaultdict(list)
+    for files in files_by_size.values():
+        if len(files) > 1:
+            for file, file_stat in files:
+                key = _file_digest(file), stat.S_IMODE(file_stat.st_mode)
+                files_by_content[key].append((file, file_stat))
+
+    nb_duplicates = duplicate_size = 0
+    for files in files_by_content.values():
+        first_file, first_stat = files[0]
+        for file, file_stat in files[1:]:
+            nb_duplicates += 1
+            duplicate_size += file_stat.st_size
+            if os.path.samestat(file_stat, first_stat):
+                continue
+            tmp_file = f'{file}.dedup'
+            os.link(first_file, tmp_file)
+            os.replace(tmp_file, file)
+    print(
+        f"Deduplicated {nb_duplicates} of {nb_files} files "
+        f"({duplicate_size} bytes) into hardlinks"
+    )
+
+
+def _build_target(
+    build_plugin: BuildPlugin,
+    target_id: str,
+    package_dir: str,
+    build_cache: BuildCache | None = None,
+) -> str:
+    # Return the formatted traceback if the build failed, else an empty string
+    path = os.path.join(package_dir, build_plugin.targets[target_id]['pg_id'])
+    try:
+        key = build_plugin.input_digest(target_id) if build_cache else ''
+        if build_cache and build_cache.is_up_to_date(key, path):
+            print(f"    Target '{target_id}' is up to date")
+            return ''
+        if os.path.exists(path):
+            shutil.rmtree(path, False)
+        if build_cache and build_cache.restore(key, path):
+            print(f"    Target '{target_id}' restored from cache")
+            return ''
+        build_plugin.build(target_id, package_dir)
+        if build_cache:
+            build_cache.store(key, path)
+    except Exception:
+        return traceback.format_exc()
+    return ''
+
+
+@functools.lru_cache(maxsize=None)
+def _load_build_plugin(build_plugin_path: str, hardlink: bool) -> BuildPlugin:
+    # Build plugins are loaded once per worker process since the target
+    # functions they define cannot be pickled
+    return BuildPlugin(build_plugin_path, hardlink)
+
+
+@contextmanager
+def _captured_output() -> Iterator[IO[bytes]]:
+    # Redirect the stdout and stderr file descriptors of the current process,
+    # so that the output of the external programs run by a target is captured
+    with tempfile.TemporaryFile(mode='w+b') as log:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_fds = os.dup(1), os.dup(2)
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            yield log
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for fd, saved_fd in enumerate(saved_fds, start=1):
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
+
+
+def _build_target_worker(
+    build_plugin_path: str,
+    target_id: str,
+    package_dir: str,
+    cache_dir: str | None,
+    hardlink: bool,
+) -> tuple[str, str]:
+    # Run in a worker process; each worker has its own current directory, so
+    # the os.chdir done by BuildPlugin.build can't race with other targets
+    with _captured_output() as log:
+        build_cache = BuildCache(cache_dir) if cache_dir else None
+        error = _build_target(
+            _load_build_plugin(build_plugin_path, hardlink),
+            target_id,
+            package_dir,
+            build_cache,
+        )
+        log.seek(0)
+        output = log.read().decode('utf-8', 'replace')
+    return output, error
+
+
+def _build_parallel(
+    jobs: list[tuple[str, str, BuildPlugin]],
+    package_dir: str,
+    max_workers: int,
+    cache_dir: str | None,
+    hardlink: bool,
+) -> None:
+    package_dir = os.path.abspath(package_dir)
+    print(f"Building {len(jobs)} targets using {max_workers} processes...")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _build_target_worker,
+                os.path.abspath(build_plugin_path),
+                target_id,
+                package_dir,
+                cache_dir,
+                hardlink,
+            )
+            for build_plugin_path, target_id, _ in jobs
+        ]
+        # results are reported in submission order so the output is deterministic
+        nb_errors = 0
+        last_build_plugin_path = None
+        for (build_plugin_path, target_id, build_plugin), future in zip(jobs, futures):
+            if build_plugin_path != last_build_plugin_path:
+                print(f"Processing targets for build plugin '{build_plugin_path}'...")
+                last_build_plugin_path = build_plugin_path
             path = os.path.join(package_dir, build_plugin.targets[target_id]['pg_id'])
-            if os.path.exists(path):
-                shutil.rmtree(path, False)
-            print(f"  - Building target '{target_id}' in directory '{path}'...")
             try:
-                build_plugin.build(target_id, package_dir)
+                output, error = future.result()
             except Exception:
+                output, error = '', traceback.format_exc()
+            if output:
+                print(output, end='')
+            if error:
+                nb_errors += 1
                 print(f"error while building target '{target_id}':", file=stderr)
-                traceback.print_exc(None, stderr)
+                print(error, end='', file=stderr)
+            else:
+                print(f"  - Built target '{target_id}' in directory '{path}'")
+    if nb_errors:
+        print(f"{nb_errors} of {len(jobs)} targets failed to build", file=stderr)
 
 
 def _is_plugin(path: str) -> bool:
@@ -285,62 +856,186 @@ def package_op(
     else:
         plugins = _list_plugins(pg_dir)
 
+    if opts.format == 'zst' and zstandard is None:
+        print("error: the zst format requires the zstandard module", file=stderr)
+        exit(1)
+
     # build packages
+    packages = []
     for plugin in plugins:
         plugin_version = _get_plugin_version(plugin)
         plugin_name = os.path.basename(plugin).replace('_', '-')
         package_path = os.path.join(pkg_dir, plugin_name)
-        package = f"{package_path}-{plugin_version}{PACKAGE_SUFFIX}"
-        print(f"Packaging plugin '{plugin}' into '{package}'...")
-        check_call(
-            [
-                'tar',
-                'caf',
+        package = f"{package_path}-{plugin_version}{PACKAGE_FORMATS[opts.format]}"
+        packages.append((plugin, package))
+
+    nb_errors = 0
+    with ProcessPoolExecutor(max_workers=max(opts.jobs, 1)) as executor:
+        futures = [
+            executor.submit(
+                _create_package,
+                plugin,
                 package,
-                '-C',
-                os.path.dirname(plugin) or os.curdir,
-                os.path.basename(plugin),
-            ]
-        )
+                opts.format,
+                opts.compression_level,
+                opts.reproducible,
+            )
+            for plugin, package in packages
+        ]
+        for (plugin, package), future in zip(packages, futures):
+            print(f"Packaging plugin '{plugin}' into '{package}'...")
+            try:
+                future.result()
+            except Exception:
+                nb_errors += 1
+                print(f"error while packaging plugin '{plugin}':", file=stderr)
+                traceback.print_exc(None, stderr)
+    if nb_errors:
+        exit(1)
 
 
-def _list_packages(directory: str) -> list[str]:
-    return glob.glob(os.path.join(directory, '*' + PACKAGE_SUFFIX))
+def _hardlinks_as_files_filter(
+    plugin: str, tar_filter: Callable[[tarfile.TarInfo], tarfile.TarInfo] | None
+) -> Callable[[tarfile.TarInfo], tarfile.TarInfo]:
+    # Return a filter adding the files hardlinked together, e.g. by --dedup,
+    # as regular files, so that they are packaged like copies of each other
+    parent_dir = os.path.dirname(os.path.normpath(plugin))
 
+    def aux(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+        if tarinfo.islnk():
+            tarinfo.type = tarfile.REGTYPE
+            tarinfo.linkname = ''
+            tarinfo.size = os.path.getsize(os.path.join(parent_dir, tarinfo.name))
+        return tar_filter(tarinfo) if tar_filter else tarinfo
+
+    return aux
 
-def _get_package_filename(package: str) -> str:
-    return os.path.basename(package)
 
+def _normalize_tarinfo(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+    # Strip everything specific to the build host from a package member
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ''
+    tarinfo.mtime = REPRODUCIBLE_MTIME
+    if tarinfo.isdir() or tarinfo.mode & 0o111:
+        tarinfo.mode = 0o755
+    else:
+        tarinfo.mode = 0o644
+    return tarinfo
+
+
+@contextmanager
+def _compressed_writer(
+    fobj: IO[bytes], format_: str, compression_level: int | None
+) -> Iterator[Any]:
+    # The gzip header is written without file name and with a fixed mtime,
+    # so that identical content always gives an identical package
+    writer: Any
+    if format_ == 'gz':
+        level = 9 if compression_level is None else compression_level
+        writer = gzip.GzipFile('', 'wb', level, fobj, mtime=0)
+    elif format_ == 'bz2':
+        level = 9 if compression_level is None else compression_level
+        writer = bz2.BZ2File(fobj, 'wb', compresslevel=level)
+    elif format_ == 'xz':
+        writer = lzma.LZMAFile(fobj, 'wb', preset=compression_level)
+    elif format_ == 'zst':
+        level = 3 if compression_level is None else compression_level
+        writer = zstandard.ZstdCompressor(level=level).stream_writer(fobj)
+    else:
+        raise ValueError(f'unknown package format {format_}')
+    with writer:
+        yield writer
 
-def _get_package_name(package: str) -> str:
-    tar_package = tarfile.open(package)
+
+def _create_package(
+    plugin: str,
+    package: str,
+    format_: str,
+    compression_level: int | None,
+    reproducible: bool = False,
+) -> None:
+    # The package is written to a temporary file first, so that an interrupted
+    # packaging never leaves a truncated package behind
+    tmp_package = f'{package}.tmp'
+    arcname = os.path.basename(os.path.normpath(plugin))
+    tar_filter = _hardlinks_as_files_filter(
+        plugin, _normalize_tarinfo if reproducible else None
+    )
     try:
-        shortest_name = min(tar_package.getnames())
-        if tar_package.getmember(shortest_name).isdir():
-            return shortest_name
-        print(
-            f"error: package '{package}' should have only 1 directory at depth 0",
-            file=stderr,
-        )
-        exit(1)
+        with open(tmp_package, 'wb') as f:
+            with _compressed_writer(f, format_, compression_level) as writer:
+                with tarfile.open(
+                    fileobj=writer, mode='w|', format=tarfile.PAX_FORMAT
+                ) as tar:
+                    # members are added in sorted order by tarfile
+                    tar.add(plugin, arcname, filter=tar_filter)
+        os.replace(tmp_package, package)
     finally:
-        tar_package.close()
+        if os.path.exists(tmp_package):
+            os.remove(tmp_package)
 
 
-def _get_package_plugin_info(package: str, package_name: str) -> RawPluginInfo:
-    # Return a dictionary representing the standardized content of the
-    # plugin-info file
-    tar_package = tarfile.open(package)
-    try:
-        plugin_info_name = os.path.join(package_name, PLUGIN_INFO_FILENAME)
-        if plugin_info_name not in tar_package.getnames():
-            print(
-                f"error: package '{package}' has no file '{plugin_info_name}'",
-                file=stderr,
+class InvalidPackageError(Exception):
+    pass
+
+
+class _HashingReader:
+    # Wrap a binary file object, hashing everything read from it
+    def __init__(self, fobj: IO[bytes]) -> None:
+        self._fobj = fobj
+        self.hash = hashlib.sha1()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fobj.read(size)
+        self.hash.update(data)
+        return data
+
+    def drain(self) -> None:
+        while self.read(CHUNK_SIZE):
+            pass
+
+
+def _open_package_stream(package: str, fobj: Any) -> tarfile.TarFile:
+    # Open the package for sequential reading only
+    if package.endswith(PACKAGE_FORMATS['zst']):
+        if zstandard is None:
+            raise InvalidPackageError(
+                f"package '{package}' requires the zstandard module"
             )
-            exit(1)
+        fobj = zstandard.ZstdDecompressor().stream_reader(fobj, closefd=False)
+        return tarfile.open(fileobj=fobj, mode='r|')
+    return tarfile.open(fileobj=fobj, mode='r|*')
+
+
+def _list_packages(directory: str) -> list[str]:
+    return [
+        package
+        for suffix in PACKAGE_FORMATS.values()
+        for package in glob.glob(os.path.join(directory, '*' + suffix))
+    ]
+
+
+def _get_package_filename(package: str) -> str:
+    return os.path.basename(package)
+
 
-        fobj = tar_package.extractfile(plugin_info_name)
+def _read_package_plugin_info(
+    package: str, tar_package: tarfile.TarFile
+) -> tuple[str, RawPluginInfo]:
+    # Return the name of the package and a dictionary representing the
+    # standardized content of its plugin-info file, reading the package
+    # only up to the plugin-info file
+    first_member = tar_package.next()
+    if first_member is None or not first_member.isdir() or '/' in first_member.name:
+        raise InvalidPackageError(
+            f"package '{package}' should have only 1 directory at depth 0"
+        )
+    package_name = first_member.name
+    plugin_info_name = f'{package_name}/{PLUGIN_INFO_FILENAME}'
+    for member in tar_package:
+        if member.name != plugin_info_name:
+            continue
+        fobj = tar_package.extractfile(member)
         try:
             if fobj is None:
                 raise ValueError("No file to open")
@@ -348,59 +1043,290 @@ def _get_package_plugin_info(package: str, package_name: str) -> RawPluginInfo:
             for key in ['capabilities', 'description', 'version']:
                 if key not in raw_plugin_info:
                     raise ValueError()
-            return raw_plugin_info
+            return package_name, raw_plugin_info
         except ValueError:
-            print(
-                f"error: package '{package}' has invalid plugin-info file", file=stderr
+            raise InvalidPackageError(
+                f"package '{package}' has invalid plugin-info file"
             )
-            exit(1)
         finally:
             if fobj:
                 fobj.close()
-    finally:
-        tar_package.close()
-
-
-def _get_package_dsize(package: str) -> int:
-    return os.path.getsize(package)
-
-
-def _get_package_sha1sum(package: str) -> str:
-    package_hash = hashlib.sha1()
-    with open(package, 'rb') as f:
-        package_hash.update(f.read())
-    return package_hash.hexdigest()
+    raise InvalidPackageError(f"package '{package}' has no file '{plugin_info_name}'")
 
 
 def _get_package_info(package: str) -> tuple[str, PluginInfo]:
+    # The package is read in a single streaming pass: the sha1sum is computed
+    # on the bytes read to find the plugin-info file, then on the rest
+    with open(package, 'rb') as f:
+        reader = _HashingReader(f)
+        try:
+            with _open_package_stream(package, reader) as tar_package:
+                name, raw_plugin_info = _read_package_plugin_info(package, tar_package)
+        except tarfile.TarError as e:
+            raise InvalidPackageError(f"package '{package}' is invalid: {e}")
+        reader.drain()
+        dsize = os.fstat(f.fileno()).st_size
     result: PluginInfo = {  # type: ignore[typeddict-item]
         'filename': _get_package_filename(package)
     }
-    name = _get_package_name(package)
-    result.update(_get_package_plugin_info(package, name))
-    result['dsize'] = _get_package_dsize(package)
-    result['sha1sum'] = _get_package_sha1sum(package)
+    result.update(raw_plugin_info)
+    result['dsize'] = dsize
+    result['sha1sum'] = reader.hash.hexdigest()
     return name, result
 
 
-def _version_cmp(version1: str, version2: str) -> int | bool:
-    """Compare the version version1 to version version2 and return:
-    - negative if version1<version2
-    - zero if version1==version2
-    - positive if version1>version2.
-    - or bool.. Will be evaluated as 0 or 1, but should be made explicit.
+class PackageInfoCache:
+    """A persistent cache of package infos, keyed on the path, size and
+    modification time of the packages.
+
     """
-    start1, _, last1 = version1.rpartition('-')
-    start2, _, last2 = version2.rpartition('-')
-    for i1, i2 in zip_longest(start1.split('.'), start2.split('.'), fillvalue='0'):
-        res_cmp = cmp(i1, i2)
-        if res_cmp != 0:
-            return int(res_cmp)
-    if not last1 and last2 or not last1.startswith('dev') and last2.startswith('dev'):
-        return 1
-    elif last1 and not last2 or last1.startswith('dev') and not last2.startswith('dev'):
-        return -1
-    return cmp(last1, last2)
+
+    def __init__(self, cache_file: str | None) -> None:
+        self._cache_file = cache_file
+        self._entries: dict[str, dict[str, Any]] = {}
+        if cache_file and os.path.isfile(cache_file):
+            try:
+                with open(cache_file) as f:
+                    self._entries = json.load(f)
+            except ValueError:
+                print(f"warning: ignoring invalid cache '{cache_file}'", file=stderr)
+
+    @staticmethod
+    def _key(package: str) -> tuple[str, list[int]]:
+        stat = os.stat(package)
+        return os.path.abspath(package), [stat.st_size, stat.st_mtime_ns]
+
+    def get(self, package: str) -> tuple[str, PluginInfo] | None:
+        path, stat = self._key(package)
+        entry = self._entries.get(path)
+        if entry is None or entry['stat'] != stat:
+            return None
+        return entry['name'], entry['info']
+
+    def set(self, package: str, name: str, package_info: PluginInfo) -> None:
+        path, stat = self._key(package)
+        self._entries[path] = {'stat': stat, 'name': name, 'info': package_info}
+
+    def save(self) -> None:
+        if not self._cache_file:
+            return
+        entries = {
+            path: entry for path, entry in self._entries.items() if os.path.isfile(path)
+        }
+        tmp_file = f'{self._cache_file}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(entries, f, sort_keys=True, separators=(',', ':'))
+        os.replace(tmp_file, self._cache_file)
+
+
+def _get_packages_info(
+    packages: Sequence[str], max_workers: int, cache_file: str | None
+) -> list[tuple[str, PluginInfo]]:
+    # Return the (name, info) of each package, in order. Only the packages
+    # which are not in the cache are read, in parallel
+    cache = PackageInfoCache(cache_file)
+    results = {package: cache.get(package) for package in packages}
+    missing_packages = [package for package, result in results.items() if not result]
+    if missing_packages:
+        with ProcessPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            for package, result in zip(
+                missing_packages, executor.map(_get_package_info, missing_packages)
+            ):
+                cache.set(package, *result)
+                results[package] = result
+    cache.save()
+    return [results[package] for package in packages]  # type: ignore[misc]
+
+
+def _natural_key(text: str) -> tuple[tuple[int, Any], ...]:
+    # '10' > '9', 'dev10' > 'dev9'
+    return tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in re.findall(r'\d+|\D+', text)
+    )
+
+
+class VersionKey(NamedTuple):
+    """The sort key of a plugin version, e.g. '1.10.2' or '0.3.0-dev'.
+
+    Dotted components are compared as numbers when they are numbers, and
+    trailing zero components are ignored. A version with a suffix sorts before
+    the same version without a suffix, and a 'dev' suffix before any other.
+
+    """
+
+    release: tuple[tuple[tuple[int, Any], ...], ...]
+    suffix_rank: int
+    suffix: tuple[tuple[int, Any], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def parse_version(version: str) -> VersionKey:
+    release, sep, suffix = version.rpartition('-')
+    if not sep:
+        release, suffix = suffix, ''
+    components = [_natural_key(component) for component in release.split('.')]
+    while components and components[-1] in ((), ((0, 0),)):
+        components.pop()
+    if not suffix:
+        suffix_rank = 2
+    elif suffix.startswith('dev'):
+        suffix_rank = 0
+    else:
+        suffix_rank = 1
+    return VersionKey(tuple(components), suffix_rank, _natural_key(suffix))
+
+
+_MODEL_VARIANTS_REGEX = re.compile(r'^([^()]+)((?:\([^()]+\))+)$')
+
+
+def _model_names(model: str) -> list[str]:
+    """Return the model names devices report for a capabilities model.
+
+    e.g. 'T31(P)(G)' -> ['T31', 'T31P', 'T31G'] or 'X3S/X3SP/G' -> ['X3S',
+    'X3SP', 'X3SG'] or 'N720 IP/DM PRO' -> ['N720 IP PRO', 'N720 DM PRO'].
+
+    """
+    m = _MODEL_VARIANTS_REGEX.match(model)
+    if m:
+        base, variants = m.groups()
+        return [base] + [base + variant for variant in variants[1:-1].split(')(')]
+    if '/' in model and ' ' not in model:
+        base, *variants = model.split('/')
+        return [base] + [
+            variant if variant[:2] == base[:2] else base + variant
+            for variant in variants
+        ]
+    if model.count('/') == 1 and ' ' in model.split('/')[0]:
+        # e.g. 'N720 IP/DM PRO' -> ['N720 IP PRO', 'N720 DM PRO']
+        head, tail = model.split('/')
+        prefix, first = head.rsplit(' ', 1)
+        second, _, suffix = tail.partition(' ')
+        return [
+            ' '.join(filter(None, [prefix, variant, suffix]))
+            for variant in (first, second)
+        ]
+    return [model]
+
+
+def _build_model_index(plugin_manifest: dict[str, PluginInfo]) -> dict[str, Any]:
+    # Return the inverted index of the capabilities of the plugins:
+    # vendor -> model name -> candidates, newest firmware version first. The
+    # capabilities of a candidate are stored once, under its plugin and device
+    capabilities_by_plugin: dict[str, dict[str, Any]] = {}
+    vendors: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    for package_name, package_info in plugin_manifest.items():
+        for device, capabilities in package_info['capabilities'].items():
+            device_parts = device.split(', ', 2)
+            if len(device_parts) != 3:
+                print(
+                    f"warning: plugin '{package_name}': ignoring capabilities of "
+                    f"'{device}', not 'vendor, model, firmware version'",
+                    file=stderr,
+                )
+                continue
+            vendor, model, firmware_version = device_parts
+            capabilities_by_plugin.setdefault(package_name, {})[device] = capabilities
+            models = vendors.setdefault(vendor, {})
+            for model_name in _model_names(model):
+                models.setdefault(model_name, []).append(
+                    {
+                        'plugin': package_name,
+                        'version': package_info['version'],
+                        'device': device,
+                        'model': model,
+                        'firmware_version': firmware_version,
+                    }
+                )
+    for models in vendors.values():
+        for candidates in models.values():
+            candidates.sort(key=lambda candidate: candidate['plugin'])
+            candidates.sort(
+                key=lambda candidate: parse_version(candidate['firmware_version']),
+                reverse=True,
+            )
+    return {
+        'format_version': INDEX_FORMAT_VERSION,
+        'capabilities': capabilities_by_plugin,
+        'vendors': vendors,
+    }
+
+
+def _read_previous_db(db_file: str) -> tuple[str, dict[str, PluginInfo]] | None:
+    # Return the hash and content of the existing DB file, if any
+    try:
+        with open(db_file, 'rb') as f:
+            content = f.read()
+        return hashlib.sha256(content).hexdigest(), json.loads(content)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_file_atomically(file: str, content: bytes) -> None:
+    # Readers see either the previous or the new content, never a partial one
+    tmp_file = f'{file}.tmp'
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_file, file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _write_db_files(
+    db_file: str, plugin_manifest: dict[str, PluginInfo], pretty: bool
+) -> None:
+    # Write the DB file, along with:
+    # - a gzip compressed copy of it
+    # - its sha256, usable as ETag
+    # - the delta from the previous DB file, if there was one
+    # Each file is replaced atomically, and the sha256 file is written last so
+    # that it never describes a DB file that is not there yet
+    previous_db = _read_previous_db(db_file)
+    dump_kwargs: dict[str, Any] = (
+        {'indent': 4} if pretty else {'separators': (',', ':')}
+    )
+    content = json.dumps(plugin_manifest, sort_keys=True, **dump_kwargs).encode()
+    db_hash = hashlib.sha256(content).hexdigest()
+
+    _write_db_delta(db_file, previous_db, plugin_manifest, db_hash)
+    _write_file_atomically(db_file + DB_GZIP_SUFFIX, gzip.compress(content, 9, mtime=0))
+    _write_file_atomically(db_file, content)
+    _write_file_atomically(db_file + DB_HASH_SUFFIX, f'{db_hash}\n'.encode())
+
+
+def _write_db_delta(
+    db_file: str,
+    previous_db: tuple[str, dict[str, PluginInfo]] | None,
+    plugin_manifest: dict[str, PluginInfo],
+    db_hash: str,
+) -> None:
+    delta_file = db_file + DB_DELTA_SUFFIX
+    if previous_db is None:
+        # a delta left from an older DB would not apply to this one
+        try:
+            os.remove(delta_file)
+        except FileNotFoundError:
+            pass
+        return
+    previous_hash, previous_manifest = previous_db
+    if previous_hash == db_hash:
+        # keep the delta to the last different DB
+        return
+    delta = {
+        'from': previous_hash,
+        'to': db_hash,
+        'updated': {
+            name: package_info
+            for name, package_info in plugin_manifest.items()
+            if previous_manifest.get(name) != package_info
+        },
+        'removed': sorted(set(previous_manifest) - set(plugin_manifest)),
+    }
+    _write_file_atomically(
+        delta_file, json.dumps(delta, sort_keys=True, separators=(',', ':')).encode()
+    )
 
 
 def create_db_op(
@@ -408,6 +1334,7 @@ def create_db_op(
 ) -> None:
     pkg_dir = src_dir
     db_file = os.path.join(dest_dir, DB_FILENAME)
+    index_file = os.path.join(dest_dir, INDEX_FILENAME)
 
     # parse packages to use to build db file
     if args:
@@ -415,31 +1342,40 @@ def create_db_op(
     else:
         packages = _list_packages(pkg_dir)
 
-    # get package info, and only for the most recent packages
+    try:
+        packages_info = _get_packages_info(packages, opts.jobs, opts.db_cache)
+    except InvalidPackageError as e:
+        print(f"error: {e}", file=stderr)
+        exit(1)
+
+    # keep only the most recent package of each plugin
     plugin_manifest: dict[str, PluginInfo] = {}
-    for package in packages:
-        package_name, package_info = _get_package_info(package)
-        if package_name in plugin_manifest:
-            cur_version = package_info['version']
-            last_version = plugin_manifest[package_name]['version']
+    packages_by_name = sorted(zip(packages, packages_info), key=lambda item: item[1][0])
+    for package_name, group in groupby(packages_by_name, key=lambda item: item[1][0]):
+        candidates = list(group)
+        package, (_, package_info) = max(
+            candidates, key=lambda item: parse_version(item[1][1]['version'])
+        )
+        if len(candidates) > 1:
+            versions = ', '.join(info['version'] for _, (_, info) in candidates)
             print(
-                f"warning: found package {package_name} "
-                f"in version {cur_version} and {last_version}",
+                f"warning: found package {package_name} in versions {versions}, "
+                f"using {package_info['version']}",
                 file=stderr,
             )
-            if _version_cmp(cur_version, last_version) > 0:
-                plugin_manifest[package_name] = package_info
-        else:
-            print(f"  Adding package '{package}'...")
-            plugin_manifest[package_name] = package_info
+        print(f"  Adding package '{package}'...")
+        plugin_manifest[package_name] = package_info
 
     # create db file
     print(f"Creating DB file '{db_file}'...")
-    dump_kwargs: dict[str, Any] = (
-        {'indent': 4} if opts.pretty_db else {'separators': (',', ':')}
+    _write_db_files(db_file, plugin_manifest, opts.pretty_db)
+
+    # create index file
+    print(f"Creating index file '{index_file}'...")
+    index = _build_model_index(plugin_manifest)
+    _write_file_atomically(
+        index_file, json.dumps(index, sort_keys=True, separators=(',', ':')).encode()
     )
-    with open(db_file, 'w') as f:
-        json.dump(plugin_manifest, fp=f, sort_keys=True, **dump_kwargs)  # type: ignore
 
 
 def _get_directory(opt_value):
@@ -497,6 +1433,61 @@ def main() -> None:
         dest='include_test_plugins',
         help='include wazo_test_plugins',
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        dest='jobs',
+        help='number of targets to build, or of packages to create or read, '
+        'in parallel',
+    )
+    parser.add_argument(
+        '--cache-dir',
+        dest='cache_dir',
+        help='directory of the build cache; targets whose inputs did not change '
+        'are restored from it instead of being rebuilt',
+    )
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        dest='dedup',
+        help='hardlink together the identical files of the built plugins; this '
+        'only saves disk space in the build directory, packages still contain '
+        'a copy of each file',
+    )
+    parser.add_argument(
+        '--format',
+        choices=sorted(PACKAGE_FORMATS),
+        default='bz2',
+        dest='format',
+        help='compression format of the packages (default: bz2)',
+    )
+    parser.add_argument(
+        '--compression-level',
+        type=int,
+        dest='compression_level',
+        help='compression level of the packages (default: the format default)',
+    )
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        dest='reproducible',
+        help='create packages that only depend on the content of the plugins, '
+        'by normalizing the mtime, owner and mode of their files',
+    )
+    parser.add_argument(
+        '--db-cache',
+        dest='db_cache',
+        help='file caching the info of the packages used to create the DB file',
+    )
+    parser.add_argument(
+        '--hardlink',
+        action='store_true',
+        dest='hardlink',
+        help='hardlink the files of the build plugins into the built plugins '
+        'instead of copying them',
+    )
 
     options, args = parser.parse_known_args()
     nb_op = count(getattr(options, name) for name in ('build', 'package', 'create_db'))
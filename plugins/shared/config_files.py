@@ -0,0 +1,83 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Writing of the configuration files rendered by a plugin.
+
+This file is copied in the plugins using it by their build.py and executed by
+their entry.py before their common.py, like common.py itself.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from wazo_provd.plugins import TemplatePluginHelper
+
+logger = logging.getLogger('plugin.config_files')
+
+
+def _is_same_content(filename1: str, filename2: str) -> bool:
+    try:
+        if os.path.getsize(filename1) != os.path.getsize(filename2):
+            return False
+        with open(filename1, 'rb') as f1, open(filename2, 'rb') as f2:
+            return f1.read() == f2.read()
+    except FileNotFoundError:
+        return False
+
+
+class ConfigFileWriter:
+    """Write rendered configuration files, only when their content changed.
+
+    The template is rendered to a temporary file next to the destination file,
+    which replaces it with an atomic rename if their content differ. Unchanged
+    files are left untouched, so their mtime is kept too.
+
+    The number of files written and left unchanged are counted in written and
+    skipped.
+    """
+
+    def __init__(self, tpl_helper: TemplatePluginHelper) -> None:
+        self._tpl_helper = tpl_helper
+        self.written = 0
+        self.skipped = 0
+
+    def dump(
+        self,
+        tpl,
+        raw_config,
+        filename: str,
+        encoding: str,
+        transform: Callable[[bytes], bytes] | None = None,
+        **kwargs,
+    ) -> bool:
+        """Render tpl to filename, like TemplatePluginHelper.dump.
+
+        If transform is given, the rendered content is replaced by what
+        transform returns for it before being compared to filename.
+
+        Return true if filename was written, false if it was left unchanged.
+        """
+        dirname, basename = os.path.split(filename)
+        tmp_filename = os.path.join(dirname, f'.{basename}.tmp')
+        try:
+            self._tpl_helper.dump(tpl, raw_config, tmp_filename, encoding, **kwargs)
+            if transform is not None:
+                with open(tmp_filename, 'r+b') as f:
+                    content = transform(f.read())
+                    f.seek(0)
+                    f.truncate()
+                    f.write(content)
+            if _is_same_content(tmp_filename, filename):
+                self.skipped += 1
+                logger.debug('Configuration file %s is unchanged', filename)
+                return False
+            os.replace(tmp_filename, filename)
+            self.written += 1
+            return True
+        finally:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
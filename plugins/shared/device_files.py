@@ -0,0 +1,210 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Serving of the device specific files of a plugin through an index.
+
+This file is copied in the plugins using it by their build.py and executed by
+their entry.py before their common.py, like common.py itself.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from typing import TYPE_CHECKING, Any
+
+from twisted.web.resource import NoResource, Resource
+
+if TYPE_CHECKING:
+    from twisted.web.server import Request
+
+logger = logging.getLogger('plugin.device_files')
+
+
+class DeviceFileIndex:
+    """In-memory index of the device specific files of a directory.
+
+    The index is built with a single scandir pass and then kept up to date by
+    the plugin when it writes or removes a device specific file, so that a
+    request for the file of an unknown device can be answered without a stat.
+    Files written by something else than the plugin are found by rebuilding
+    the index on a miss, only if the modification time of a directory where
+    the file could be has changed since the index was built.
+
+    When sharded, device specific files are written in a subdirectory named
+    after the first group of filename_regex, e.g. the last two digits of the
+    MAC address, instead of all in the same directory. Files written before
+    sharding was enabled are still found until the device is reconfigured.
+    """
+
+    _SHARD_REGEX = re.compile(rb'[0-9a-fA-F]{2}')
+
+    def __init__(
+        self,
+        directory: str,
+        url_path: bytes,
+        filename_regex: re.Pattern[bytes],
+        sharded: bool = False,
+    ) -> None:
+        self._directory = directory
+        self._url_path = url_path
+        self._filename_regex = filename_regex
+        self._sharded = sharded
+        # filename -> path relative to the directory, or None when the
+        # directory could not be scanned, i.e. nothing is known
+        self._files: dict[bytes, bytes] | None = None
+        # scanned directory, relative to the directory -> its st_mtime_ns
+        self._mtimes: dict[bytes, int] = {}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        files: dict[bytes, bytes] = {}
+        mtimes: dict[bytes, int] = {}
+        directory = os.fsencode(self._directory)
+        try:
+            # stat before the scan, so that a change during it is not missed
+            mtimes[b''] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if self._filename_regex.fullmatch(entry.name):
+                        files.setdefault(entry.name, entry.name)
+                    elif self._SHARD_REGEX.fullmatch(entry.name) and entry.is_dir():
+                        mtimes[entry.name] = entry.stat().st_mtime_ns
+                        self._scan_shard(entry, files)
+        except OSError as e:
+            logger.info('could not index device files: %s', e)
+            self._files = None
+        else:
+            self._files = files
+        self._mtimes = mtimes
+
+    def _scan_shard(self, shard: os.DirEntry[bytes], files: dict[bytes, bytes]) -> None:
+        with os.scandir(shard.path) as entries:
+            for entry in entries:
+                if self._filename_regex.fullmatch(entry.name):
+                    files[entry.name] = shard.name + b'/' + entry.name
+
+    def _layout_path(self, filename: bytes) -> bytes:
+        if self._sharded:
+            m = self._filename_regex.fullmatch(filename)
+            if m:
+                return m.group(1) + b'/' + filename
+        return filename
+
+    def _relative_path(self, filename: bytes) -> bytes:
+        if self._files is not None and filename in self._files:
+            return self._files[filename]
+        return self._layout_path(filename)
+
+    def _mtime(self, relative_dir: bytes) -> int | None:
+        try:
+            return os.stat(
+                os.path.join(os.fsencode(self._directory), relative_dir)
+            ).st_mtime_ns
+        except OSError:
+            return None
+
+    def _has_changed(self, filename: bytes) -> bool:
+        # Return True if a file could have been added where filename would be
+        # since the index was built, i.e. in the directory or in its shard
+        relative_dirs = [b'']
+        m = self._filename_regex.fullmatch(filename)
+        if m:
+            relative_dirs.append(m.group(1))
+        return any(
+            self._mtime(relative_dir) != self._mtimes.get(relative_dir)
+            for relative_dir in relative_dirs
+        )
+
+    def _is_unknown(self, filename: bytes) -> bool:
+        if self._files is None or filename in self._files:
+            return False
+        if not self._has_changed(filename):
+            return True
+        self.rebuild()
+        return self._files is not None and filename not in self._files
+
+    def path(self, filename: str) -> str:
+        """Return the pathname of the device specific file filename."""
+        relative_path = self._relative_path(os.fsencode(filename))
+        return os.path.join(self._directory, os.fsdecode(relative_path))
+
+    def new_path(self, filename: str) -> str:
+        """Return the pathname where to write the device specific file filename."""
+        relative_path = os.fsdecode(self._layout_path(os.fsencode(filename)))
+        path = os.path.join(self._directory, relative_path)
+        if relative_path != filename:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def add(self, filename: str) -> None:
+        """Record that filename has been written at its new_path."""
+        if self._files is None:
+            return
+        raw_filename = os.fsencode(filename)
+        relative_path = self._layout_path(raw_filename)
+        old_relative_path = self._files.get(raw_filename, relative_path)
+        self._files[raw_filename] = relative_path
+        if old_relative_path != relative_path:
+            # written before the layout changed, would be served otherwise
+            try:
+                os.remove(os.path.join(os.fsencode(self._directory), old_relative_path))
+            except OSError as e:
+                logger.info('error while removing file: %s', e)
+
+    def discard(self, filename: str) -> None:
+        if self._files is not None:
+            self._files.pop(os.fsencode(filename), None)
+
+    def resolve(self, path: bytes) -> bytes | None:
+        """Return the path to serve for the request path path.
+
+        Return None if path is known to be a device specific file that does
+        not exist.
+        """
+        if not path.startswith(self._url_path):
+            return path
+        filename = path[len(self._url_path) :]
+        if not self._filename_regex.fullmatch(filename):
+            return path
+        if self._is_unknown(filename):
+            return None
+        return self._url_path + self._relative_path(filename)
+
+    def is_missing(self, path: bytes) -> bool:
+        """Return True if path is known to be a device specific file that does
+        not exist.
+        """
+        return self.resolve(path) is None
+
+
+class DeviceFileHTTPService(Resource):
+    """Wrapper of an HTTP service serving the device specific files through a
+    DeviceFileIndex.
+
+    Requests for files missing from the index are answered with a 404 without
+    touching the disk, and the others are rewritten to where the file is.
+    """
+
+    def __init__(self, service: Resource, device_file_index: DeviceFileIndex) -> None:
+        self._service = service
+        super().__init__()
+        self._device_file_index = device_file_index
+        self.not_found = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._service, name)
+
+    def getChildWithDefault(self, path: bytes, request: Request) -> Resource:
+        resolved_path = self._device_file_index.resolve(request.path)
+        if resolved_path is None:
+            self.not_found += 1
+            return NoResource()
+        if resolved_path != request.path:
+            # the remaining path segments are traversed from the returned child
+            path, *request.postpath = resolved_path.lstrip(b'/').split(b'/')
+        return self._service.getChildWithDefault(path, request)
+
+    def render(self, request: Request) -> bytes:
+        return self._service.render(request)
@@ -0,0 +1,106 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Caching of the device info extracted from HTTP requests by a plugin.
+
+This file is copied in the plugins using it by their build.py and executed by
+their entry.py before their common.py, like common.py itself.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Mapping,
+    Optional,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from wazo_provd.servers.http_site import Request
+
+logger = logging.getLogger('plugin.extraction')
+
+_DevInfoT = TypeVar('_DevInfoT', bound=Optional[Mapping])
+
+
+class ExtractionCache:
+    """Bounded LRU cache of HTTP device info extraction results.
+
+    The User-Agent and path of a request fully determine what can be extracted
+    from it, so results are cached on them, including "no match" results.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._maxsize = maxsize
+        self._results: OrderedDict[tuple[Any, Any], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_extract(
+        self, request: Request, extract: Callable[[Request], _DevInfoT]
+    ) -> _DevInfoT:
+        key = (request.getHeader(b'User-Agent'), request.path)
+        try:
+            dev_info = self._results[key]
+        except KeyError:
+            self.misses += 1
+            dev_info = self._results[key] = extract(request)
+            if len(self._results) > self._maxsize:
+                self._results.popitem(last=False)
+        else:
+            self.hits += 1
+            self._results.move_to_end(key)
+        # the caller is free to modify the returned dict
+        return copy.copy(dev_info)
+
+    def clear(self) -> None:
+        self._results.clear()
+
+
+class VDICache(Generic[_DevInfoT]):
+    """Cache of the device info extracted from DHCP vendor class identifiers.
+
+    The device info of the known VDIs, i.e. those sent by the supported
+    devices, is extracted once when the cache is created and always kept. The
+    others are learned in a bounded LRU cache, since a network only has a few
+    distinct VDIs.
+    """
+
+    def __init__(
+        self,
+        extract: Callable[[str], _DevInfoT],
+        known_vdis: Iterable[str] = (),
+        maxsize: int = 256,
+    ) -> None:
+        self._extract = extract
+        self._known = {vdi: extract(vdi) for vdi in known_vdis}
+        self._learned: OrderedDict[str, _DevInfoT] = OrderedDict()
+        self._maxsize = maxsize
+
+    def lookup(self, vdi: str) -> _DevInfoT:
+        try:
+            dev_info = self._known[vdi]
+        except KeyError:
+            try:
+                dev_info = self._learned[vdi]
+            except KeyError:
+                dev_info = self._learned[vdi] = self._extract(vdi)
+                if len(self._learned) > self._maxsize:
+                    evicted_vdi, _ = self._learned.popitem(last=False)
+                    logger.debug('VDI cache full, forgetting %r', evicted_vdi)
+            else:
+                self._learned.move_to_end(vdi)
+        # the caller is free to modify the returned dict
+        return copy.copy(dev_info)
+
+    def clear(self) -> None:
+        """Forget the learned VDIs, the known ones are kept."""
+        self._learned.clear()
@@ -0,0 +1,107 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Support tables of the plugin associators.
+
+The support_table method of an associator returns what its _do_associate
+evaluates as data, so that the tables of all the installed plugins can be
+merged into one index. A support table maps each vendor to a VendorSupport,
+the vendors not in it are IMPROBABLE, and support_level looks it up.
+
+This file is copied in the plugins using it by their build.py and executed by
+their entry.py before their common.py, like common.py itself.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Mapping, NamedTuple
+
+try:
+    from wazo_provd.devices.pgasso import DeviceSupport
+except ImportError:
+    # Compatibility with wazo < 24.02
+    from provd.devices.pgasso import DeviceSupport
+
+
+def parse_version(version: str) -> tuple[int, ...]:
+    # Parse a "X.Y.Z..." firmware version into a tuple that compares like the
+    # PEP 440 release segment, i.e. without its trailing zeros. Raise a
+    # ValueError if the version is not of this form.
+    release = [int(part) for part in version.split('.')]
+    while release and release[-1] == 0:
+        release.pop()
+    return tuple(release)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parsed_version(version: str) -> tuple[int, ...] | None:
+    try:
+        return parse_version(version)
+    except ValueError:
+        return None
+
+
+class VendorSupport(NamedTuple):
+    """How a plugin supports the devices of a vendor.
+
+    The rules are applied in this order:
+    - devices without a version are no_version, unless it is None
+    - devices with a version lower than min_version are NONE
+    - devices without a model are no_model, or unknown_model if it is None
+    - models starting with one of unsupported_model_prefixes are NONE
+    - models not in models are unknown_model
+    - models map to their exact version, or to None if they have none. They
+      are EXACT on it, or on any version starting with it when
+      exact_version_prefix is true, and known_model otherwise.
+    """
+
+    models: Mapping[str, str | None]
+    unknown_model: int
+    known_model: int = DeviceSupport.COMPLETE
+    no_model: int | None = None
+    no_version: int | None = None
+    min_version: tuple[int, ...] | None = None
+    unsupported_model_prefixes: tuple[str, ...] = ()
+    exact_version_prefix: bool = False
+
+
+def support_level(
+    support_table: Mapping[str, VendorSupport],
+    vendor: str,
+    model: str | None,
+    version: str | None,
+) -> int:
+    """Return the support of (vendor, model, version) given by support_table.
+
+    This is what the _do_associate method of the associator which returned
+    support_table returns.
+    """
+    try:
+        support = support_table[vendor]
+    except KeyError:
+        return DeviceSupport.IMPROBABLE
+    if version is None:
+        if support.no_version is not None:
+            return support.no_version
+    elif support.min_version is not None:
+        parsed_version = _parsed_version(version)
+        if parsed_version is not None and parsed_version < support.min_version:
+            return DeviceSupport.NONE
+    if model is None:
+        if support.no_model is not None:
+            return support.no_model
+        return support.unknown_model
+    if model.startswith(support.unsupported_model_prefixes):
+        return DeviceSupport.NONE
+    try:
+        exact_version = support.models[model]
+    except KeyError:
+        return support.unknown_model
+    if exact_version is not None:
+        if support.exact_version_prefix:
+            if version and version.startswith(exact_version):
+                return DeviceSupport.EXACT
+        elif version == exact_version:
+            return DeviceSupport.EXACT
+    return support.known_model
@@ -0,0 +1,71 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..config_files import ConfigFileWriter
+
+
+class TestConfigFileWriter:
+    @staticmethod
+    def _tpl_helper():
+        def dump(tpl, raw_config, filename, encoding):
+            with open(filename, 'w', encoding=encoding) as f:
+                f.write(tpl.format(**raw_config))
+
+        tpl_helper = MagicMock()
+        tpl_helper.dump.side_effect = dump
+        return tpl_helper
+
+    def test_dump(self, tmp_path):
+        path = tmp_path / '805ec0d57d72.cfg'
+        writer = ConfigFileWriter(self._tpl_helper())
+
+        assert writer.dump('line={line}', {'line': 1}, str(path), 'UTF-8')
+        assert path.read_text() == 'line=1'
+        stat = path.stat()
+        assert not writer.dump('line={line}', {'line': 1}, str(path), 'UTF-8')
+        assert path.stat().st_ino == stat.st_ino
+        assert path.stat().st_mtime_ns == stat.st_mtime_ns
+        assert writer.dump('line={line}', {'line': 2}, str(path), 'UTF-8')
+        assert path.read_text() == 'line=2'
+        assert (writer.written, writer.skipped) == (2, 1)
+        assert [p.name for p in tmp_path.iterdir()] == ['805ec0d57d72.cfg']
+
+    def test_dump_error(self, tmp_path):
+        path = tmp_path / '805ec0d57d72.cfg'
+        path.write_text('line=1')
+        tpl_helper = self._tpl_helper()
+        dump = tpl_helper.dump.side_effect
+
+        def failing_dump(tpl, raw_config, filename, encoding):
+            dump('line=', {}, filename, encoding)
+            raise KeyError('line')
+
+        tpl_helper.dump.side_effect = failing_dump
+        writer = ConfigFileWriter(tpl_helper)
+
+        with pytest.raises(KeyError):
+            writer.dump('line={line}', {}, str(path), 'UTF-8')
+        assert path.read_text() == 'line=1'
+        assert [p.name for p in tmp_path.iterdir()] == ['805ec0d57d72.cfg']
+
+    def test_dump_transform(self, tmp_path):
+        path = tmp_path / '805ec0d57d72.cfg'
+        writer = ConfigFileWriter(self._tpl_helper())
+
+        def transform(content: bytes) -> bytes:
+            return content.replace(b'2', b'1')
+
+        assert writer.dump('line={line}', {'line': 1}, str(path), 'UTF-8')
+        assert not writer.dump(
+            'line={line}', {'line': 2}, str(path), 'UTF-8', transform=transform
+        )
+        assert path.read_text() == 'line=1'
+        assert writer.dump('line={line}', {'line': 23}, str(path), 'UTF-8', transform)
+        assert path.read_text() == 'line=13'
+        assert [p.name for p in tmp_path.iterdir()] == ['805ec0d57d72.cfg']
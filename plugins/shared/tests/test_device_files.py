@@ -0,0 +1,137 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import os
+import re
+from unittest.mock import MagicMock, patch
+
+from ..device_files import DeviceFileHTTPService, DeviceFileIndex
+
+FILENAME_REGEX = re.compile(rb'[0-9a-f]{10}([0-9a-f]{2})\.cfg')
+
+
+class TestDeviceFileIndex:
+    def test_index(self, tmp_path):
+        (tmp_path / '805ec0d57d72.cfg').touch()
+        (tmp_path / 'y000000000028.cfg').touch()
+        index = DeviceFileIndex(str(tmp_path), b'/', FILENAME_REGEX)
+
+        assert not index.is_missing(b'/805ec0d57d72.cfg')
+        assert index.is_missing(b'/805ec0d57d73.cfg')
+        assert not index.is_missing(b'/y000000000028.cfg')
+        assert not index.is_missing(b'/y000000000029.cfg')
+        assert not index.is_missing(b'/firmware/805ec0d57d73.cfg')
+
+        index.add('805ec0d57d73.cfg')
+        index.discard('805ec0d57d72.cfg')
+        assert not index.is_missing(b'/805ec0d57d73.cfg')
+        assert index.is_missing(b'/805ec0d57d72.cfg')
+
+    def test_index_of_unreadable_directory(self, tmp_path):
+        index = DeviceFileIndex(str(tmp_path / 'missing'), b'/', FILENAME_REGEX)
+        index.add('805ec0d57d72.cfg')
+        assert not index.is_missing(b'/805ec0d57d73.cfg')
+
+    def test_sharded_index(self, tmp_path):
+        (tmp_path / '805ec0d57d72.cfg').touch()
+        (tmp_path / '05').mkdir()
+        (tmp_path / '05' / '001565123405.cfg').touch()
+        index = DeviceFileIndex(
+            str(tmp_path),
+            b'/',
+            FILENAME_REGEX,
+            sharded=True,
+        )
+
+        assert index.resolve(b'/805ec0d57d72.cfg') == b'/805ec0d57d72.cfg'
+        assert index.resolve(b'/001565123405.cfg') == b'/05/001565123405.cfg'
+        assert index.resolve(b'/001565123406.cfg') is None
+        assert index.resolve(b'/y000000000028.cfg') == b'/y000000000028.cfg'
+        assert index.path('805ec0d57d72.cfg') == str(tmp_path / '805ec0d57d72.cfg')
+
+        path = index.new_path('805ec0d57d72.cfg')
+        assert path == str(tmp_path / '72' / '805ec0d57d72.cfg')
+        assert (tmp_path / '72').is_dir()
+        (tmp_path / '72' / '805ec0d57d72.cfg').touch()
+        index.add('805ec0d57d72.cfg')
+        assert index.resolve(b'/805ec0d57d72.cfg') == b'/72/805ec0d57d72.cfg'
+        assert not (tmp_path / '805ec0d57d72.cfg').exists()
+
+    def test_sharded_index_of_uppercase_filenames(self, tmp_path):
+        (tmp_path / '3A').mkdir()
+        (tmp_path / '3A' / 'snomD785-000413AB003A.htm').touch()
+        index = DeviceFileIndex(
+            str(tmp_path),
+            b'/',
+            re.compile(rb'(?:snom\w+-)?[0-9A-F]{10}([0-9A-F]{2})\.(?:htm|xml)'),
+            sharded=True,
+        )
+
+        assert (
+            index.resolve(b'/snomD785-000413AB003A.htm')
+            == b'/3A/snomD785-000413AB003A.htm'
+        )
+        assert index.resolve(b'/000413AB003A.xml') is None
+        assert index.resolve(b'/snomD785.htm') == b'/snomD785.htm'
+        assert index.new_path('000413AB003A.xml') == str(
+            tmp_path / '3A' / '000413AB003A.xml'
+        )
+
+    def test_http_service(self, tmp_path):
+        index = DeviceFileIndex(str(tmp_path), b'/', FILENAME_REGEX)
+        wrapped_service = MagicMock()
+        service = DeviceFileHTTPService(wrapped_service, index)
+        request = MagicMock(path=b'/805ec0d57d72.cfg')
+
+        resource = service.getChildWithDefault(b'805ec0d57d72.cfg', request)
+        assert resource is not wrapped_service.getChildWithDefault.return_value
+        index.add('805ec0d57d72.cfg')
+        resource = service.getChildWithDefault(b'805ec0d57d72.cfg', request)
+        assert resource is wrapped_service.getChildWithDefault.return_value
+        assert service.not_found == 1
+
+    def test_sharded_http_service(self, tmp_path):
+        (tmp_path / '72').mkdir()
+        (tmp_path / '72' / '805ec0d57d72.cfg').touch()
+        index = DeviceFileIndex(
+            str(tmp_path),
+            b'/Fanvil/',
+            FILENAME_REGEX,
+            sharded=True,
+        )
+        wrapped_service = MagicMock()
+        service = DeviceFileHTTPService(wrapped_service, index)
+        request = MagicMock(path=b'/Fanvil/805ec0d57d72.cfg')
+        request.postpath = [b'805ec0d57d72.cfg']
+
+        service.getChildWithDefault(b'Fanvil', request)
+        wrapped_service.getChildWithDefault.assert_called_once_with(b'Fanvil', request)
+        assert request.postpath == [b'72', b'805ec0d57d72.cfg']
+
+    def test_rebuild_on_miss_if_directory_changed(self, tmp_path):
+        index = DeviceFileIndex(str(tmp_path), b'/', FILENAME_REGEX)
+        (tmp_path / '805ec0d57d72.cfg').touch()
+        os.utime(tmp_path, ns=(0, 0))
+
+        assert not index.is_missing(b'/805ec0d57d72.cfg')
+        assert index.is_missing(b'/805ec0d57d73.cfg')
+
+    def test_rebuild_on_miss_if_shard_changed(self, tmp_path):
+        (tmp_path / '72').mkdir()
+        index = DeviceFileIndex(str(tmp_path), b'/', FILENAME_REGEX, sharded=True)
+        (tmp_path / '72' / '805ec0d57d72.cfg').touch()
+        os.utime(tmp_path / '72', ns=(0, 0))
+
+        assert index.resolve(b'/805ec0d57d72.cfg') == b'/72/805ec0d57d72.cfg'
+
+    def test_no_rebuild_on_miss_if_unchanged(self, tmp_path):
+        (tmp_path / '72').mkdir()
+        index = DeviceFileIndex(str(tmp_path), b'/', FILENAME_REGEX)
+
+        with patch.object(index, 'rebuild', wraps=index.rebuild) as rebuild:
+            assert index.is_missing(b'/805ec0d57d72.cfg')
+            assert index.is_missing(b'/805ec0d57d73.cfg')
+            assert index.is_missing(b'/805ec0d57d72.cfg')
+        rebuild.assert_not_called()
@@ -0,0 +1,112 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from ..extraction import ExtractionCache, VDICache
+
+
+def _request(ua: bytes, path: bytes) -> MagicMock:
+    request = MagicMock()
+    request.getHeader.return_value = ua
+    request.path = path
+    return request
+
+
+class TestExtractionCache:
+    def test_get_or_extract(self):
+        cache = ExtractionCache()
+        extract = MagicMock(return_value={'vendor': 'Yealink'})
+
+        dev_info = cache.get_or_extract(_request(b'Yealink', b'/a.cfg'), extract)
+        dev_info['mac'] = '00:15:65:00:00:01'
+        dev_info = cache.get_or_extract(_request(b'Yealink', b'/a.cfg'), extract)
+
+        assert dev_info == {'vendor': 'Yealink'}
+        extract.assert_called_once()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_no_match_cached(self):
+        cache = ExtractionCache()
+        extract = MagicMock(return_value=None)
+
+        for _ in range(2):
+            assert cache.get_or_extract(_request(b'curl', b'/'), extract) is None
+        extract.assert_called_once()
+
+    def test_least_recently_used_evicted(self):
+        cache = ExtractionCache(maxsize=2)
+        extract = MagicMock(return_value=None)
+
+        for path in (b'/a', b'/b', b'/a', b'/c', b'/a', b'/b'):
+            cache.get_or_extract(_request(b'UA', path), extract)
+
+        assert [call.args[0].path for call in extract.call_args_list] == [
+            b'/a',
+            b'/b',
+            b'/c',
+            b'/b',
+        ]
+
+    def test_clear(self):
+        cache = ExtractionCache()
+        extract = MagicMock(return_value=None)
+
+        cache.get_or_extract(_request(b'UA', b'/a'), extract)
+        cache.clear()
+        cache.get_or_extract(_request(b'UA', b'/a'), extract)
+
+        assert extract.call_count == 2
+
+
+class TestVDICache:
+    @staticmethod
+    def _extract(vdi: str) -> dict | None:
+        if vdi.startswith('digium_'):
+            return {'vendor': 'Digium', 'model': vdi.split('_')[1]}
+        return None
+
+    def test_known_vdis_extracted_once(self):
+        extract = MagicMock(side_effect=self._extract)
+        cache = VDICache(extract, ['digium_D40_1_0_5_46476'])
+
+        dev_info = cache.lookup('digium_D40_1_0_5_46476')
+        assert dev_info == {'vendor': 'Digium', 'model': 'D40'}
+        dev_info['mac'] = '00:0f:d3:00:00:01'
+        assert cache.lookup('digium_D40_1_0_5_46476') == {
+            'vendor': 'Digium',
+            'model': 'D40',
+        }
+        extract.assert_called_once_with('digium_D40_1_0_5_46476')
+
+    def test_learned_vdis_evicted_but_not_known_ones(self):
+        extract = MagicMock(side_effect=self._extract)
+        cache = VDICache(extract, ['digium_D40_1_0_5_46476'], maxsize=2)
+
+        for vdi in ('a', 'b', 'a', 'c', 'a', 'b', 'digium_D40_1_0_5_46476'):
+            cache.lookup(vdi)
+
+        assert [call.args[0] for call in extract.call_args_list] == [
+            'digium_D40_1_0_5_46476',
+            'a',
+            'b',
+            'c',
+            'b',
+        ]
+
+    def test_clear_keeps_known_vdis(self):
+        extract = MagicMock(side_effect=self._extract)
+        cache = VDICache(extract, ['digium_D40_1_0_5_46476'])
+
+        cache.lookup('a')
+        cache.clear()
+        cache.lookup('a')
+        cache.lookup('digium_D40_1_0_5_46476')
+
+        assert [call.args[0] for call in extract.call_args_list] == [
+            'digium_D40_1_0_5_46476',
+            'a',
+            'a',
+        ]
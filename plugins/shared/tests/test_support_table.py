@@ -0,0 +1,115 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+import pytest
+
+from ..support_table import VendorSupport, parse_version, support_level
+
+MODEL_VERSIONS = {'M1': '1.2.3', 'M2': '10.1.4.2'}
+MODELS = list(MODEL_VERSIONS)
+VERSION = '8.7.5.35'
+
+# (common.py module, associator class, constructor arguments)
+ASSOCIATORS: list[tuple[str, str, tuple[Any, ...]]] = [
+    ('wazo_aastra.common', 'BaseAastraPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_alcatel.v1_51_52', 'BaseAlcatelMyriadPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_alcatel.v2_01_10', 'BaseAlcatelPgAssociator', (MODELS, VERSION)),
+    ('wazo_alcatel.v2_13_02', 'BaseAlcatelMyriadPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_avaya.common', 'BaseAvayaPgAssociator', (MODELS, VERSION)),
+    ('wazo_cisco_sccp.common', 'BaseCiscoPgAssociator', (MODELS,)),
+    ('wazo_cisco_sip.common', 'BaseCiscoPgAssociator', (MODELS,)),
+    ('wazo_cisco_sip.v11_1_0', 'BaseCiscoPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_cisco_sip.v11_3_1', 'BaseCiscoPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_cisco_sip.v12_0_1', 'BaseCiscoPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_cisco_spa.common', 'BaseCiscoPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_digium.common', 'DigiumPgAssociator', (VERSION,)),
+    ('wazo_fanvil.common', 'BaseFanvilPgAssociator', (MODELS,)),
+    ('wazo_gigaset.common', 'BaseGigasetPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_gigaset.common_c', 'BaseGigasetPgAssociator', (MODELS,)),
+    ('wazo_gigaset.N870_83_v2_39_0', 'BaseGigasetPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_gigaset.N870_83_v2_48_0', 'BaseGigasetPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_gigaset.Nx70_83_v2_49_1', 'BaseGigasetPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_grandstream.common', 'BaseGrandstreamPgAssociator', (MODELS, '1.2')),
+    ('wazo_grandstream.common_ata', 'BaseGrandstreamPgAssociator', (MODELS, '1.2')),
+    ('wazo_htek.common', 'BaseHtekPgAssociator', (MODEL_VERSIONS,)),
+    ('wazo_panasonic.common', 'BasePanasonicPgAssociator', (MODELS, VERSION)),
+    ('wazo_patton.common', 'BasePattonPgAssociator', (MODELS, VERSION)),
+    ('wazo_polycom.common', 'BasePolycomPgAssociator', (MODELS,)),
+    ('wazo_polycom.common_v3', 'BasePolycomPgAssociator', (MODELS, VERSION)),
+    ('wazo_snom.common', 'BaseSnomPgAssociator', (MODELS, VERSION)),
+    ('wazo_snom.common_dect', 'BaseSnomPgAssociator', (MODELS, '05.20.0001')),
+    ('wazo_technicolor.common', 'BaseTechnicolorPgAssociator', ('M1', VERSION)),
+    ('wazo_zenitel.common', 'BaseZenitelPgAssociator', ()),
+]
+
+VENDORS = [
+    'Aastra',
+    'Alcatel-Lucent',
+    'Avaya',
+    'Cisco',
+    'Digium',
+    'Fanvil',
+    'Gigaset',
+    'Grandstream',
+    'Htek',
+    'Panasonic',
+    'Patton',
+    'Polycom',
+    'Snom',
+    'Technicolor',
+    'Yealink',
+    'Zenitel',
+    '',
+]
+TEST_MODELS = [*MODELS, 'D40', 'IP station', 'SPA504G', 'ATA190', 'X1', '', None]
+TEST_VERSIONS = [
+    *MODEL_VERSIONS.values(),
+    VERSION,
+    '1.2.5.3',
+    '05.20.0001',
+    '04.0',
+    '6.5.20',
+    'x.y',
+    '',
+    None,
+]
+
+
+def _new_associator(module: str, class_name: str, args: tuple[Any, ...]) -> Any:
+    common = importlib.import_module(f'plugins.{module}.common')
+    return getattr(common, class_name)(*args)
+
+
+@pytest.mark.parametrize('module,class_name,args', ASSOCIATORS)
+def test_support_table_matches_association(module, class_name, args):
+    associator = _new_associator(module, class_name, args)
+    support_table = associator.support_table()
+
+    for vendor in VENDORS:
+        for model in TEST_MODELS:
+            for version in TEST_VERSIONS:
+                assert support_level(
+                    support_table, vendor, model, version
+                ) == associator._do_associate(vendor, model, version), (
+                    vendor,
+                    model,
+                    version,
+                )
+
+
+def test_parse_version():
+    assert parse_version('8.7.5.35') == (8, 7, 5, 35)
+    assert parse_version('7.0.0.0') == parse_version('7') == (7,)
+    with pytest.raises(ValueError):
+        parse_version('8.7.5-beta')
+
+
+def test_support_level_unknown_vendor():
+    support_table = {'Snom': VendorSupport({'D785': None}, 3)}
+
+    assert support_level(support_table, 'Yealink', 'D785', None) == 1
@@ -0,0 +1,64 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import weakref
+from unittest.mock import MagicMock, patch
+
+import pytest
+from wazo_provd.tzinform import TimezoneNotFoundError
+
+from ..timezones import TimezoneCache, TimezoneResolver
+
+
+class TestTimezoneCache:
+    @patch('plugins.shared.timezones.tzinform')
+    def test_format(self, tzinform):
+        cache = TimezoneCache(TimezoneResolver({}))
+        formatter = MagicMock()
+
+        for _ in range(2):
+            value = cache.format('America/Montreal', formatter)
+            assert value is formatter.return_value
+        tzinform.get_timezone_info.assert_called_once_with('America/Montreal')
+        formatter.assert_called_once_with(tzinform.get_timezone_info.return_value)
+
+    @patch('plugins.shared.timezones.tzinform')
+    def test_format_method(self, tzinform):
+        class Formatter:
+            calls = 0
+
+            def format(self, tzinfo):
+                type(self).calls += 1
+                return tzinfo
+
+        cache = TimezoneCache(TimezoneResolver({}))
+        formatter = Formatter()
+        formatter_ref = weakref.ref(formatter)
+
+        cache.format('America/Montreal', formatter.format)
+        del formatter
+        assert formatter_ref() is None
+        value = cache.format('America/Montreal', Formatter().format)
+        assert value is tzinform.get_timezone_info.return_value
+        assert Formatter.calls == 1
+
+    @patch('plugins.shared.timezones.tzinform')
+    def test_unknown_timezone_not_cached(self, tzinform):
+        tzinform.get_timezone_info.side_effect = TimezoneNotFoundError
+        cache = TimezoneCache(TimezoneResolver({}))
+
+        for _ in range(2):
+            with pytest.raises(TimezoneNotFoundError):
+                cache.format('Doesnt/Exist', MagicMock())
+        assert tzinform.get_timezone_info.call_count == 2
+
+    @patch('plugins.shared.timezones.tzinform')
+    def test_timezone_info_shared(self, tzinform):
+        caches = [TimezoneCache(), TimezoneCache()]
+
+        for cache in caches:
+            value = cache.format('America/Montreal', lambda tzinfo: tzinfo)
+            assert value is tzinform.get_timezone_info.return_value
+        tzinform.get_timezone_info.assert_called_once_with('America/Montreal')
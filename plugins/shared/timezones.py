@@ -0,0 +1,75 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Memoized timezone info, and values formatted from it by the plugins.
+
+This file is copied in the plugins using it by their build.py and executed by
+their entry.py before their common.py, like common.py itself.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+try:
+    from wazo_provd import tzinform
+except ImportError:
+    # Compatibility with wazo < 24.02
+    from provd import tzinform
+
+
+def _process_timezone_infos() -> dict[str, Any]:
+    # Each plugin executes its own copy of this file, so the timezone infos are
+    # kept in the tzinform module they all import to be shared by the process.
+    return vars(tzinform).setdefault('_plugins_timezone_infos', {})
+
+
+class TimezoneResolver:
+    """Memoized tzinform.get_timezone_info.
+
+    By default, the timezone infos are shared by all the plugins of the
+    process. Unknown timezones are not cached.
+    """
+
+    def __init__(self, tzinfos: dict[str, Any] | None = None) -> None:
+        self._tzinfos = _process_timezone_infos() if tzinfos is None else tzinfos
+
+    def get_timezone_info(self, tz_name: str) -> Any:
+        try:
+            return self._tzinfos[tz_name]
+        except KeyError:
+            tzinfo = self._tzinfos[tz_name] = tzinform.get_timezone_info(tz_name)
+            return tzinfo
+
+
+class TimezoneCache:
+    """Values formatted by a plugin from the timezone info.
+
+    A deployment only uses a handful of timezones, so what the plugin formats
+    from the timezone info is computed once per timezone and formatter instead
+    of on every configure.
+    """
+
+    def __init__(self, resolver: TimezoneResolver | None = None) -> None:
+        self._resolver = TimezoneResolver() if resolver is None else resolver
+        self._values: dict[tuple[str, Callable[..., Any], type], Any] = {}
+
+    def get_timezone_info(self, tz_name: str) -> Any:
+        return self._resolver.get_timezone_info(tz_name)
+
+    def format(self, tz_name: str, formatter: Callable[[Any], Any]) -> Any:
+        """Return formatter(timezone info of tz_name), computed only once.
+
+        A method is keyed on its function and class, not on its instance, so
+        the value is shared by the instances of a plugin class and the cache
+        doesn't keep them alive.
+
+        Raise tzinform.TimezoneNotFoundError if the timezone is unknown.
+        """
+        function = getattr(formatter, '__func__', formatter)
+        key = (tz_name, function, type(getattr(formatter, '__self__', None)))
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = formatter(self.get_timezone_info(tz_name))
+            return value
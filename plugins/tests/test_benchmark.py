@@ -0,0 +1,59 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+from .. import benchmark, pgbuild
+
+PLUGINS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = [('wazo_digium', '2.8.1'), ('wazo_snom', '10.1.184.15')]
+
+
+@pytest.fixture()
+def plugins_dir(tmp_path):
+    for build_plugin_name, target_id in TARGETS:
+        build_plugin = pgbuild.BuildPlugin(os.path.join(PLUGINS_DIR, build_plugin_name))
+        build_plugin.build(target_id, str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture()
+def restore_modules():
+    # load_plugins installs a stub wazo_provd package
+    modules = dict(sys.modules)
+    yield
+    for name in set(sys.modules) - set(modules):
+        del sys.modules[name]
+    sys.modules.update(modules)
+
+
+def _cache_misses(plugins: list[benchmark.LoadedPlugin]) -> int:
+    (snom,) = (plugin for plugin in plugins if plugin.id.startswith('wazo-snom'))
+    return snom.extractors['http']._extraction_cache.misses
+
+
+@pytest.mark.usefixtures('restore_modules')
+def test_replay_corpus(plugins_dir):
+    plugins = benchmark.load_plugins(plugins_dir)
+    requests = benchmark._read_corpus(None)
+    assert [plugin.id for plugin in plugins] == [
+        'wazo-digium-2.8.1',
+        'wazo-snom-10.1.184.15',
+    ]
+
+    plugins_stats, total_stats = benchmark.run_benchmark(plugins, requests, 2)
+    warm_misses = _cache_misses(plugins)
+    assert all(stats.ops for stats in plugins_stats)
+    assert total_stats.ops == sum(stats.ops for stats in plugins_stats)
+
+    plugins_stats, total_stats = benchmark.run_benchmark(
+        plugins, requests, 2, cold=True
+    )
+    # extracted again in each timed round and in the allocations round
+    assert _cache_misses(plugins) - warm_misses == 3 * warm_misses > 0
+    assert total_stats.ops == sum(stats.ops for stats in plugins_stats)
@@ -0,0 +1,125 @@
+# Copyright 2024 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+
+from .. import pgbuild
+
+
+class TestModelIndex:
+    def test_model_names(self):
+        assert pgbuild._model_names('T31(P)(G)') == ['T31', 'T31P', 'T31G']
+        assert pgbuild._model_names('X3S/X3SP/G') == ['X3S', 'X3SP', 'X3SG']
+        assert pgbuild._model_names('N720 IP/DM PRO') == ['N720 IP PRO', 'N720 DM PRO']
+        assert pgbuild._model_names('T46S') == ['T46S']
+
+    def test_build_model_index(self, monkeypatch):
+        stderr = io.StringIO()
+        monkeypatch.setattr(pgbuild, 'stderr', stderr)
+        capabilities = {'sip.lines': 1}
+        plugin_manifest = {
+            'wazo-yealink-v86': {
+                'version': '1.0',
+                'capabilities': {
+                    'Yealink, T54(W), 86.0.1': capabilities,
+                    'Yealink, T54W': {},
+                },
+            },
+        }
+
+        index = pgbuild._build_model_index(plugin_manifest)  # type: ignore[arg-type]
+
+        assert 'ignoring capabilities' in stderr.getvalue()
+        assert index['capabilities'] == {
+            'wazo-yealink-v86': {'Yealink, T54(W), 86.0.1': capabilities}
+        }
+        models = index['vendors']['Yealink']
+        assert list(models) == ['T54', 'T54W']
+        assert models['T54W'] == [
+            {
+                'plugin': 'wazo-yealink-v86',
+                'version': '1.0',
+                'device': 'Yealink, T54(W), 86.0.1',
+                'model': 'T54(W)',
+                'firmware_version': '86.0.1',
+            }
+        ]
+
+
+class TestWriteDBFiles:
+    def test_write(self, tmp_path):
+        db_file = str(tmp_path / 'plugins.db')
+        (tmp_path / 'plugins.db.delta').write_text('{}')
+
+        pgbuild._write_db_files(db_file, {'a': {'version': '1'}}, False)  # type: ignore
+        assert not (tmp_path / 'plugins.db.delta').exists()
+        pgbuild._write_db_files(db_file, {'b': {'version': '1'}}, False)  # type: ignore
+
+        content = (tmp_path / 'plugins.db').read_bytes()
+        db_hash = hashlib.sha256(content).hexdigest()
+        assert (tmp_path / 'plugins.db.sha256').read_text() == f'{db_hash}\n'
+        assert gzip.decompress((tmp_path / 'plugins.db.gz').read_bytes()) == content
+        delta = json.loads((tmp_path / 'plugins.db.delta').read_text())
+        assert delta['to'] == db_hash
+        assert delta['updated'] == {'b': {'version': '1'}}
+        assert delta['removed'] == ['a']
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            'plugins.db',
+            'plugins.db.delta',
+            'plugins.db.gz',
+            'plugins.db.sha256',
+        ]
+
+
+BUILD_PY = '''\
+VERSION = '{version}'
+
+
+@target('1', 'wazo-test-1')
+def build_1(path):
+    copy_tree('common/', path)
+'''
+
+
+class TestBuildPlugin:
+    def _input_digest(self, path, version):
+        (path / 'build.py').write_text(BUILD_PY.format(version=version))
+        return pgbuild.BuildPlugin(str(path)).input_digest('1')
+
+    def test_input_digest(self, tmp_path):
+        (tmp_path / 'common').mkdir()
+        (tmp_path / 'common' / 'common.py').write_text('')
+
+        digest = self._input_digest(tmp_path, '1.0')
+        assert self._input_digest(tmp_path, '1.0') == digest
+        assert self._input_digest(tmp_path, '1.1') != digest
+        (tmp_path / 'common' / 'common.py').write_text('# changed')
+        assert self._input_digest(tmp_path, '1.0') != digest
+
+
+class TestDedup:
+    def test_deduplicated_plugin_packaged_identically(self, tmp_path):
+        plugin = tmp_path / 'wazo-test-1'
+        (plugin / 'var').mkdir(parents=True)
+        (plugin / 'a.cfg').write_text('content')
+        (plugin / 'var' / 'b.cfg').write_text('content')
+
+        pgbuild._create_package(
+            str(plugin), str(tmp_path / 'copies.tar.bz2'), 'bz2', None, True
+        )
+        pgbuild._dedup_files([str(plugin)])
+        assert (plugin / 'a.cfg').stat().st_nlink == 2
+        pgbuild._create_package(
+            str(plugin), str(tmp_path / 'hardlinks.tar.bz2'), 'bz2', None, True
+        )
+
+        package = (tmp_path / 'hardlinks.tar.bz2').read_bytes()
+        assert package == (tmp_path / 'copies.tar.bz2').read_bytes()
+        with tarfile.open(tmp_path / 'hardlinks.tar.bz2') as tar:
+            assert all(member.isreg() or member.isdir() for member in tar)
@@ -1,13 +1,9 @@
 # Copyright 2014-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,116 +17,114 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('3.3.1-SP4', 'wazo-aastra-3.3.1-SP4')
 def build_3_3_1_sp4(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--exclude',
-            '/templates/68*.tpl',
-            'common/',
-            path,
-        ]
+    copy_tree('common/', path, exclude=['/templates/68*.tpl'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v3_3_1_SP4/', path])
+    copy_tree('v3_3_1_SP4/', path)
 
 
 @target('4.3.0', 'wazo-aastra-4.3.0')
 def build_4_3_0(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--exclude',
-            '/templates/67*',
-            '--exclude',
-            '/templates/9*',
-            'common/',
-            path,
-        ]
+    copy_tree('common/', path, exclude=['/templates/67*', '/templates/9*'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v4_3_0/', path])
+    copy_tree('v4_3_0/', path)
 
 
 @target('4.2.0', 'wazo-aastra-4.2.0')
 def build_4_2_0(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--exclude',
-            '/templates/67*',
-            '--exclude',
-            '/templates/9*',
-            'common/',
-            path,
-        ]
+    copy_tree('common/', path, exclude=['/templates/67*', '/templates/9*'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v4_2_0/', path])
+    copy_tree('v4_2_0/', path)
 
 
 @target('5.0.0', 'wazo-aastra-5.0.0')
 def build_5_0_0(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--exclude',
-            '/templates/67*',
-            '--exclude',
-            '/templates/9*',
-            'common/',
-            path,
-        ]
+    copy_tree('common/', path, exclude=['/templates/67*', '/templates/9*'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v5_0_0/', path])
+    copy_tree('v5_0_0/', path)
 
 
 @target('5.1.0', 'wazo-aastra-5.1.0')
 def build_5_1_0(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--exclude',
-            '/templates/67*',
-            '--exclude',
-            '/templates/9*',
-            '--exclude',
-            '/templates/68*',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/', path, exclude=['/templates/67*', '/templates/9*', '/templates/68*']
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v5_1_0/', path])
+    copy_tree('v5_1_0/', path)
 
 
 @target('6.4.0-SP2', 'wazo-aastra-6.4.0-SP2')
 def build_6_4_0_sp2(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--exclude',
-            '/templates/67*',
-            '--exclude',
-            '/templates/9*',
-            'common/',
-            path,
-        ]
+    copy_tree('common/', path, exclude=['/templates/67*', '/templates/9*'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v6_4_0_SP2/', path])
+    copy_tree('v6_4_0_SP2/', path)
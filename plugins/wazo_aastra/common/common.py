@@ -8,6 +8,7 @@ import logging
 import os.path
 import re
 from operator import itemgetter
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import plugins, synchronize, tzinform
@@ -35,11 +36,28 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'DeviceFileIndex' not in globals():
+    # Executed beforehand from device_files.py by entry.py in a built plugin
+    from ...shared.device_files import DeviceFileHTTPService, DeviceFileIndex
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-aastra')
 
 
 class BaseAastraHTTPDeviceInfoExtractor:
     _UA_REGEX = re.compile(r'^(?:Aastra|Mitel)(\w+) MAC:([^ ]+) V:([^ ]+)-SIP$')
+    _UA_PREFIXES = (b'Aastra', b'Mitel')
     _UA_MODELS_MAP = {
         '51i': '6751i',  # not tested
         '53i': '6753i',  # not tested
@@ -52,7 +70,7 @@ class BaseAastraHTTPDeviceInfoExtractor:
 
     def _do_extract(self, request: Request):
         ua = request.getHeader(b'User-Agent')
-        if ua:
+        if ua and ua.startswith(self._UA_PREFIXES):
             return self._extract_from_ua(ua.decode('ascii'))
         return None
 
@@ -91,6 +109,11 @@ class BaseAastraPgAssociator(BasePgAssociator):
         super().__init__()
         self._model_versions = model_versions
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._model_versions)
+        return {'Aastra': VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -128,6 +151,9 @@ class AastraModel:
             yield f'expmod{expmod_num} key', self.nb_expmodkey
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseAastraPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
     _M670_NB_KEY = 36
@@ -263,6 +289,9 @@ class BaseAastraPlugin(StandardPlugin):
         },
     }
     _SENSITIVE_FILENAME_REGEX = re.compile(r'^[0-9A-F]{12}\.cfg$')
+    _DEVICE_FILENAME_REGEX = re.compile(
+        rb'[0-9A-F]{10}([0-9A-F]{2})(?:\.cfg|-ca_servers\.crt)'
+    )
     _tftpboot_dir: str
 
     def __init__(self, app, plugin_dir, gen_cfg, spec_cfg):
@@ -272,6 +301,7 @@ class BaseAastraPlugin(StandardPlugin):
         self._tftpboot_dir = os.path.join(self._tftpboot_dir, 'Aastra')
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -279,7 +309,16 @@ class BaseAastraPlugin(StandardPlugin):
         fetchfw_helper.root_dir = self._tftpboot_dir
 
         self.services = fetchfw_helper.services()
-        self.http_service = HTTPNoListingFileService(self._base_tftpboot_dir)
+        self._device_file_index = DeviceFileIndex(
+            self._tftpboot_dir,
+            b'/Aastra/',
+            self._DEVICE_FILENAME_REGEX,
+            sharded=spec_cfg.get('sharded_device_files') is True,
+        )
+        self.http_service = DeviceFileHTTPService(
+            HTTPNoListingFileService(self._base_tftpboot_dir),
+            self._device_file_index,
+        )
 
     http_dev_info_extractor = BaseAastraHTTPDeviceInfoExtractor()
 
@@ -338,11 +377,11 @@ class BaseAastraPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_timezone'] = self._format_tzinfo(tzinfo)
 
     def _add_fkeys(self, raw_config, model):
         model_obj = self._MODELS.get(model)
@@ -435,9 +474,10 @@ class BaseAastraPlugin(StandardPlugin):
 
     def _write_cert_or_key_file(self, pem_cert, device, suffix):
         filename = self._device_cert_or_key_filename(device, suffix)
-        pathname = os.path.join(self._tftpboot_dir, filename)
+        pathname = self._device_file_index.new_path(filename)
         with open(pathname, 'w') as f:
             f.write(pem_cert)
+        self._device_file_index.add(filename)
         # return the path, from the point of view of the device
         return filename
 
@@ -511,30 +551,36 @@ class BaseAastraPlugin(StandardPlugin):
         raw_config['XX_options'] = device.get('options', {})
         raw_config['XX_language_path'] = self._LANGUAGE_PATH
 
-        path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        path = self._device_file_index.new_path(filename)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
+        self._device_file_index.add(filename)
 
     def deconfigure(self, device):
         self._remove_configuration_file(device)
         self._remove_certificate_file(device)
 
     def _remove_configuration_file(self, device):
-        path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
+        filename = self._dev_specific_filename(device)
+        path = self._device_file_index.path(filename)
         try:
             os.remove(path)
         except OSError as e:
             logger.info('error while removing configuration file: %s', e)
+        else:
+            self._device_file_index.discard(filename)
 
     def _remove_certificate_file(self, device):
-        path = os.path.join(
-            self._tftpboot_dir,
-            self._device_cert_or_key_filename(device, self._TRUSTED_ROOT_CERTS_SUFFIX),
+        filename = self._device_cert_or_key_filename(
+            device, self._TRUSTED_ROOT_CERTS_SUFFIX
         )
+        path = self._device_file_index.path(filename)
         try:
             os.remove(path)
         except OSError as e:
             if e.errno != errno.ENOENT:
                 logger.info('error while removing certificate file: %s', e)
+        else:
+            self._device_file_index.discard(filename)
 
     def synchronize(self, device, raw_config):
         return synchronize.standard_sip_synchronize(device)
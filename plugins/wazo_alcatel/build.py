@@ -1,13 +1,9 @@
 # Copyright 2022-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,17 +17,43 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('2.01.10', 'wazo-alcatel-2.01.10')
 def build_2_01_10(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v2_01_10/', path])
+    copy_tree('v2_01_10/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
 
 
 @target('2.13.02', 'wazo-alcatel-2.13.02')
 def build_2_13_02(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v2_13_02/', path])
+    copy_tree('v2_13_02/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
 
 
 @target('1.51.52', 'wazo-alcatel-1.51.52')
 def build_1_51_52(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v1_51_52/', path])
+    copy_tree('v1_51_52/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
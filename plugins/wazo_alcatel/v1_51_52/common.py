@@ -6,7 +6,7 @@ from __future__ import annotations
 import logging
 import os.path
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 try:
     from wazo_provd import plugins, synchronize, tzinform
@@ -34,6 +34,18 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-alcatel')
 
 
@@ -76,6 +88,11 @@ class BaseAlcatelMyriadPgAssociator(BasePgAssociator):
     def __init__(self, models_versions):
         self._models_versions = models_versions
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._models_versions)
+        return {'Alcatel-Lucent': VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -88,6 +105,9 @@ class BaseAlcatelMyriadPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseAlcatelPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
 
@@ -138,6 +158,7 @@ class BaseAlcatelPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -157,7 +178,7 @@ class BaseAlcatelPlugin(StandardPlugin):
         for tpl_filename, filename in self._common_templates():
             tpl = self._tpl_helper.get_template(tpl_filename)
             dest_file = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dest_file, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dest_file, self._ENCODING)
 
     def _update_sip_lines(self, raw_config):
         proxy_ip = raw_config.get('sip_proxy_ip')
@@ -223,11 +244,11 @@ class BaseAlcatelPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.warning('Unknown timezone "%s": "%s"', raw_config['timezone'], e)
-            else:
-                raw_config['XX_timezone'] = self._format_tzinfo(tzinfo)
 
     def _add_language(self, raw_config):
         locale = raw_config['locale']
@@ -290,7 +311,7 @@ class BaseAlcatelPlugin(StandardPlugin):
         raw_config['XX_options'] = device.get('options', {})
 
         path = os.path.join(self._tftpboot_dir, xml_filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         filename = self._dev_specific_filename(device)
@@ -14,6 +14,7 @@ import logging
 import os.path
 import re
 import time
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import tzinform
@@ -43,6 +44,18 @@ except ImportError:
 
 from twisted.internet import defer, threads
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-alcatel')
 
 VENDOR = 'Alcatel'
@@ -114,6 +127,11 @@ class BaseAlcatelPgAssociator(BasePgAssociator):
         self._models = models
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._models, self._version)
+        return {VENDOR: VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -126,6 +144,9 @@ class BaseAlcatelPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseAlcatelPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
     _DEFAULT_PASSWORD = '000000'
@@ -153,6 +174,7 @@ class BaseAlcatelPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -244,14 +266,13 @@ class BaseAlcatelPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                try:
-                    raw_config['XX_timezone'] = self._format_tzinfo(tzinfo)
-                except Exception:
-                    logger.error('Error while formating tzinfo', exc_info=True)
+            except Exception:
+                logger.error('Error while formating tzinfo', exc_info=True)
 
     def _add_tone_country(self, raw_config) -> None:
         if 'locale' in raw_config:
@@ -330,7 +351,7 @@ class BaseAlcatelPlugin(StandardPlugin):
         self._update_admin_password(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
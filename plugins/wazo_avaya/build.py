@@ -1,13 +1,9 @@
 # Copyright 2013-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,14 +17,34 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('4.1.13', 'wazo-avaya-4.1.13')
 def build_4_1_13(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v4_1_13/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('v4_1_13/', path)
 
 
 @target('4.1.3', 'wazo-avaya-4.1.3')
 def build_4_1_3(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v4_1_3/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('v4_1_3/', path)
@@ -12,6 +12,7 @@ from __future__ import annotations
 import logging
 import os
 import re
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import synchronize, tzinform
@@ -41,6 +42,18 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-avaya')
 
 
@@ -50,6 +63,10 @@ _FILENAME_MAP = {
     '1230.cfg': '1230IP',
     '1230SIP.cfg': '1230IP',
 }
+# Same as _FILENAME_MAP, for the undecoded TFTP filenames
+_RAW_FILENAME_MAP = {
+    filename.encode('ascii'): model for filename, model in _FILENAME_MAP.items()
+}
 
 
 class BaseAvayaHTTPDeviceInfoExtractor:
@@ -118,9 +135,9 @@ class BaseAvayaTFTPDeviceInfoExtractor:
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: TFTPRequest):
-        filename = request['packet']['filename'].decode('ascii')
-        if filename in _FILENAME_MAP:
-            return {'vendor': 'Avaya', 'model': _FILENAME_MAP[filename]}
+        model = _RAW_FILENAME_MAP.get(request['packet']['filename'])
+        if model:
+            return {'vendor': 'Avaya', 'model': model}
         return None
 
 
@@ -130,6 +147,11 @@ class BaseAvayaPgAssociator(BasePgAssociator):
         self._models = models
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._models, self._version)
+        return {'Avaya': VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -145,6 +167,9 @@ class BaseAvayaPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseAvayaPlugin(StandardPlugin):
     # XXX file encoding is not stated anywhere
     _ENCODING = 'UTF-8'
@@ -153,6 +178,7 @@ class BaseAvayaPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -168,7 +194,7 @@ class BaseAvayaPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                tzinfo = _TIMEZONE_CACHE.get_timezone_info(raw_config['timezone'])
             except tzinform.TimezoneNotFoundError as e:
                 logger.warning('Unknown timezone: %s', e)
             else:
@@ -202,7 +228,7 @@ class BaseAvayaPlugin(StandardPlugin):
         self._add_timezone(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
@@ -1,13 +1,10 @@
 # Copyright 2013-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+import os
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,32 +18,125 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
+    def write_json_data(
+        src: str, function_name: str, dst: str | os.PathLike[str]
+    ) -> None:
+        """The `write_json_data` method is injected by the build script."""
+
 
 @target('8.5.2', 'wazo-cisco-sccp-8.5.2')
 def build_8_5_2(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v8_5_2/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v8_5_2/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
+    )
 
 
 @target('9.4', 'wazo-cisco-sccp-9.4')
 def build_9_4(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v9_4/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v9_4/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
+    )
 
 
 @target('cipc-2.1.2', 'wazo-cisco-sccp-cipc-2.1.2')
 def build_cipc_2_1_2(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'cipc_v2_1_2/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('cipc_v2_1_2/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
+    )
 
 
 @target('legacy', 'wazo-cisco-sccp-legacy')
 def build_legacy(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'legacy/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('legacy/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
+    )
 
 
 @target('wireless-1.4.5', 'wazo-cisco-sccp-wireless-1.4.5')
 def build_wireless(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'wireless_v1_4_5/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('wireless_v1_4_5/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
+    )
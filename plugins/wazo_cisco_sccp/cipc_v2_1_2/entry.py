@@ -16,6 +16,10 @@ if TYPE_CHECKING:
 
 
 common: CommonGlobalsDict = {}  # type: ignore[typeddict-item]
+execfile_('config_files.py', common)  # type: ignore[name-defined]
+execfile_('extraction.py', common)  # type: ignore[name-defined]
+execfile_('support_table.py', common)  # type: ignore[name-defined]
+execfile_('timezones.py', common)  # type: ignore[name-defined]
 execfile_('common.py', common)  # type: ignore[name-defined]
 
 MODELS = ['CIPC']
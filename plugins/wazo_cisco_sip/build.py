@@ -1,13 +1,10 @@
 # Copyright 2018-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+import os
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,23 +18,85 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
+    def write_json_data(
+        src: str, function_name: str, dst: str | os.PathLike[str]
+    ) -> None:
+        """The `write_json_data` method is injected by the build script."""
+
 
 @target('9.3', 'wazo-cisco-sip-9.3')
 def build_9_3(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v9_3/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v9_3/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
+    )
 
 
 @target('11.1.0', 'wazo-cisco-sip-11.1.0')
 def build_11_1_0(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v11_1_0/', path])
+    copy_tree('v11_1_0/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
 
 
 @target('11.3.1', 'wazo-cisco-sip-11.3.1')
 def build_11_3_1(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v11_3_1/', path])
+    copy_tree('v11_3_1/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
 
 
 @target('12.0.1', 'wazo-cisco-sip-12.0.1')
 def build_12_0_1(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v12_0_1/', path])
+    copy_tree('v12_0_1/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
@@ -3,9 +3,11 @@
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import re
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import plugins, synchronize, tzinform
@@ -37,6 +39,22 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache, VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-cisco-sip')
 
 
@@ -44,6 +62,17 @@ class BaseCiscoPgAssociator(BasePgAssociator):
     def __init__(self, models):
         self._models = models
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        return {
+            'Cisco': VendorSupport(
+                dict.fromkeys(self._models),
+                DeviceSupport.PROBABLE,
+                no_model=DeviceSupport.PROBABLE.value + 10,
+                unsupported_model_prefixes=('SPA', 'ATA'),
+            )
+        }
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport | int:
@@ -63,13 +92,28 @@ class BaseCiscoPgAssociator(BasePgAssociator):
 class BaseCiscoDHCPDeviceInfoExtractor:
     _VDI_REGEX = re.compile(r'\bPhone (?:79(\d\d)|CP-79(\d\d)G|CP-(\d\d\d\d))')
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = (
+        'Cisco Systems, Inc.',
+        'Cisco Systems, Inc. IP Phone 7912',
+        'Cisco Systems, Inc. IP Phone CP-7940G\x00',
+        'Cisco Systems, Inc. IP Phone CP-7941G\x00',
+        'Cisco Systems, Inc. IP Phone CP-7960G\x00',
+        'Cisco Systems, Inc. IP Phone CP-8961\x00',
+        'Cisco Systems, Inc. IP Phone CP-9951\x00',
+        'Cisco Systems Inc. Wireless Phone 7921',
+    )
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: DHCPRequest):
         options = request['options']
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
 
     def _extract_from_vdi(self, vdi: str):
         # Vendor class identifier:
@@ -108,10 +152,18 @@ class BaseCiscoHTTPDeviceInfoExtractor:
         re.compile(r'^/ITLFile\.tlv$'),
     ]
 
+    def __init__(self) -> None:
+        self._extraction_cache = ExtractionCache()
+
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
+        return self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+
+    def _extract_from_request(self, request: Request):
         path = request.path.decode('ascii')
         if self._CIPC_REGEX.match(path):
             return {'vendor': 'Cisco', 'model': 'CIPC'}
@@ -128,27 +180,35 @@ class BaseCiscoHTTPDeviceInfoExtractor:
 
 
 class BaseCiscoTFTPDeviceInfoExtractor:
-    _CIPC_REGEX = re.compile(r'^Communicator[/\\]')
-    _FILENAME_REGEXES = [
-        re.compile(r'^SEP([\dA-F]{12})\.cnf\.xml$'),
-        re.compile(r'^CTLSEP([\dA-F]{12})\.tlv$'),
-        re.compile(r'^ITLSEP([\dA-F]{12})\.tlv$'),
-        re.compile(r'^ITLFile\.tlv$'),
+    # Filenames are classified on bytes, without decoding them
+    _CIPC_PREFIXES = (b'Communicator/', b'Communicator\\')
+    _FILENAMES = frozenset([b'ITLFile.tlv'])
+    # (prefix, suffix) of the filenames around an uppercase MAC address
+    _MAC_FILENAME_AFFIXES = [
+        (b'SEP', b'.cnf.xml'),
+        (b'CTLSEP', b'.tlv'),
+        (b'ITLSEP', b'.tlv'),
     ]
+    _MAC_DIGITS = b'0123456789ABCDEF'
 
     def extract(self, request: TFTPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: TFTPRequest):
         packet: Packet = request['packet']
-        filename = packet['filename'].decode('ascii')
-        if self._CIPC_REGEX.match(filename):
+        filename: bytes = packet['filename']
+        if filename.startswith(self._CIPC_PREFIXES):
             return {'vendor': 'Cisco', 'model': 'CIPC'}
-        for regex in self._FILENAME_REGEXES:
-            m = regex.match(filename)
-            if m:
-                dev_info = {'vendor': 'Cisco'}
-                return dev_info
+        if filename in self._FILENAMES or self._is_mac_filename(filename):
+            dev_info = {'vendor': 'Cisco'}
+            return dev_info
+
+    def _is_mac_filename(self, filename: bytes) -> bool:
+        for prefix, suffix in self._MAC_FILENAME_AFFIXES:
+            if filename.startswith(prefix) and filename.endswith(suffix):
+                raw_mac = filename[len(prefix) : -len(suffix)]
+                return len(raw_mac) == 12 and not raw_mac.strip(self._MAC_DIGITS)
+        return False
 
 
 _ZONE_MAP = {
@@ -207,23 +267,43 @@ _ZONE_MAP = {
     #    '': u'New Zealand Standard/Daylight Time',
 }
 
+_TZ_MAP_FILENAME = 'tz_map.json'
 
-def _gen_tz_map():
-    result: dict[int, dict[str | None, str]] = {}
+
+def _gen_tz_map_entries() -> list[tuple[int, str | None, str]]:
+    # Also called by the build script, which ships the result in the built
+    # plugin as _TZ_MAP_FILENAME.
+    entries: list[tuple[int, str | None, str]] = []
     for tz_name, param_value in _ZONE_MAP.items():
         tzinfo = tzinform.get_timezone_info(tz_name)
-        inner_dict = result.setdefault(tzinfo['utcoffset'].as_minutes, {})
-        if not tzinfo['dst']:
-            inner_dict[None] = param_value
-        else:
-            inner_dict[tzinfo['dst']['as_string']] = param_value
+        dst = tzinfo['dst']['as_string'] if tzinfo['dst'] else None
+        entries.append((tzinfo['utcoffset'].as_minutes, dst, param_value))
+    return entries
+
+
+def _load_tz_map(plugin_dir: str) -> dict[int, dict[str | None, str]]:
+    try:
+        with open(os.path.join(plugin_dir, _TZ_MAP_FILENAME)) as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        # Intentional fallback: the plugin was built without wazo-provd, so
+        # pgbuild could not precompute the map (see write_json_data)
+        logger.info('No precomputed timezone map, computing it')
+        entries = _gen_tz_map_entries()
+    result: dict[int, dict[str | None, str]] = {}
+    for utcoffset_m, dst, param_value in entries:
+        result.setdefault(utcoffset_m, {})[dst] = param_value
     return result
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseCiscoSipPlugin(StandardPlugin):
     # XXX actually, we didn't find which encoding Cisco Sip are using
     _ENCODING = 'UTF-8'
-    _TZ_MAP = _gen_tz_map()
+    # loaded on first use, see _get_tz_map
+    _TZ_MAP: dict[int, dict[str | None, str]] | None = None
     _TZ_VALUE_DEF = 'Eastern Standard/Daylight Time'
     _LOCALE = {
         # <locale>: (<name>, <lang code>, <network locale>)
@@ -244,6 +324,7 @@ class BaseCiscoSipPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -269,18 +350,25 @@ class BaseCiscoSipPlugin(StandardPlugin):
         if locale in self._LOCALE:
             raw_config['XX_locale'] = self._LOCALE[locale]
 
+    def _get_tz_map(self) -> dict[int, dict[str | None, str]]:
+        tz_map = self._TZ_MAP
+        if tz_map is None:
+            tz_map = type(self)._TZ_MAP = _load_tz_map(self._plugin_dir)
+        return tz_map
+
     def _tzinfo_to_value(self, tzinfo):
+        tz_map = self._get_tz_map()
         utcoffset_m = tzinfo['utcoffset'].as_minutes
-        if utcoffset_m not in self._TZ_MAP:
+        if utcoffset_m not in tz_map:
             # No UTC offset matching. Let's try finding one relatively close...
             for supp_offset in [30, -30, 60, -60]:
-                if utcoffset_m + supp_offset in self._TZ_MAP:
+                if utcoffset_m + supp_offset in tz_map:
                     utcoffset_m += supp_offset
                     break
             else:
                 return self._TZ_VALUE_DEF
 
-        dst_map = self._TZ_MAP[utcoffset_m]
+        dst_map = tz_map[utcoffset_m]
         if tzinfo['dst']:
             dst_key = tzinfo['dst']['as_string']
         else:
@@ -298,11 +386,11 @@ class BaseCiscoSipPlugin(StandardPlugin):
         raw_config['XX_timezone'] = self._TZ_VALUE_DEF
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._tzinfo_to_value
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_timezone'] = self._tzinfo_to_value(tzinfo)
 
     def _add_xivo_phonebook_url(self, raw_config):
         plugins.add_xivo_phonebook_url(raw_config, 'cisco', entry_point='menu')
@@ -408,7 +496,7 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self._add_server_url(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
@@ -7,6 +7,7 @@ import logging
 import os
 import re
 from operator import itemgetter
+from typing import TYPE_CHECKING
 from xml.sax.saxutils import escape
 
 try:
@@ -39,6 +40,22 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache, VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugins.wazo-cisco-sip')
 
 
@@ -51,6 +68,15 @@ def _norm_model(raw_model: str) -> str:
 class BaseCiscoDHCPDeviceInfoExtractor:
     _CISCO_VDI_REGEX = re.compile(r'^CISCO (ATA[0-9]{3})-MPP')
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = (
+        'CISCO ATA191-MPP',
+        'CISCO ATA192-MPP',
+    )
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
@@ -58,7 +84,7 @@ class BaseCiscoDHCPDeviceInfoExtractor:
         options: dict = request['options']
         logger.debug('_do_extract request: %s', request)
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
         return None
 
     def _extract_from_vdi(self, vdi: str):
@@ -77,10 +103,18 @@ class BaseCiscoHTTPDeviceInfoExtractor:
     _CISCO_UA_REGEX = re.compile(r'^Cisco/(ATA[0-9]{3})-MPP-(\S+) \((\S+)\)$')
     _PATH_REGEX = re.compile(r'\b/([\da-f]{12})\.xml$')
 
+    def __init__(self) -> None:
+        self._extraction_cache = ExtractionCache()
+
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
+        return self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+
+    def _extract_from_request(self, request: Request):
         ua = request.getHeader(b'User-Agent')
         raw_mac = request.args.get(b'mac', [None])[0]
         dev_info = {}
@@ -121,27 +155,30 @@ class BaseCiscoHTTPDeviceInfoExtractor:
 
 
 class BaseCiscoTFTPDeviceInfoExtractor:
-    _MACFILE_REGEX = re.compile(r'^/([\da-fA-F]{12})\.xml$')
+    _MAC_DIGITS = b'0123456789abcdefABCDEF'
 
     def extract(self, request: TFTPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: TFTPRequest):
         packet: Packet = request['packet']
-        filename = packet['filename'].decode('ascii')
-        dev_info = self._test_macfile(filename)
+        dev_info = self._test_macfile(packet['filename'])
         if dev_info:
             dev_info['vendor'] = 'Cisco'
             return dev_info
         return None
 
-    def _test_macfile(self, filename: str):
+    def _test_macfile(self, filename: bytes):
         # Test if filename is "/$MA.xml".
-        m = self._MACFILE_REGEX.match(filename)
-        if m:
-            raw_mac = m.group(1)
+        raw_mac = filename[1:-4]
+        if (
+            filename.startswith(b'/')
+            and filename.endswith(b'.xml')
+            and len(raw_mac) == 12
+            and not raw_mac.strip(self._MAC_DIGITS)
+        ):
             try:
-                mac = norm_mac(raw_mac)
+                mac = norm_mac(raw_mac.decode('ascii'))
             except ValueError as e:
                 logger.warning('Could not normalize MAC address: %s', e)
                 return None
@@ -154,6 +191,15 @@ class BaseCiscoPgAssociator(BasePgAssociator):
         super().__init__()
         self._model_version = model_version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._model_version)
+        return {
+            'Cisco': VendorSupport(
+                models, DeviceSupport.IMPROBABLE, no_model=DeviceSupport.PROBABLE
+            )
+        }
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -172,6 +218,9 @@ class BaseCiscoPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseCiscoSipPlugin(StandardPlugin):
     """Base classes MUST have a '_COMMON_FILENAMES' attribute which is a
     sequence of filenames that will be generated by the common template in
@@ -214,6 +263,7 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self.services = fetchfw_helper.services()
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         self.http_service = HTTPNoListingFileService(self._tftpboot_dir)
         self.tftp_service = TFTPFileService(self._tftpboot_dir)
@@ -232,7 +282,7 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self._add_server_url(raw_config)
         for filename in common_filenames:
             dst = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _add_fkeys(self, raw_config, model):
         if model not in self._NB_FKEY:
@@ -317,11 +367,11 @@ class BaseCiscoSipPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_timezone'] = self._format_tzinfo(tzinfo)
 
     def _format_proxy(self, raw_config, line, line_no):
         proxy_ip = line.get('proxy_ip') or raw_config['sip_proxy_ip']
@@ -406,7 +456,9 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self._add_server_url(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING, errors='replace')
+        self._config_writer.dump(
+            tpl, raw_config, path, self._ENCODING, errors='replace'
+        )
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
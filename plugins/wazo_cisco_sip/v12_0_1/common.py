@@ -7,7 +7,7 @@ import logging
 import os
 import re
 from operator import itemgetter
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from xml.sax.saxutils import escape
 
 try:
@@ -40,12 +40,34 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache, VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugins.wazo-cisco-sip')
 
 
 class BaseCiscoDHCPDeviceInfoExtractor:
     _CISCO_VDI_REGEX = re.compile(r'^CP-([0-9]{4})-3PCC')
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = ('CP-7841-3PCC',)
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
@@ -53,7 +75,7 @@ class BaseCiscoDHCPDeviceInfoExtractor:
         options: dict = request['options']
         logger.debug('_do_extract request: %s', request)
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
         return None
 
     def _extract_from_vdi(self, vdi: str):
@@ -73,10 +95,18 @@ class BaseCiscoHTTPDeviceInfoExtractor:
     )
     _PATH_REGEX = re.compile(r'\b/Cisco/CP-([0-9]{4})-3PCC/([\da-f]{12})\.cfg$')
 
+    def __init__(self) -> None:
+        self._extraction_cache = ExtractionCache()
+
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
+        return self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+
+    def _extract_from_request(self, request: Request):
         ua = request.getHeader(b'User-Agent')
         if ua:
             dev_info: dict[str, Any] = {}
@@ -116,32 +146,34 @@ class BaseCiscoHTTPDeviceInfoExtractor:
 
 
 class BaseCiscoTFTPDeviceInfoExtractor:
-    _MACFILE_REGEX = re.compile(r'^/Cisco/CP-([0-9]{4})-3PCC/([\da-fA-F]{12})\.cfg$')
+    _MACFILE_PREFIX = b'/Cisco/CP-'
+    _MACFILE_REGEX = re.compile(rb'^/Cisco/CP-([0-9]{4})-3PCC/([\da-fA-F]{12})\.cfg$')
 
     def extract(self, request: TFTPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: TFTPRequest):
         packet: Packet = request['packet']
-        filename = packet['filename'].decode('ascii')
-        dev_info = self._test_macfile(filename)
+        dev_info = self._test_macfile(packet['filename'])
         if dev_info:
             dev_info['vendor'] = 'Cisco'
             return dev_info
         return None
 
-    def _test_macfile(self, filename: str):
-        # Test if filename is "/$MA.xml".
+    def _test_macfile(self, filename: bytes):
+        # Test if filename is "/Cisco/CP-$MODEL-3PCC/$MA.cfg".
+        if not filename.startswith(self._MACFILE_PREFIX):
+            return None
         m = self._MACFILE_REGEX.match(filename)
         if m:
-            raw_mac = m.group(2)
+            raw_mac = m.group(2).decode('ascii')
             try:
                 mac = norm_mac(raw_mac)
             except ValueError as e:
                 logger.warning('Could not normalize MAC address: %s', e)
                 mac = None
 
-            model = m.group(1)
+            model = m.group(1).decode('ascii')
             return {'model': model, 'mac': mac}
         return None
 
@@ -151,6 +183,15 @@ class BaseCiscoPgAssociator(BasePgAssociator):
         super().__init__()
         self._model_version = model_version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._model_version)
+        return {
+            'Cisco': VendorSupport(
+                models, DeviceSupport.IMPROBABLE, no_model=DeviceSupport.PROBABLE
+            )
+        }
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -169,6 +210,9 @@ class BaseCiscoPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseCiscoSipPlugin(StandardPlugin):
     """Base classes MUST have a '_COMMON_FILENAMES' attribute which is a
     sequence of filenames that will be generated by the common template in
@@ -214,6 +258,7 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self.services = fetchfw_helper.services()
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         self.http_service = HTTPNoListingFileService(self._tftpboot_dir)
         self.tftp_service = TFTPFileService(self._tftpboot_dir)
@@ -228,7 +273,7 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self._add_server_url(raw_config)
         for filename in common_filenames:
             dst = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _add_fkeys(self, raw_config, model):
         if model not in self._NB_FKEY:
@@ -318,11 +363,11 @@ class BaseCiscoSipPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_timezone'] = self._format_tzinfo(tzinfo)
 
     def _format_proxy(self, raw_config, line, line_no):
         proxy_ip = line.get('proxy_ip') or raw_config['sip_proxy_ip']
@@ -407,7 +452,9 @@ class BaseCiscoSipPlugin(StandardPlugin):
         self._add_server_url(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING, errors='replace')
+        self._config_writer.dump(
+            tpl, raw_config, path, self._ENCODING, errors='replace'
+        )
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
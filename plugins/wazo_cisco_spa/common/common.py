@@ -8,7 +8,7 @@ import os
 import re
 from copy import deepcopy
 from operator import itemgetter
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from xml.sax.saxutils import escape
 
 try:
@@ -41,6 +41,22 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache, VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugins.wazo-cisco-spa')
 
 
@@ -56,6 +72,23 @@ class BaseCiscoDHCPDeviceInfoExtractor:
     _LINKSYS_VDI_REGEX = re.compile(r'^(LINKSYS) (SPA-?[0-9]{3,4})')
     _VDIS = [_CISCO_VDI_REGEX, _LINKSYS_VDI_REGEX]
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = (
+        'LINKSYS SPA-942',
+        'LINKSYS SPA-962',
+        'LINKSYS SPA8000',
+        'Cisco SPA501G',
+        'Cisco SPA508G',
+        'Cisco SPA525g',
+        'Cisco SPA525G',
+        'Cisco SPA525G2',
+        'CISCO SPA122',
+        'CISCO ATA190',
+    )
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
@@ -63,7 +96,7 @@ class BaseCiscoDHCPDeviceInfoExtractor:
         options = request['options']
         logger.debug('_do_extract request: %s', request)
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
         return None
 
     def _extract_from_vdi(self, vdi):
@@ -95,10 +128,18 @@ class BaseCiscoHTTPDeviceInfoExtractor:
     _CISCO_UA_REGEX = re.compile(r'^Cisco/(\w+)-(\S+) (?:\(([\dA-F]{12})\))?\((\w+)\)$')
     _PATH_REGEX = re.compile(r'\b([\da-f]{12})\.xml$')
 
+    def __init__(self) -> None:
+        self._extraction_cache = ExtractionCache()
+
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
+        return self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+
+    def _extract_from_request(self, request: Request):
         ua = request.getHeader(b'User-Agent')
         if ua:
             dev_info: dict[str, Any] = {}
@@ -160,17 +201,15 @@ class BaseCiscoHTTPDeviceInfoExtractor:
 
 
 class BaseCiscoTFTPDeviceInfoExtractor:
-    _SEPFILE_REGEX = re.compile(r'^SEP([\dA-F]{12})\.cnf\.xml$')
-    _SPAFILE_REGEX = re.compile(r'^/spa(.+?)\.cfg$')
-    _ATAFILE_REGEX = re.compile(r'^ATA([\dA-F]{12})\.cnf\.xml$')
-    _CTLSEPFILE_REGEX = re.compile(r'^CTLSEP([\dA-F]{12})\.tlv$')
+    # Filenames are classified on bytes, without decoding them
+    _MAC_DIGITS = b'0123456789ABCDEF'
 
     def extract(self, request: TFTPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: TFTPRequest):
         packet: Packet = request['packet']
-        filename = packet['filename'].decode('ascii')
+        filename: bytes = packet['filename']
         for test_fun in [self._test_spafile, self._test_init, self._test_atafile]:
             dev_info = test_fun(filename)
             if dev_info:
@@ -181,25 +220,27 @@ class BaseCiscoTFTPDeviceInfoExtractor:
     def __repr__(self):
         return object.__repr__(self) + "-SPA"
 
-    def _test_spafile(self, filename: str):
+    def _test_spafile(self, filename: bytes):
         # Test if filename is "/spa$PSN.cfg".
-        m = self._SPAFILE_REGEX.match(filename)
-        if m:
-            raw_model = 'SPA' + m.group(1)
-            return {'model': _norm_model(raw_model)}
+        if filename.startswith(b'/spa') and filename.endswith(b'.cfg'):
+            psn = filename[4:-4]
+            if psn:
+                raw_model = 'SPA' + psn.decode('ascii')
+                return {'model': _norm_model(raw_model)}
         return None
 
-    def _test_atafile(self, filename: str):
+    def _test_atafile(self, filename: bytes):
         # Test if filename is "ATAMAC.cnf.xml".
         # Only the ATA190 requests this file
-        m = self._ATAFILE_REGEX.match(filename)
-        if m:
-            return {'model': 'ATA190'}
+        if filename.startswith(b'ATA') and filename.endswith(b'.cnf.xml'):
+            raw_mac = filename[3:-8]
+            if len(raw_mac) == 12 and not raw_mac.strip(self._MAC_DIGITS):
+                return {'model': 'ATA190'}
         return None
 
-    def _test_init(self, filename: str):
+    def _test_init(self, filename: bytes):
         # Test if filename is "/init.cfg".
-        if filename == '/init.cfg':
+        if filename == b'/init.cfg':
             return {'model': 'PAP2T'}
         return None
 
@@ -209,6 +250,15 @@ class BaseCiscoPgAssociator(BasePgAssociator):
         super().__init__()
         self._model_version = model_version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._model_version)
+        return {
+            'Cisco': VendorSupport(
+                models, DeviceSupport.IMPROBABLE, no_model=DeviceSupport.PROBABLE
+            )
+        }
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -227,6 +277,9 @@ class BaseCiscoPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseCiscoPlugin(StandardPlugin):
     """Base classes MUST have a '_COMMON_FILENAMES' attribute which is a
     sequence of filenames that will be generated by the common template in
@@ -277,6 +330,7 @@ class BaseCiscoPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -297,7 +351,7 @@ class BaseCiscoPlugin(StandardPlugin):
         common_filenames = self._COMMON_FILENAMES
         for filename in common_filenames:
             dst = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _add_fkeys(self, raw_config, model):
         if model not in self._NB_FKEY:
@@ -382,11 +436,11 @@ class BaseCiscoPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_timezone'] = self._format_tzinfo(tzinfo)
 
     def _format_proxy(self, raw_config, line, line_no):
         proxy_ip = line.get('proxy_ip') or raw_config['sip_proxy_ip']
@@ -485,7 +539,9 @@ class BaseCiscoPlugin(StandardPlugin):
         self._add_server_url(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING, errors='replace')
+        self._config_writer.dump(
+            tpl, raw_config, path, self._ENCODING, errors='replace'
+        )
 
         if len(raw_config['sip_lines']) >= 2 and device.get('model', '').startswith(
             'ATA'
@@ -494,7 +550,7 @@ class BaseCiscoPlugin(StandardPlugin):
 
             filename = self._dev_shifted_specific_filename(device)
             path = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(
+            self._config_writer.dump(
                 tpl, raw_config, path, self._ENCODING, errors='replace'
             )
 
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
 
 
 common_globals: CommonGlobalsDict = {}  # type: ignore[typeddict-item]
+execfile_('config_files.py', common_globals)  # type: ignore[name-defined]
+execfile_('extraction.py', common_globals)  # type: ignore[name-defined]
+execfile_('support_table.py', common_globals)  # type: ignore[name-defined]
+execfile_('timezones.py', common_globals)  # type: ignore[name-defined]
 execfile_('common.py', common_globals)  # type: ignore[name-defined]
 
 MODEL_VERSION = {
@@ -1,8 +1,7 @@
 # Copyright 2014-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -16,20 +15,61 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('1.4.0.0', 'wazo-digium-1.4.0.0')
 def build_1_4_0_0(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v1_4_0_0/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v1_4_0_0/', path)
 
 
 @target('2.2.1.8', 'wazo-digium-2.2.1.8')
 def build_2_2_1_8(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v2_2_1_8/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v2_2_1_8/', path)
 
 
 @target('2.8.1', 'wazo-digium-2.8.1')
 def build_2_8_1(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v2_8_1/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v2_8_1/', path)
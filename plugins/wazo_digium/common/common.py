@@ -6,6 +6,7 @@ from __future__ import annotations
 import logging
 import os
 import re
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import synchronize
@@ -31,19 +32,46 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'DeviceFileIndex' not in globals():
+    # Executed beforehand from device_files.py by entry.py in a built plugin
+    from ...shared.device_files import DeviceFileHTTPService, DeviceFileIndex
+
+if TYPE_CHECKING or 'VDICache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
 logger = logging.getLogger('plugin.wazo-digium')
 
 
 class DigiumDHCPDeviceInfoExtractor:
     _VDI_REGEX = re.compile(r'^digium_(D\d\d)_([\d_]+)$')
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = (
+        'digium_D40_1_0_5_46476',
+        'digium_D40_1_1_0_0_48178',
+        'digium_D70_1_0_5_46476',
+        'digium_D70_1_1_0_0_48178',
+    )
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: DHCPRequest):
         options = request['options']
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
 
     def _extract_from_vdi(self, vdi: str):
         # Vendor Class Identifier:
@@ -82,6 +110,11 @@ class DigiumPgAssociator(BasePgAssociator):
         super().__init__()
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._MODELS, self._version)
+        return {'Digium': VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -98,18 +131,30 @@ class BaseDigiumPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
     _CONTACT_TEMPLATE = 'contact.tpl'
     _SENSITIVE_FILENAME_REGEX = re.compile(r'^[0-9a-f]{12}\.cfg$')
+    _DEVICE_FILENAME_REGEX = re.compile(
+        rb'[0-9a-f]{10}([0-9a-f]{2})(?:\.cfg|-contacts\.xml)'
+    )
 
     def __init__(self, app, plugin_dir, gen_cfg, spec_cfg):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
         self._digium_dir = os.path.join(self._tftpboot_dir, 'Digium')
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
 
         self.services = fetchfw_helper.services()
-        self.http_service = HTTPNoListingFileService(self._tftpboot_dir)
+        self._device_file_index = DeviceFileIndex(
+            self._digium_dir,
+            b'/Digium/',
+            self._DEVICE_FILENAME_REGEX,
+            sharded=spec_cfg.get('sharded_device_files') is True,
+        )
+        self.http_service = DeviceFileHTTPService(
+            HTTPNoListingFileService(self._tftpboot_dir), self._device_file_index
+        )
 
     dhcp_dev_info_extractor = DigiumDHCPDeviceInfoExtractor()
 
@@ -130,10 +175,12 @@ class BaseDigiumPlugin(StandardPlugin):
         raw_config['XX_funckeys'] = self._transform_funckeys(raw_config)
         raw_config['XX_lang'] = raw_config.get('locale')
 
-        path = os.path.join(self._digium_dir, filename)
-        contact_path = os.path.join(self._digium_dir, contact_filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
-        self._tpl_helper.dump(contact_tpl, raw_config, contact_path, self._ENCODING)
+        path = self._device_file_index.new_path(filename)
+        contact_path = self._device_file_index.new_path(contact_filename)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
+        self._device_file_index.add(filename)
+        self._config_writer.dump(contact_tpl, raw_config, contact_path, self._ENCODING)
+        self._device_file_index.add(contact_filename)
 
     def deconfigure(self, device):
         filenames = [
@@ -142,11 +189,13 @@ class BaseDigiumPlugin(StandardPlugin):
         ]
 
         for filename in filenames:
-            path = os.path.join(self._digium_dir, filename)
+            path = self._device_file_index.path(filename)
             try:
                 os.remove(path)
             except OSError as e:
                 logger.info('error while removing file %s: %s', path, e)
+            else:
+                self._device_file_index.discard(filename)
 
     def synchronize(self, device, raw_config):
         return synchronize.standard_sip_synchronize(device)
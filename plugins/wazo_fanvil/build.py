@@ -1,14 +1,10 @@
 """
 Copyright 2013-2023 The Wazo Authors  (see the AUTHORS file)
 SPDX-License-Identifier: GPL-3.0-or-later
-
-Depends on the following external programs:
- -rsync
 """
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -22,32 +18,100 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('2.3', 'wazo-fanvil-2.3')
 def build_2_3(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v2_3/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('v2_3/', path)
 
 
 @target('serie-x', 'wazo-fanvil-serie-x')
 def build_x(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'serie_x/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('serie_x/', path)
 
 
 @target('serie-v', 'wazo-fanvil-serie-v')
 def build_v(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'serie_v/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('serie_v/', path)
 
 
 @target('serie-i', 'wazo-fanvil-serie-i')
 def build_i(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'serie_i/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('serie_i/', path)
 
 
 @target('serie-h', 'wazo-fanvil-serie-h')
 def build_h(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'serie_h/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
+    )
+    copy_tree('serie_h/', path)
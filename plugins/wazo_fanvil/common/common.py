@@ -3,11 +3,14 @@
 
 from __future__ import annotations
 
+import copy
 import logging
 import math
 import os.path
 import re
-from typing import TYPE_CHECKING, Any
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable
 
 try:
     from wazo_provd import plugins, synchronize, tzinform
@@ -34,6 +37,27 @@ except ImportError:
     from provd.util import format_mac, norm_mac
 
 from twisted.internet import defer
+from twisted.web.resource import Resource
+
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'DeviceFileIndex' not in globals():
+    # Executed beforehand from device_files.py by entry.py in a built plugin
+    from ...shared.device_files import DeviceFileHTTPService, DeviceFileIndex
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
 
 logger = logging.getLogger('plugin.wazo-fanvil')
 
@@ -59,18 +83,25 @@ class BaseFanvilHTTPDeviceInfoExtractor:
     _UA_REGEX = re.compile(
         r'^Fanvil (?P<model>[XVi][0-9]{1,3}[WSGVUCi]?[DV]?[0-9]?(-V2)?( Pro)?) (?P<version>[0-9.]+) (?P<mac>[\da-f]{12})$'  # noqa: E501
     )
+    _UA_PREFIX = b'Fanvil '
 
     def __init__(self, common_files):
         self._COMMON_FILES = common_files
+        self._extraction_cache = ExtractionCache()
 
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
+        return self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+
+    def _extract_from_request(self, request: Request):
         dev_info = {}
         dev_info.update(self._extract_from_path(request))
         ua = request.getHeader(b'User-Agent')
-        if ua:
+        if ua and ua.startswith(self._UA_PREFIX):
             dev_info.update(self._extract_from_ua(ua.decode('ascii')))
 
         return dev_info
@@ -112,6 +143,11 @@ class BaseFanvilPgAssociator(BasePgAssociator):
         super().__init__()
         self._models = models
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._models)
+        return {'Fanvil': VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -122,6 +158,132 @@ class BaseFanvilPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+class TooManyRequestsResource(Resource):
+    isLeaf = True
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__()
+        self._retry_after = retry_after
+
+    def render(self, request: Request) -> bytes:
+        request.setResponseCode(429)
+        request.setHeader(b'Retry-After', str(self._retry_after).encode('ascii'))
+        request.setHeader(b'Content-Type', b'text/plain; charset=ascii')
+        return b'Too many requests\n'
+
+
+class RateLimitedHTTPService(Resource):
+    """Wrapper of an HTTP service rate limiting each (source IP, path) pair.
+
+    Every pair has a token bucket holding up to `burst` tokens, refilled at
+    `rate` tokens per second. A request with no token left is answered with a
+    429 and a Retry-After header instead of going through the wrapped service.
+    """
+
+    _MAX_BUCKETS = 4096
+
+    def __init__(
+        self,
+        service: Resource,
+        rate: float = 1.0,
+        burst: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._service = service
+        super().__init__()
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._buckets: OrderedDict[Any, tuple[float, float]] = OrderedDict()
+        self.accepted = 0
+        self.rejected = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # e.g. path_preprocess
+        return getattr(self._service, name)
+
+    def _limit(self, request: Request) -> Resource | None:
+        key = (request.getClientAddress().host, request.path)
+        now = self._clock()
+        tokens, last = self._buckets.pop(key, (self._burst, now))
+        tokens = min(self._burst, tokens + (now - last) * self._rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            resource = None
+            self.accepted += 1
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = max(1, math.ceil((1 - tokens) / self._rate))
+            resource = TooManyRequestsResource(retry_after)
+            self.rejected += 1
+            logger.debug('Rate limiting %s requests to %s', key[0], key[1])
+        if len(self._buckets) > self._MAX_BUCKETS:
+            self._buckets.popitem(last=False)
+        return resource
+
+    def getChildWithDefault(self, path: bytes, request: Request) -> Resource:
+        resource = self._limit(request)
+        if resource is None:
+            return self._service.getChildWithDefault(path, request)
+        return resource
+
+    def render(self, request: Request) -> bytes:
+        resource = self._limit(request)
+        if resource is None:
+            return self._service.render(request)
+        return resource.render(request)
+
+
+_TIMEZONE_CACHE = TimezoneCache()
+
+
+def _config_signature(raw_config: dict[str, Any], keys: tuple[str, ...]) -> tuple:
+    return tuple((key in raw_config, repr(raw_config.get(key))) for key in keys)
+
+
+class SharedConfigCache:
+    """Compute once what only depends on settings shared by many devices.
+
+    func(device, raw_config) must only add values to raw_config, computed from
+    the device model and from the values of keys, the only keys of the raw
+    config it is given. The values it adds are remembered by model and by the
+    values of keys, and func is only called again for devices differing on one
+    of them. Each device gets its own deep copy of the values.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[dict[str, Any], dict[str, Any]], None],
+        keys: tuple[str, ...],
+    ) -> None:
+        self._func = func
+        self._keys = keys
+        self._updates: dict[tuple, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def apply(self, device: dict[str, Any], raw_config: dict[str, Any]) -> None:
+        signature = (device.get('model'), _config_signature(raw_config, self._keys))
+        updates = self._updates.get(signature)
+        if updates is None:
+            self.misses += 1
+            shared_config = {
+                key: copy.deepcopy(raw_config[key])
+                for key in self._keys
+                if key in raw_config
+            }
+            self._func(device, shared_config)
+            updates = {
+                key: value
+                for key, value in shared_config.items()
+                if key not in self._keys
+            }
+            self._updates[signature] = updates
+        else:
+            self.hits += 1
+        raw_config.update(copy.deepcopy(updates))
+
+
 class BaseFanvilPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
     _LOCALE: dict[str, str] = {}
@@ -152,6 +314,16 @@ class BaseFanvilPlugin(StandardPlugin):
         'fr': 'Annuaire',
     }
     _NEW_MODEL_REGEX = re.compile(r'^X([4-9][UC]|(210i?)|7)([- ]Pro)?$')
+    _DEVICE_FILENAME_REGEX = re.compile(rb'[0-9a-f]{10}([0-9a-f]{2})\.cfg')
+    # The raw config keys read by _add_shared_config
+    _SHARED_CONFIG_KEYS = (
+        'locale',
+        'timezone',
+        'sip_transport',
+        'http_base_url',
+        'ip',
+        'http_port',
+    )
     _NEW_MODEL_SHORT_LANGUAGE_MAPPINGS = {
         'ca': 'cat',
         'eu': 'eus',
@@ -195,6 +367,7 @@ class BaseFanvilPlugin(StandardPlugin):
         self._tftpboot_dir = os.path.join(self._tftpboot_dir, 'Fanvil')
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -202,7 +375,18 @@ class BaseFanvilPlugin(StandardPlugin):
         fetchfw_helper.root_dir = self._tftpboot_dir
 
         self.services = fetchfw_helper.services()
-        self.http_service = HTTPNoListingFileService(self._base_tftpboot_dir)
+        self._device_file_index = DeviceFileIndex(
+            self._tftpboot_dir,
+            b'/Fanvil/',
+            self._DEVICE_FILENAME_REGEX,
+            sharded=spec_cfg.get('sharded_device_files') is True,
+        )
+        self.http_service = RateLimitedHTTPService(
+            DeviceFileHTTPService(
+                HTTPNoListingFileService(self._base_tftpboot_dir),
+                self._device_file_index,
+            )
+        )
 
     def _dev_specific_filename(self, device: dict[str, str]) -> str:
         # Return the device specific filename (not pathname) of device
@@ -231,26 +415,63 @@ class BaseFanvilPlugin(StandardPlugin):
             raw_config['XX_server_url_without_scheme'] = base_url
             raw_config['XX_server_url'] = f"http://{base_url}"
 
+    def _add_shared_config(self, device, raw_config: dict[str, Any]) -> None:
+        # Only what depends on the device model and on settings shared by
+        # many devices, see configure_many
+        self._add_timezone(device, raw_config)
+        self._add_locale(device, raw_config)
+        self._add_sip_transport(raw_config)
+        self._add_server_url(raw_config)
+        self._add_firmware(device, raw_config)
+
     def configure(self, device, raw_config: dict[str, Any]) -> None:
+        self._configure(device, raw_config, self._add_shared_config)
+
+    def configure_many(self, devices_raw_configs):
+        """Configure each (device, raw_config) of devices_raw_configs.
+
+        This is like calling configure for each of them, except that what only
+        depends on the device model and on settings shared by many devices is
+        computed once per distinct model and settings.
+
+        Return the list of (device, exception) of the devices that could not
+        be configured.
+        """
+        shared_config_cache = SharedConfigCache(
+            self._add_shared_config, self._SHARED_CONFIG_KEYS
+        )
+        written, skipped = self._config_writer.written, self._config_writer.skipped
+        failures = []
+        for device, raw_config in devices_raw_configs:
+            try:
+                self._configure(device, raw_config, shared_config_cache.apply)
+            except Exception as e:
+                failures.append((device, e))
+        logger.info(
+            'Configured devices: %d files written, %d unchanged, %d failures',
+            self._config_writer.written - written,
+            self._config_writer.skipped - skipped,
+            len(failures),
+        )
+        return failures
+
+    def _configure(self, device, raw_config, add_shared_config) -> None:
         self._check_config(raw_config)
         self._check_device(device)
         self._check_lines_password(raw_config)
-        self._add_timezone(device, raw_config)
-        self._add_locale(device, raw_config)
-        self._add_sip_transport(raw_config)
-        self._update_lines(raw_config)
-        self._add_fkeys(device, raw_config)
+        add_shared_config(device, raw_config)
         self._add_phonebook_url(raw_config)
         self._add_phonebook_url_v2(raw_config)
+        self._update_lines(raw_config)
+        self._add_fkeys(device, raw_config)
         self._add_wazo_phoned_user_service_url(raw_config, 'dnd')
-        self._add_server_url(raw_config)
-        self._add_firmware(device, raw_config)
 
         filename = self._dev_specific_filename(device)
         tpl = self._tpl_helper.get_dev_template(filename, device)
 
-        path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        path = self._device_file_index.new_path(filename)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
+        self._device_file_index.add(filename)
 
     def deconfigure(self, device) -> None:
         self._remove_configuration_file(device)
@@ -266,14 +487,17 @@ class BaseFanvilPlugin(StandardPlugin):
             dst = os.path.join(self._tftpboot_dir, filename)
             raw_config['XX_fw_filename'] = fw_filename
             raw_config['XX_model_info'] = model_info
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _remove_configuration_file(self, device):
-        path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
+        filename = self._dev_specific_filename(device)
+        path = self._device_file_index.path(filename)
         try:
             os.remove(path)
         except OSError as e:
             logger.info('error while removing configuration file: %s', e)
+        else:
+            self._device_file_index.discard(filename)
 
     def synchronize(self, device, raw_config: dict[str, Any]):
         return synchronize.standard_sip_synchronize(device)
@@ -305,7 +529,7 @@ class BaseFanvilPlugin(StandardPlugin):
             lines['dst_wday'] = int(weekday) - 1
         return lines
 
-    def _extract_tzinfo(self, device, tzinfo):
+    def _extract_tzinfo(self, tzinfo):
         tz_all: dict[str, Any] = {}
         utc: int = tzinfo['utcoffset'].as_hours
         utc_list = self._TZ_INFO[utc]
@@ -325,11 +549,13 @@ class BaseFanvilPlugin(StandardPlugin):
     def _add_timezone(self, device, raw_config: dict[str, Any]):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                tz_all = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._extract_tzinfo
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
             else:
-                raw_config['XX_timezone'] = self._extract_tzinfo(device, tzinfo)
+                raw_config['XX_timezone'] = dict(tz_all)
 
     def _is_new_model(self, device):
         return self._NEW_MODEL_REGEX.match(device.get('model', '')) is not None
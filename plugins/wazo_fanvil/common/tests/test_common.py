@@ -3,8 +3,10 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-from unittest.mock import sentinel
+import copy
+import json
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock, patch, sentinel
 
 from ..common import BaseFanvilPlugin
 
@@ -43,3 +45,76 @@ class TestPlugin:
         assert results[2] == (1, 3, fkeys[2])
         assert results[3] == (2, 1, fkeys[3])
         assert results[4] == (3, 1, fkeys[4])
+
+
+class FanvilPlugin(BaseFanvilPlugin):
+    _COMMON_FILES = {}
+    _MODEL_FIRMWARE_MAPPING = {'X3S': 'x3s.z', 'X4U': 'x4u.z'}
+    _FUNCTION_KEYS_PER_PAGE = {'X4U': 10}
+    _LINE_KEYS_PER_PAGE = {'X4U': 6}
+    _TOP_FUNCTION_KEYS = {'X4U': 6}
+    _LOCALE = {'fr_FR': '4', 'en_US': '0'}
+    _TZ_INFO = {-6: [('UTC-06', -24)]}
+
+
+def _dump_raw_config(tpl, raw_config, filename, encoding, **kwargs):
+    with open(filename, 'w', encoding=encoding) as f:
+        json.dump(raw_config, f, sort_keys=True, default=repr)
+
+
+def _new_plugin(plugin_dir):
+    (plugin_dir / 'var' / 'tftpboot' / 'Fanvil').mkdir(parents=True)
+    with patch('plugins.wazo_fanvil.common.common.FetchfwPluginHelper'), patch(
+        'plugins.wazo_fanvil.common.common.TemplatePluginHelper'
+    ):
+        plugin = FanvilPlugin(MagicMock(), str(plugin_dir), {}, {})
+    plugin._tpl_helper.dump.side_effect = _dump_raw_config
+    return plugin
+
+
+class TestConfigure:
+    def test_configure_many_same_as_configure(self, tmp_path):
+        devices = [
+            {'mac': f'0c:38:3e:00:00:0{i}', 'model': model}
+            for i, model in enumerate(['X4U', 'X4U', 'X3S', 'X4U', 'X4U'])
+        ]
+        raw_configs: list[dict[str, Any]] = [
+            {
+                'ip': '10.0.0.1',
+                'http_port': 8667,
+                'locale': locale,
+                'timezone': 'America/Regina',
+                'sip_transport': 'tcp',
+                'config_version': 1,
+                'X_xivo_phonebook_ip': '10.0.0.2',
+                'X_xivo_user_uuid': f'user-{i}',
+                'exten_pickup_call': '*8',
+                'funckeys': {
+                    '1': {
+                        'type': 'speeddial',
+                        'value': f'100{i}',
+                        'label': 'Speed dial',
+                        'line': '1',
+                    },
+                },
+                'sip_lines': {'1': {'number': f'100{i}', 'password': 'autoprov'}},
+            }
+            for i, locale in enumerate(['fr_FR', 'fr_FR', 'fr_FR', 'en_US', 'fr_FR'])
+        ]
+        plugin = _new_plugin(tmp_path / 'configure')
+        for device, raw_config in zip(devices, copy.deepcopy(raw_configs)):
+            plugin.configure(device, raw_config)
+        plugin = _new_plugin(tmp_path / 'configure_many')
+
+        failures = plugin.configure_many(zip(devices, raw_configs))
+
+        assert failures == []
+        assert raw_configs[0]['XX_timezone'] == raw_configs[1]['XX_timezone']
+        assert raw_configs[0]['XX_timezone'] is not raw_configs[1]['XX_timezone']
+        for device in devices:
+            filename = plugin._dev_specific_filename(device)
+            expected = tmp_path / 'configure' / 'var' / 'tftpboot' / 'Fanvil' / filename
+            path = (
+                tmp_path / 'configure_many' / 'var' / 'tftpboot' / 'Fanvil' / filename
+            )
+            assert path.read_bytes() == expected.read_bytes()
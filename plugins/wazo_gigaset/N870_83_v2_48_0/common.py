@@ -6,13 +6,14 @@ Common code shared by the various wazo-gigaset plugins.
 """
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import re
-import time
+from typing import TYPE_CHECKING
 
 try:
-    from wazo_provd import plugins, synchronize, tzinform
+    from wazo_provd import plugins, synchronize
     from wazo_provd.devices.ident import RequestType
     from wazo_provd.devices.pgasso import BasePgAssociator, DeviceSupport
     from wazo_provd.plugins import (
@@ -25,7 +26,7 @@ try:
     from wazo_provd.util import format_mac, norm_mac
 except ImportError:
     # Compatibility with wazo < 24.02
-    from provd import plugins, synchronize, tzinform
+    from provd import plugins, synchronize
     from provd.devices.ident import RequestType
     from provd.devices.pgasso import BasePgAssociator, DeviceSupport
     from provd.plugins import FetchfwPluginHelper, StandardPlugin, TemplatePluginHelper
@@ -35,6 +36,18 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-gigaset')
 
 VENDOR = 'Gigaset'
@@ -79,6 +92,11 @@ class BaseGigasetPgAssociator(BasePgAssociator):
     def __init__(self, models):
         self._models = models
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._models)
+        return {VENDOR: VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -91,6 +109,19 @@ class BaseGigasetPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+_REG_START_PLACEHOLDER = 'XXREGSTARTXX'
+
+
+def _stamp_reg_start(content: bytes) -> bytes:
+    # Replace the RegStart placeholder by a timestamp derived from the rest of
+    # the content instead of the current time, so that the config file only
+    # changes when the config does.
+    value = int.from_bytes(hashlib.sha256(content).digest()[:8], 'big')
+    return content.replace(_REG_START_PLACEHOLDER.encode(), b'%d' % (value % 2**31))
+
+
 class BaseGigasetPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
 
@@ -218,6 +249,7 @@ class BaseGigasetPlugin(StandardPlugin):
         self._app = app
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
 
@@ -242,14 +274,13 @@ class BaseGigasetPlugin(StandardPlugin):
     def _fix_timezone(self, raw_config):
         timezone = raw_config.get('timezone', 'Greenwich')
         if timezone not in self._VALID_TZ_GIGASET:
-            tz_db = tzinform.TextTimezoneInfoDB()
-            tz_info = tz_db.get_timezone_info(timezone)['utcoffset'].as_hms
+            tz_info = _TIMEZONE_CACHE.get_timezone_info(timezone)['utcoffset'].as_hms
             offset_hour = tz_info[0]
             offset_minutes = tz_info[1]
             raw_config['timezone'] = self._FALLBACK_TZ[(offset_hour, offset_minutes)]
 
     def _add_xx_vars(self, device, raw_config):
-        raw_config['XX_epoch'] = int(time.time())
+        raw_config['XX_epoch'] = _REG_START_PLACEHOLDER
         self._fix_timezone(raw_config)
 
         if raw_config.get('http_base_url'):
@@ -311,7 +342,9 @@ class BaseGigasetPlugin(StandardPlugin):
         self._add_phonebook(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(
+            tpl, raw_config, path, self._ENCODING, transform=_stamp_reg_start
+        )
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
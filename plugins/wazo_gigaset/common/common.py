@@ -10,10 +10,10 @@ import datetime
 import logging
 import os
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 try:
-    from wazo_provd import plugins, synchronize, tzinform
+    from wazo_provd import plugins, synchronize
     from wazo_provd.devices.ident import DHCPRequest, RequestType
     from wazo_provd.devices.pgasso import BasePgAssociator, DeviceSupport
     from wazo_provd.plugins import (
@@ -26,7 +26,7 @@ try:
     from wazo_provd.util import format_mac, norm_mac
 except ImportError:
     # Compatibility with wazo < 24.02
-    from provd import plugins, synchronize, tzinform
+    from provd import plugins, synchronize
     from provd.devices.ident import DHCPRequest, RequestType
     from provd.devices.pgasso import BasePgAssociator, DeviceSupport
     from provd.plugins import FetchfwPluginHelper, StandardPlugin, TemplatePluginHelper
@@ -36,6 +36,22 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VDICache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-gigaset')
 
 VENDOR = 'Gigaset'
@@ -47,13 +63,22 @@ class GigasetDHCPDeviceInfoExtractor:
         'N510_IP_PRO': 'N510 IP PRO',
     }
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = (
+        'Gigaset_N720_DM_PRO',
+        'N510_IP_PRO',
+    )
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: DHCPRequest):
         options = request['options']
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
         return None
 
     def _extract_from_vdi(self, vdi: str):
@@ -120,6 +145,11 @@ class BaseGigasetPgAssociator(BasePgAssociator):
     def __init__(self, models):
         self._models = models
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._models)
+        return {VENDOR: VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -140,6 +170,9 @@ class HTTPServiceWrapper(HTTPNoListingFileService):
         logger.debug('Preprocessed path: %s', request.path)
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseGigasetPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
 
@@ -190,6 +223,7 @@ class BaseGigasetPlugin(StandardPlugin):
         self._app = app
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
 
@@ -224,8 +258,7 @@ class BaseGigasetPlugin(StandardPlugin):
 
     def _add_timezone_code(self, raw_config):
         timezone = raw_config.get('timezone', 'Etc/UTC')
-        tz_db = tzinform.TextTimezoneInfoDB()
-        tz_info = tz_db.get_timezone_info(timezone)['utcoffset'].as_hms
+        tz_info = _TIMEZONE_CACHE.get_timezone_info(timezone)['utcoffset'].as_hms
         offset_hour = tz_info[0]
         offset_minutes = tz_info[1]
         raw_config['XX_timezone_code'] = self._TZ_GIGASET[(offset_hour, offset_minutes)]
@@ -280,7 +313,7 @@ class BaseGigasetPlugin(StandardPlugin):
         self._add_server_url(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
@@ -15,6 +15,7 @@ import urllib.request
 from configparser import RawConfigParser
 from contextlib import closing
 from io import StringIO
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd.devices.ident import DHCPRequest, RequestType
@@ -30,6 +31,14 @@ except ImportError:
 
 from twisted.internet import defer, threads
 
+if TYPE_CHECKING or 'VDICache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import VDICache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
 logger = logging.getLogger('plugin.wazo-gigaset')
 
 VENDOR = 'Gigaset'
@@ -45,13 +54,25 @@ class BaseGigasetDHCPDeviceInfoExtractor:
         'C610_IP': 'C610 IP',
     }
 
+    # Sent by the supported devices, see _extract_from_vdi
+    _KNOWN_VDIS = (
+        'C470IP',
+        'C470_IP',
+        'S675IP',
+        'S675_IP',
+        'C590_IP',
+    )
+
+    def __init__(self) -> None:
+        self._vdi_cache = VDICache(self._extract_from_vdi, self._KNOWN_VDIS)
+
     def extract(self, request: DHCPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: DHCPRequest):
         options = request['options']
         if 60 in options:
-            return self._extract_from_vdi(options[60])
+            return self._vdi_cache.lookup(options[60])
         return None
 
     def _extract_from_vdi(self, vdi: str):
@@ -70,6 +91,11 @@ class BaseGigasetPgAssociator(BasePgAssociator):
     def __init__(self, models):
         self._models = models
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._models)
+        return {VENDOR: VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -6,6 +6,7 @@ from __future__ import annotations
 import logging
 import os.path
 import re
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import synchronize
@@ -33,6 +34,14 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
 logger = logging.getLogger('plugin.wazo-grandstream')
 
 TZ_NAME = {'Europe/Paris': 'CET-1CEST-2,M3.5.0/02:00:00,M10.5.0/03:00:00'}
@@ -106,6 +115,15 @@ class BaseGrandstreamPgAssociator(BasePgAssociator):
         self._models = models
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._models, self._version)
+        return {
+            'Grandstream': VendorSupport(
+                models, DeviceSupport.UNKNOWN, exact_version_prefix=True
+            )
+        }
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -186,6 +204,7 @@ class BaseGrandstreamPlugin(StandardPlugin):
         self._tftpboot_dir = os.path.join(self._tftpboot_dir, 'Grandstream')
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -226,7 +245,7 @@ class BaseGrandstreamPlugin(StandardPlugin):
         tpl = self._tpl_helper.get_dev_template(filename, device)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         self._remove_configuration_file(device)
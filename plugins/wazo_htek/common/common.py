@@ -6,9 +6,10 @@ from __future__ import annotations
 import logging
 import os.path
 import re
+from typing import TYPE_CHECKING
 
 try:
-    from wazo_provd import plugins, synchronize, tzinform
+    from wazo_provd import plugins, synchronize
     from wazo_provd.devices.config import RawConfigError
     from wazo_provd.devices.ident import RequestType
     from wazo_provd.devices.pgasso import BasePgAssociator, DeviceSupport
@@ -22,7 +23,7 @@ try:
     from wazo_provd.util import format_mac, norm_mac
 except ImportError:
     # Compatibility with wazo < 24.02
-    from provd import plugins, synchronize, tzinform
+    from provd import plugins, synchronize
     from provd.devices.config import RawConfigError
     from provd.devices.ident import RequestType
     from provd.devices.pgasso import BasePgAssociator, DeviceSupport
@@ -33,6 +34,18 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-htek')
 
 
@@ -77,6 +90,11 @@ class BaseHtekPgAssociator(BasePgAssociator):
         super().__init__()
         self._model_versions = model_versions
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._model_versions)
+        return {'Htek': VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -89,6 +107,9 @@ class BaseHtekPgAssociator(BasePgAssociator):
         return DeviceSupport.IMPROBABLE
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BaseHtekPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
     _LOCALE = {
@@ -210,6 +231,7 @@ class BaseHtekPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -224,7 +246,7 @@ class BaseHtekPlugin(StandardPlugin):
         for filename, tpl_filename in self._COMMON_FILES:
             tpl = self._tpl_helper.get_template(f'common/{tpl_filename}')
             dst = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _update_sip_lines(self, raw_config):
         for line_no, line in raw_config['sip_lines'].items():
@@ -320,8 +342,7 @@ class BaseHtekPlugin(StandardPlugin):
 
     def _add_timezone(self, raw_config):
         timezone = raw_config.get('timezone', 'Etc/UTC')
-        tz_db = tzinform.TextTimezoneInfoDB()
-        tz_timezone_info = tz_db.get_timezone_info(timezone)
+        tz_timezone_info = _TIMEZONE_CACHE.get_timezone_info(timezone)
         tz_info = tz_timezone_info['utcoffset'].as_hms
         offset_hour = tz_info[0]
         offset_minutes = tz_info[1]
@@ -380,7 +401,7 @@ class BaseHtekPlugin(StandardPlugin):
         raw_config['XX_options'] = device.get('options', {})
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
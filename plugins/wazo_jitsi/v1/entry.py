@@ -36,6 +36,10 @@ from twisted.web.resource import Resource
 
 logger = logging.getLogger('plugin.wazo-jitsi')
 
+config_files: dict[str, Any] = {}
+execfile_('config_files.py', config_files)  # type: ignore[name-defined]
+ConfigFileWriter = config_files['ConfigFileWriter']
+
 
 class JitsiHTTPDeviceInfoExtractor:
     _UA_REGEX = re.compile(r'^Jitsi/(\S+)$')
@@ -128,6 +132,7 @@ class JitsiPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         root_resource = Resource()
         root_resource.putChild(b'jitsi', JitsiHTTPService(self._tftpboot_dir))
@@ -159,7 +164,7 @@ class JitsiPlugin(StandardPlugin):
         tpl = self._tpl_helper.get_dev_template(filename, device)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._device_config_filename(device))
@@ -1,13 +1,9 @@
 # Copyright 2013-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,19 +17,22 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('01.133', 'wazo-panasonic-01.133')
 def build_01_133(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/*',
-            'common/',
-            path,
-        ]
+    copy_tree('common/', path, include=['/templates/*'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py'],
+        exclude=['*'],
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v01_133/', path])
+    copy_tree('v01_133/', path)
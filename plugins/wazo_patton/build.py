@@ -1,14 +1,10 @@
 """
 Copyright 2016-2023 The Wazo Authors  (see the AUTHORS file)
 SPDX-License-Identifier: GPL-3.0-or-later
-
-Depends on the following external programs:
- -rsync
 """
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -22,14 +18,34 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
 
 @target('6.11', 'wazo-patton-6.11')
 def build_6_11(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v6_11/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('v6_11/', path)
 
 
 @target('6.9', 'wazo-patton-6.9')
 def build_6_9(path: str) -> None:
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'common/', path])
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v6_9/', path])
+    copy_tree('common/', path)
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('v6_9/', path)
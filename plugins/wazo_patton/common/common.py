@@ -7,6 +7,7 @@ import logging
 import os.path
 import re
 from operator import itemgetter
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd import synchronize, tzinform
@@ -32,6 +33,18 @@ except ImportError:
 
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-patton')
 
 
@@ -77,6 +90,11 @@ class BasePattonPgAssociator(BasePgAssociator):
         self._models = models
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict.fromkeys(self._models, self._version)
+        return {'Patton': VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -284,6 +302,19 @@ class _SIPLinesConverter:
         return list(self._servers)
 
 
+def _format_timezone_and_dst(tzinfo) -> dict[str, str]:
+    converter = _TimezoneConverter(tzinfo)
+    timezone_and_dst = {'XX_timezone_offset': converter.default_offset()}
+    if converter.has_dst():
+        timezone_and_dst['XX_dst_offset'] = converter.dst_offset()
+        timezone_and_dst['XX_dst_start'] = converter.dst_start()
+        timezone_and_dst['XX_dst_end'] = converter.dst_end()
+    return timezone_and_dst
+
+
+_TIMEZONE_CACHE = TimezoneCache()
+
+
 class BasePattonPlugin(StandardPlugin):
     _ENCODING = 'ascii'
     _SIP_DTMF_MODE = {
@@ -296,6 +327,7 @@ class BasePattonPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -315,16 +347,13 @@ class BasePattonPlugin(StandardPlugin):
     def _add_timezone_and_dst(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                timezone_and_dst = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], _format_timezone_and_dst
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
             else:
-                converter = _TimezoneConverter(tzinfo)
-                raw_config['XX_timezone_offset'] = converter.default_offset()
-                if converter.has_dst():
-                    raw_config['XX_dst_offset'] = converter.dst_offset()
-                    raw_config['XX_dst_start'] = converter.dst_start()
-                    raw_config['XX_dst_end'] = converter.dst_end()
+                raw_config.update(timezone_and_dst)
 
     def _update_sip_transport(self, raw_config):
         if 'sip_transport' not in raw_config:
@@ -370,7 +399,7 @@ class BasePattonPlugin(StandardPlugin):
         self._add_lines_and_servers(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING, errors='ignore')
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING, errors='ignore')
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
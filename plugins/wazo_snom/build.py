@@ -1,16 +1,11 @@
 """
 Copyright 2014-2023 The Wazo Authors  (see the AUTHORS file)
 SPDX-License-Identifier: GPL-3.0-or-later
-
-Depends on the following external programs:
- - rsync
- - sed
 """
 from __future__ import annotations
 
 from pathlib import Path
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -24,6 +19,19 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
+    def expand_template(
+        src: str, dst: str | Path, placeholders: dict[str, str]
+    ) -> None:
+        """The `expand_template` method is injected by the build script."""
+
 
 @target('8.7.5.35', 'wazo-snom-8.7.5.35')
 def build_8_7_5_35(path: str) -> None:
@@ -43,8 +51,18 @@ def build_8_7_5_35(path: str) -> None:
         ('MP', 'r'),
         ('PA1', 'f'),
     ]
-    check_call(
-        ['rsync', '-rlp', '--exclude', '.*', '--exclude', '*.btpl', 'common/', path]
+    copy_tree('common/', path, exclude=['*.btpl'])
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
@@ -52,94 +70,82 @@ def build_8_7_5_35(path: str) -> None:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
 
-        sed_script = f's/#FW_FILENAME#/snom{model}-8.7.5.35-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-8.7.5.35-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v8_7_5_35/', path])
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
+    copy_tree('v8_7_5_35/', path)
 
 
 @target('8.9.3.40', 'wazo-snom-8.9.3.40')
 def build_8_9_3_40(path: str) -> None:
     MODELS = [('D745', 'r')]
 
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/D745.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/D745.tpl'],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-8.9.3.40-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-8.9.3.40-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v8_9_3_40/', path])
+    copy_tree('v8_9_3_40/', path)
 
 
 @target('8.9.3.60', 'wazo-snom-8.9.3.60')
@@ -151,59 +157,53 @@ def build_8_9_3_60(path: str) -> None:
         ('D375', 'r'),
     ]
 
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/D3*5.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/D3*5.tpl'],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-8.9.3.60-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-8.9.3.60-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v8_9_3_60/', path])
+    copy_tree('v8_9_3_60/', path)
 
 
 @target('8.9.3.80', 'wazo-snom-8.9.3.80')
@@ -222,59 +222,53 @@ def build_8_9_3_80(path):
         ('760', 'r'),
         ('D765', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/D3*5.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/D3*5.tpl'],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-8.9.3.80-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-8.9.3.80-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v8_9_3_80/', path])
+    copy_tree('v8_9_3_80/', path)
 
 
 @target('10.1.20.0', 'wazo-snom-10.1.20.0')
@@ -282,59 +276,53 @@ def build_10_1_20_0(path):
     MODELS = [
         ('D785', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/D785.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/D785.tpl'],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.20.0-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.20.0-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_20_0/', path])
+    copy_tree('v10_1_20_0/', path)
 
 
 @target('10.1.26.1', 'wazo-snom-10.1.26.1')
@@ -342,59 +330,53 @@ def build_10_1_26_1(path):
     MODELS = [
         ('D735', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/D735.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/D735.tpl'],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.26.1-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.26.1-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_26_1/', path])
+    copy_tree('v10_1_26_1/', path)
 
 
 @target('10.1.39.11', 'wazo-snom-10.1.39.11')
@@ -409,63 +391,58 @@ def build_10_1_39_11(path):
         ('D765', 'r'),
         ('D785', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D375.tpl',
-            '--include',
             '/templates/D717.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.39.11-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.39.11-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_39_11/', path])
+    copy_tree('v10_1_39_11/', path)
 
 
 @target('10.1.46.16', 'wazo-snom-10.1.46.16')
@@ -488,27 +465,28 @@ def build_10_1_46_16(path):
         ('D785', 'r'),
     ]
 
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D717.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
@@ -517,36 +495,30 @@ def build_10_1_46_16(path):
         model_tpl = (
             Path(path) / 'templates' / 'common' / f'snom{model}-firmware.xml.tpl'
         )
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.46.16-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.46.16-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_46_16/', path])
+    copy_tree('v10_1_46_16/', path)
 
 
 @target('10.1.49.11', 'wazo-snom-10.1.49.11')
@@ -569,63 +541,58 @@ def build_10_1_49_11(path):
         ('D785', 'r'),
     ]
 
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D717.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.46.16-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.46.16-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_49_11/', path])
+    copy_tree('v10_1_49_11/', path)
 
 
 @target('10.1.51.12', 'wazo-snom-10.1.51.12')
@@ -647,63 +614,58 @@ def build_10_1_51_12(path):
         ('D765', 'r'),
         ('D785', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D717.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.51.12-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.51.12-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_51_12/', path])
+    copy_tree('v10_1_51_12/', path)
 
 
 @target('10.1.54.13', 'wazo-snom-10.1.54.13')
@@ -725,63 +687,58 @@ def build_10_1_54_13(path):
         ('D765', 'r'),
         ('D785', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D717.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.54.13-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.54.13-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_54_13/', path])
+    copy_tree('v10_1_54_13/', path)
 
 
 @target('05.20.0001', 'wazo-snom-dect-05.20.0001')
@@ -791,71 +748,57 @@ def build_05_20_0001(path):
         'M700',
         'M900',
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common_dect/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/M300.tpl',
-            '--include',
             '/templates/M700.tpl',
-            '--include',
             '/templates/M900.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common_dect/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/{model}_v0520_b0001.fwu/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common_dect/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'{model}_v0520_b0001.fwu'
+        expand_template(
+            'common_dect/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common_dect/templates/common/snom-model.htm.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        expand_template(
+            'common_dect/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common_dect/templates/common/snom-model.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        expand_template(
+            'common_dect/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v05_20_0001/', path])
+    copy_tree('v05_20_0001/', path)
 
 
 @target('10.1.101.11', 'wazo-snom-10.1.101.11')
@@ -872,67 +815,60 @@ def build_10_1_101_11(path):
         ('D735', 'r'),
         ('D785', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D712.tpl',
-            '--include',
             '/templates/D717.tpl',
-            '--include',
             '/templates/7*5.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.101.11-SIP-{fw_suffix}.bin/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+        fw_filename = f'snom{model}-10.1.101.11-SIP-{fw_suffix}.bin'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_101_11/', path])
+    copy_tree('v10_1_101_11/', path)
 
 
 @target('10.1.141.13', 'wazo-snom-10.1.141.13')
@@ -952,69 +888,62 @@ def build_10_1_141_13(path):
         ('D862', 'r'),
         ('D865', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D71*.tpl',
-            '--include',
             '/templates/7*5.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D86*.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.141.13-SIP-{fw_suffix}.bin/'
+        fw_filename = f'snom{model}-10.1.141.13-SIP-{fw_suffix}.bin'
         if model.startswith("D8"):
-            sed_script = f's/#FW_FILENAME#/snom{model}-10.1.141.13-SIP-{fw_suffix}.swu/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+            fw_filename = f'snom{model}-10.1.141.13-SIP-{fw_suffix}.swu'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_141_13/', path])
+    copy_tree('v10_1_141_13/', path)
 
 
 @target('10.1.152.12', 'wazo-snom-10.1.152.12')
@@ -1034,69 +963,62 @@ def build_10_1_152_12(path):
         ('D862', 'r'),
         ('D865', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D71*.tpl',
-            '--include',
             '/templates/7*5.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D86*.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.152.12-SIP-{fw_suffix}.bin/'
+        fw_filename = f'snom{model}-10.1.152.12-SIP-{fw_suffix}.bin'
         if model.startswith("D8"):
-            sed_script = f's/#FW_FILENAME#/snom{model}-10.1.152.12-SIP-{fw_suffix}.swu/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+            fw_filename = f'snom{model}-10.1.152.12-SIP-{fw_suffix}.swu'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_152_12/', path])
+    copy_tree('v10_1_152_12/', path)
 
 
 @target('10.1.159.12', 'wazo-snom-10.1.159.12')
@@ -1116,69 +1038,62 @@ def build_10_1_159_12(path):
         ('D862', 'r'),
         ('D865', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D71*.tpl',
-            '--include',
             '/templates/7*5.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D86*.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.159.12-SIP-{fw_suffix}.bin/'
+        fw_filename = f'snom{model}-10.1.159.12-SIP-{fw_suffix}.bin'
         if model.startswith("D8"):
-            sed_script = f's/#FW_FILENAME#/snom{model}-10.1.159.12-SIP-{fw_suffix}.swu/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+            fw_filename = f'snom{model}-10.1.159.12-SIP-{fw_suffix}.swu'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_159_12/', path])
+    copy_tree('v10_1_159_12/', path)
 
 
 @target('10.1.175.16', 'wazo-snom-10.1.175.16')
@@ -1198,69 +1113,62 @@ def build_10_1_175_16(path):
         ('D862', 'r'),
         ('D865', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
+    copy_tree(
+        'common/',
+        path,
+        include=[
             '/templates/base.tpl',
-            '--include',
             '/templates/D3*5.tpl',
-            '--include',
             '/templates/D71*.tpl',
-            '--include',
             '/templates/7*5.tpl',
-            '--include',
             '/templates/D7*5.tpl',
-            '--include',
             '/templates/D86*.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+        ],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.175.16-SIP-{fw_suffix}.bin/'
+        fw_filename = f'snom{model}-10.1.175.16-SIP-{fw_suffix}.bin'
         if model.startswith("D8"):
-            sed_script = f's/#FW_FILENAME#/snom{model}-10.1.175.16-SIP-{fw_suffix}.swu/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+            fw_filename = f'snom{model}-10.1.175.16-SIP-{fw_suffix}.swu'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_175_16/', path])
+    copy_tree('v10_1_175_16/', path)
 
 
 @target('10.1.184.15', 'wazo-snom-10.1.184.15')
@@ -1269,58 +1177,52 @@ def build_10_1_184_15(path):
         ('D812', 'r'),
         ('D815', 'r'),
     ]
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/D81*.tpl',
-            '--exclude',
-            '/templates/*.tpl',
-            '--exclude',
-            '*.btpl',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/D81*.tpl'],
+        exclude=['/templates/*.tpl', '*.btpl'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=[
+            'config_files.py',
+            'device_files.py',
+            'extraction.py',
+            'support_table.py',
+            'timezones.py',
+        ],
+        exclude=['*'],
     )
     template_dir = Path(path) / 'templates' / 'common'
 
     for model, fw_suffix in MODELS:
         # generate snom<model>-firmware.xml.tpl from snom-model-firmware.xml.tpl.btpl
         model_tpl = template_dir / f'snom{model}-firmware.xml.tpl'
-        sed_script = f's/#FW_FILENAME#/snom{model}-10.1.184.15-SIP-{fw_suffix}.bin/'
+        fw_filename = f'snom{model}-10.1.184.15-SIP-{fw_suffix}.bin'
         if model.startswith("D8"):
-            sed_script = f's/#FW_FILENAME#/snom{model}-10.1.184.15-SIP-{fw_suffix}.swu/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                [
-                    'sed',
-                    sed_script,
-                    'common/templates/common/snom-model-firmware.xml.tpl.btpl',
-                ],
-                stdout=f,
-            )
+            fw_filename = f'snom{model}-10.1.184.15-SIP-{fw_suffix}.swu'
+        expand_template(
+            'common/templates/common/snom-model-firmware.xml.tpl.btpl',
+            model_tpl,
+            {'#FW_FILENAME#': fw_filename},
+        )
 
         # generate snom<model>.htm.tpl from snom-model.htm.tpl.mtpl
         model_tpl = template_dir / f'snom{model}.htm.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.htm.tpl.btpl'],
-                stdout=f,
-            )
+        expand_template(
+            'common/templates/common/snom-model.htm.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
 
         # generate snom<model>.xml.tpl from snom-model.xml.mtpl
         model_tpl = template_dir / f'snom{model}.xml.tpl'
-        sed_script = f's/#MODEL#/{model}/'
-        with model_tpl.open(mode='wb') as f:
-            check_call(
-                ['sed', sed_script, 'common/templates/common/snom-model.xml.tpl.btpl'],
-                stdout=f,
-            )
-
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'v10_1_184_15/', path])
+        expand_template(
+            'common/templates/common/snom-model.xml.tpl.btpl',
+            model_tpl,
+            {'#MODEL#': model},
+        )
+
+    copy_tree('v10_1_184_15/', path)
@@ -8,10 +8,9 @@ import logging
 import os.path
 import re
 from operator import itemgetter
+from typing import TYPE_CHECKING
 from xml.sax.saxutils import escape
 
-from pkg_resources import parse_version
-
 try:
     from wazo_provd import plugins, synchronize, tzinform
     from wazo_provd.devices.config import RawConfigError
@@ -35,32 +34,68 @@ except ImportError:
     from provd.servers.http import HTTPNoListingFileService
     from provd.servers.http_site import Request
     from provd.util import format_mac, norm_mac
+
 from twisted.internet import defer
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'DeviceFileIndex' not in globals():
+    # Executed beforehand from device_files.py by entry.py in a built plugin
+    from ...shared.device_files import DeviceFileHTTPService, DeviceFileIndex
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport, parse_version
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-snom')
 
 
 class BaseSnomHTTPDeviceInfoExtractor:
-    _UA_REGEX = re.compile(r'\bsnom(\w+)-SIP ([\d.]+)')
-    _UA_REGEX_MAC = re.compile(r'\bsnom(\w+)-SIP\s([\d.]+)\s(.+)\s(?P<mac>[0-9A-F]+)')
+    # Match the complete UA first, with a fallback on model and version only
+    _UA_REGEX = re.compile(
+        r'\bsnom(?P<model>\w+)-SIP'
+        r'(?:\s(?P<version>[\d.]+)\s.+\s(?P<mac>[0-9A-F]+)| (?P<short_version>[\d.]+))'
+    )
+    _UA_TOKEN = b'snom'
     _PATH_REGEX = re.compile(r'\bsnom\w+-([\dA-F]{12})\.htm$')
 
+    def __init__(self) -> None:
+        self._extraction_cache = ExtractionCache()
+
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
         device_info = {}
-        ua = request.getHeader(b'User-Agent')
         raw_mac = request.args.get(b'mac', [None])[0]
         if raw_mac:
             logger.debug('Got MAC from URL: %s', raw_mac)
             device_info['mac'] = norm_mac(raw_mac.decode('ascii'))
-        if ua:
+        info_from_request = self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+        if info_from_request:
+            device_info.update(info_from_request)
+        return device_info
+
+    def _extract_from_request(self, request: Request):
+        ua = request.getHeader(b'User-Agent')
+        if ua and self._UA_TOKEN in ua:
             info_from_ua = self._extract_from_ua(ua.decode('ascii'))
             if info_from_ua:
-                device_info.update(info_from_ua)
-                self._extract_from_path(request.path.decode('ascii'), device_info)
-        return device_info
+                self._extract_from_path(request.path.decode('ascii'), info_from_ua)
+                return info_from_ua
+        return None
 
     def _extract_from_ua(self, ua: str):
         # HTTP User-Agent:
@@ -76,23 +111,20 @@ class BaseSnomHTTPDeviceInfoExtractor:
         #   "Mozilla/4.0 (compatible; snomPA1-SIP 8.4.35 1.1.3-s)"
         #   "Mozilla/4.0 (compatible; snomD785-SIP
         #    10.1.33.33 2010.12-00004-g9ba52f5 000413922D24 SXM:0 UXM:0)"
-        m = self._UA_REGEX_MAC.search(ua)
-        if m:
-            raw_model, raw_version, _, raw_mac = m.groups()
-            return {
-                'vendor': 'Snom',
-                'model': raw_model,
-                'mac': norm_mac(raw_mac),
-                'version': raw_version,
-            }
-        # if the complete regex did not match, match a smaller one
         m = self._UA_REGEX.search(ua)
         if m:
-            raw_model, raw_version = m.groups()
+            raw_model, raw_mac = m.group('model', 'mac')
+            if raw_mac:
+                return {
+                    'vendor': 'Snom',
+                    'model': raw_model,
+                    'mac': norm_mac(raw_mac),
+                    'version': m.group('version'),
+                }
             return {
                 'vendor': 'Snom',
                 'model': raw_model,
-                'version': raw_version,
+                'version': m.group('short_version'),
             }
         return None
 
@@ -104,10 +136,23 @@ class BaseSnomHTTPDeviceInfoExtractor:
 
 
 class BaseSnomPgAssociator(BasePgAssociator):
+    _MIN_VERSION = parse_version('7.0.0.0')
+
     def __init__(self, models, version):
         self._models = models
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        return {
+            'Snom': VendorSupport(
+                dict.fromkeys(self._models, self._version),
+                DeviceSupport.PROBABLE,
+                no_version=DeviceSupport.PROBABLE,
+                min_version=self._MIN_VERSION,
+            )
+        }
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -127,12 +172,12 @@ class BaseSnomPgAssociator(BasePgAssociator):
 
     def _is_incompatible_version(self, version):
         try:
-            maj_version = parse_version(version)
-            if maj_version < parse_version('7.0.0.0'):
-                return True
-        except (IndexError, ValueError):
-            pass
-        return False
+            return parse_version(version) < self._MIN_VERSION
+        except ValueError:
+            return False
+
+
+_TIMEZONE_CACHE = TimezoneCache()
 
 
 class BaseSnomPlugin(StandardPlugin):
@@ -171,17 +216,29 @@ class BaseSnomPlugin(StandardPlugin):
         },
     }
     _SENSITIVE_FILENAME_REGEX = re.compile(r'^[0-9A-F]{12}\.xml')
+    _DEVICE_FILENAME_REGEX = re.compile(
+        rb'(?:snom\w+-)?[0-9A-F]{10}([0-9A-F]{2})\.(?:htm|xml)'
+    )
 
     def __init__(self, app, plugin_dir, gen_cfg, spec_cfg):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
 
         self.services = fetchfw_helper.services()
-        self.http_service = HTTPNoListingFileService(self._tftpboot_dir)
+        self._device_file_index = DeviceFileIndex(
+            self._tftpboot_dir,
+            b'/',
+            self._DEVICE_FILENAME_REGEX,
+            sharded=spec_cfg.get('sharded_device_files') is True,
+        )
+        self.http_service = DeviceFileHTTPService(
+            HTTPNoListingFileService(self._tftpboot_dir), self._device_file_index
+        )
 
     http_dev_info_extractor = BaseSnomHTTPDeviceInfoExtractor()
 
@@ -212,7 +269,7 @@ class BaseSnomPlugin(StandardPlugin):
         for tpl_filename, filename in self._common_templates():
             tpl = self._tpl_helper.get_template(tpl_filename)
             dst = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _update_sip_lines(self, raw_config):
         proxy_ip = raw_config.get('sip_proxy_ip')
@@ -276,7 +333,7 @@ class BaseSnomPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config and 'XX_lang' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                tzinfo = _TIMEZONE_CACHE.get_timezone_info(raw_config['timezone'])
             except tzinform.TimezoneNotFoundError as e:
                 logger.warning('Unknown timezone %s: %s', raw_config['timezone'], e)
             else:
@@ -371,24 +428,28 @@ class BaseSnomPlugin(StandardPlugin):
         raw_config['XX_dict'] = self._gen_xx_dict(raw_config)
         raw_config['XX_options'] = device.get('options', {})
 
-        path = os.path.join(self._tftpboot_dir, xml_filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        path = self._device_file_index.new_path(xml_filename)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
+        self._device_file_index.add(xml_filename)
 
         # generate htm file
         tpl = self._tpl_helper.get_template('other/base.htm.tpl')
 
         raw_config['XX_xml_filename'] = xml_filename
 
-        path = os.path.join(self._tftpboot_dir, htm_filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        path = self._device_file_index.new_path(htm_filename)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
+        self._device_file_index.add(htm_filename)
 
     def deconfigure(self, device):
         for filename in self._dev_specific_filenames(device):
             try:
-                os.remove(os.path.join(self._tftpboot_dir, filename))
+                os.remove(self._device_file_index.path(filename))
             except OSError as e:
                 # ignore
                 logger.info('error while removing file: %s', e)
+            else:
+                self._device_file_index.discard(filename)
 
     def synchronize(self, device, raw_config):
         return synchronize.standard_sip_synchronize(
@@ -1,13 +1,10 @@
 # Copyright 2013-2024 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-# Depends on the following external programs:
-#  -rsync
-
 from __future__ import annotations
 
-from subprocess import check_call
-from typing import TYPE_CHECKING, Callable
+import os
+from typing import TYPE_CHECKING, Callable, Sequence
 
 if TYPE_CHECKING:
 
@@ -21,65 +18,81 @@ if TYPE_CHECKING:
 
         return wrapper
 
+    def copy_tree(
+        src: str,
+        dst: str,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        """The `copy_tree` method is injected in `exec` call by the build script."""
+
+    def write_json_data(
+        src: str, function_name: str, dst: str | os.PathLike[str]
+    ) -> None:
+        """The `write_json_data` method is injected by the build script."""
+
 
 @target('ST2022-4.78.1', 'wazo-technicolor-ST2022-4.78.1')
 def build_ST2022_4_78_1(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/ST2022.tpl',
-            '--exclude',
-            '/templates/*',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/ST2022.tpl'],
+        exclude=['/templates/*'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('ST2022_v4_78_1/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'ST2022_v4_78_1/', path])
 
 
 @target('ST2030-2.74', 'wazo-technicolor-ST2030-2.74')
 def build_ST2030_2_74(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/ST2030.tpl',
-            '--exclude',
-            '/templates/*',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/ST2030.tpl'],
+        exclude=['/templates/*'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('ST2030_v2_74/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'ST2030_v2_74/', path])
 
 
 @target('TB30-1.74.0', 'wazo-technicolor-TB30-1.74.0')
 def build_TB30_1_74_0(path: str) -> None:
-    check_call(
-        [
-            'rsync',
-            '-rlp',
-            '--exclude',
-            '.*',
-            '--include',
-            '/templates/base.tpl',
-            '--include',
-            '/templates/TB30.tpl',
-            '--exclude',
-            '/templates/*',
-            'common/',
-            path,
-        ]
+    copy_tree(
+        'common/',
+        path,
+        include=['/templates/base.tpl', '/templates/TB30.tpl'],
+        exclude=['/templates/*'],
+    )
+    copy_tree(
+        '../shared/',
+        path,
+        include=['config_files.py', 'support_table.py', 'timezones.py'],
+        exclude=['*'],
+    )
+    copy_tree('TB30_v1_74_0/', path)
+    write_json_data(
+        'common/common.py',
+        '_gen_tz_map_entries',
+        os.path.join(path, 'tz_map.json'),
     )
-    check_call(['rsync', '-rlp', '--exclude', '.*', 'TB30_v1_74_0/', path])
@@ -3,10 +3,11 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os.path
 import re
-import time
 from typing import TYPE_CHECKING
 
 try:
@@ -58,6 +59,18 @@ if TYPE_CHECKING:
         dst: DSTInfoDict
 
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
+
 logger = logging.getLogger('plugin.wazo-technicolor')
 
 
@@ -106,6 +119,11 @@ class BaseTechnicolorPgAssociator(BasePgAssociator):
         self._model = model
         self._version = version
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = {self._model: self._version}
+        return {'Technicolor': VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -185,22 +203,54 @@ _ZONE_LIST = [
     'Pacific/Tongatapu',  # Nuku'alofa
 ]
 
+_TZ_MAP_FILENAME = 'tz_map.json'
+
 
-def _gen_tz_map() -> dict[str, dict[str | None, int]]:
-    result: dict[str, dict[str | None, int]] = {}
+def _gen_tz_map_entries() -> list[tuple[int, str | None, int]]:
+    # Also called by the build script, which ships the result in the built
+    # plugin as _TZ_MAP_FILENAME.
+    entries: list[tuple[int, str | None, int]] = []
     for i, tz_name in enumerate(_ZONE_LIST):
-        inform = tzinform.get_timezone_info(tz_name)
-        inner_dict = result.setdefault(inform['utcoffset'].as_minutes, {})
-        if not inform['dst']:
-            inner_dict[None] = i
-        else:
-            inner_dict[inform['dst']['as_string']] = i
+        tzinfo = tzinform.get_timezone_info(tz_name)
+        dst = tzinfo['dst']['as_string'] if tzinfo['dst'] else None
+        entries.append((tzinfo['utcoffset'].as_minutes, dst, i))
+    return entries
+
+
+def _load_tz_map(plugin_dir: str) -> dict[int, dict[str | None, int]]:
+    try:
+        with open(os.path.join(plugin_dir, _TZ_MAP_FILENAME)) as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        # Intentional fallback: the plugin was built without wazo-provd, so
+        # pgbuild could not precompute the map (see write_json_data)
+        logger.info('No precomputed timezone map, computing it')
+        entries = _gen_tz_map_entries()
+    result: dict[int, dict[str | None, int]] = {}
+    for utcoffset_m, dst, i in entries:
+        result.setdefault(utcoffset_m, {})[dst] = i
     return result
 
 
+_TIMEZONE_CACHE = TimezoneCache()
+
+
+_CONFIG_SN_PLACEHOLDER = 'XXCONFIGSNXX'
+
+
+def _stamp_config_sn(content: bytes) -> bytes:
+    # Replace the config_sn placeholder by 12 digits derived from the rest of
+    # the content, so that config_sn only changes when the config does.
+    value = int.from_bytes(hashlib.sha256(content).digest()[:8], 'big')
+    return content.replace(
+        _CONFIG_SN_PLACEHOLDER.encode(), b'%012d' % (value % 10**12)
+    )
+
+
 class BaseTechnicolorPlugin(StandardPlugin):
     _ENCODING = 'ISO-8859-1'
-    _TZ_MAP = _gen_tz_map()
+    # loaded on first use, see _get_tz_map
+    _TZ_MAP: dict[int, dict[str | None, int]] | None = None
     _LOCALE = {
         # <locale id>, (<langage type>, <country code>)
         'de_DE': ('3', 'DE'),
@@ -224,6 +274,7 @@ class BaseTechnicolorPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -238,7 +289,7 @@ class BaseTechnicolorPlugin(StandardPlugin):
         for tpl_filename, filename in self._COMMON_TEMPLATES:
             tpl = self._tpl_helper.get_template(tpl_filename)
             dst = os.path.join(self._tftpboot_dir, filename)
-            self._tpl_helper.dump(tpl, raw_config, dst, self._ENCODING)
+            self._config_writer.dump(tpl, raw_config, dst, self._ENCODING)
 
     def _add_country_and_lang(self, raw_config):
         locale = raw_config.get('locale')
@@ -249,8 +300,9 @@ class BaseTechnicolorPlugin(StandardPlugin):
 
     def _add_config_sn(self, raw_config):
         # The only thing config_sn needs to be is 12 digit long and different
-        # from one config file to another.
-        raw_config['XX_config_sn'] = f'{time.time():012f}'
+        # from one config file to another. The placeholder is replaced by
+        # _stamp_config_sn when the config file is written.
+        raw_config['XX_config_sn'] = _CONFIG_SN_PLACEHOLDER
 
     def _add_dtmf_mode_flag(self, raw_config):
         dtmf_mode = raw_config.get('sip_dtmf_mode')
@@ -270,18 +322,25 @@ class BaseTechnicolorPlugin(StandardPlugin):
             return self._XX_PHONEBOOK_NAME.get(language, self._XX_PHONEBOOK_NAME_DEF)
         return self._XX_PHONEBOOK_NAME_DEF
 
+    def _get_tz_map(self) -> dict[int, dict[str | None, int]]:
+        tz_map = self._TZ_MAP
+        if tz_map is None:
+            tz_map = type(self)._TZ_MAP = _load_tz_map(self._plugin_dir)
+        return tz_map
+
     def _tzinfo_to_zone_num(self, tzinfo: TimeZoneInfoDict):
+        tz_map = self._get_tz_map()
         utcoffset_m = tzinfo['utcoffset'].as_minutes
-        if utcoffset_m not in self._TZ_MAP:
+        if utcoffset_m not in tz_map:
             # No UTC offset matching. Let's try finding one relatively close...
             for supp_offset in [30, -30, 60, -60]:
-                if utcoffset_m + supp_offset in self._TZ_MAP:
+                if utcoffset_m + supp_offset in tz_map:
                     utcoffset_m += supp_offset
                     break
             else:
                 return self._XX_NTP_ZONE_NUM_DEF
 
-        dst_map = self._TZ_MAP[utcoffset_m]
+        dst_map = tz_map[utcoffset_m]
         dst_key: str | None
         if tzinfo['dst']:
             dst_key = tzinfo['dst']['as_string']
@@ -300,11 +359,11 @@ class BaseTechnicolorPlugin(StandardPlugin):
         raw_config['XX_ntp_zone_num'] = self._NTP_ZONE_NUM_DEF
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_ntp_zone_num'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._tzinfo_to_zone_num
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.info('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_ntp_zone_num'] = self._tzinfo_to_zone_num(tzinfo)
 
     def _add_fkeys(self, raw_config):
         funckeys = raw_config['funckeys']
@@ -376,7 +435,14 @@ class BaseTechnicolorPlugin(StandardPlugin):
         raw_config['XX_nb_lines'] = self._NB_LINES
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING, errors='replace')
+        self._config_writer.dump(
+            tpl,
+            raw_config,
+            path,
+            self._ENCODING,
+            transform=_stamp_config_sn,
+            errors='replace',
+        )
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
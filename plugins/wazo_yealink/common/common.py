@@ -3,9 +3,14 @@
 
 from __future__ import annotations
 
+import copy
 import logging
+import math
 import os.path
 import re
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable
 
 try:
     from wazo_provd import plugins, synchronize, tzinform
@@ -31,6 +36,27 @@ except ImportError:
     from provd.servers.http_site import Request
     from provd.util import format_mac, norm_mac
 from twisted.internet import defer
+from twisted.web.resource import Resource
+
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'DeviceFileIndex' not in globals():
+    # Executed beforehand from device_files.py by entry.py in a built plugin
+    from ...shared.device_files import DeviceFileHTTPService, DeviceFileIndex
+
+if TYPE_CHECKING or 'ExtractionCache' not in globals():
+    # Executed beforehand from extraction.py by entry.py in a built plugin
+    from ...shared.extraction import ExtractionCache
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
+if TYPE_CHECKING or 'TimezoneCache' not in globals():
+    # Executed beforehand from timezones.py by entry.py in a built plugin
+    from ...shared.timezones import TimezoneCache
 
 logger = logging.getLogger('plugin.wazo-yealink')
 
@@ -42,13 +68,30 @@ class BaseYealinkHTTPDeviceInfoExtractor:
         re.compile(r'(VP530P?|W52P)\s+([\d.]+)\s+([\da-fA-F:]{17})$'),
         re.compile(r'[yY]ealink-(\w+)\s+([\d.]+)\s+([\d.]+)$'),
     ]
+    # The patterns above merged into a single alternation, tried in the same
+    # order; every alternative captures (model, version, mac)
+    _UA_REGEX = re.compile(
+        '|'.join(f'(?:{ua_regex.pattern})' for ua_regex in _UA_REGEX_LIST)
+    )
+    # Every UA matched by _UA_REGEX starts with one of these
+    _UA_PREFIXES = (b'Yealink', b'yealink', b'VP530', b'W52P')
+
+    def __init__(self) -> None:
+        self._extraction_cache = ExtractionCache()
 
     def extract(self, request: Request, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
 
     def _do_extract(self, request: Request):
+        return self._extraction_cache.get_or_extract(
+            request, self._extract_from_request
+        )
+
+    def _extract_from_request(self, request: Request):
         ua = request.getHeader(b'User-Agent')
         if ua:
+            if not ua.startswith(self._UA_PREFIXES):
+                return None
             return self._extract_from_ua(ua.decode('ascii'))
         else:
             return self._extract_from_path(request)
@@ -80,20 +123,21 @@ class BaseYealinkHTTPDeviceInfoExtractor:
         #   "VP530P 23.70.0.40 00:15:65:31:4b:c0"
         #   "VP530 23.70.0.41 00:15:65:3d:58:e3"
 
-        for UA_REGEX in self._UA_REGEX_LIST:
-            m = UA_REGEX.match(ua)
-            if m:
-                model, version, mac = m.groups()
-                device_info = {
-                    'vendor': 'Yealink',
-                    'model': model,
-                    'version': version,
-                }
-                try:
-                    device_info['mac'] = norm_mac(mac)
-                except ValueError as e:
-                    logger.warning('Could not normalize MAC address "%s": %s', mac, e)
-                return device_info
+        m = self._UA_REGEX.match(ua)
+        if m and m.lastindex:
+            # lastindex is the last group of the alternative that matched
+            i = m.lastindex
+            model, version, mac = m.group(i - 2, i - 1, i)
+            device_info = {
+                'vendor': 'Yealink',
+                'model': model,
+                'version': version,
+            }
+            try:
+                device_info['mac'] = norm_mac(mac)
+            except ValueError as e:
+                logger.warning('Could not normalize MAC address "%s": %s', mac, e)
+            return device_info
         return None
 
     def _extract_from_path(self, request: Request) -> dict[str, str] | None:
@@ -119,6 +163,11 @@ class BaseYealinkPgAssociator(BasePgAssociator):
     def _model_versions_from_info(self, model_info: dict) -> dict:
         return {model: info['version'] for model, info in model_info.items()}
 
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models = dict(self._model_versions)
+        return {'Yealink': VendorSupport(models, DeviceSupport.PROBABLE)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -308,6 +357,132 @@ class BaseYealinkFunckeyPrefixIterator:
                 yield f'expansion_module.{expmod_no}.key.{expmodkey_no}'
 
 
+class TooManyRequestsResource(Resource):
+    isLeaf = True
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__()
+        self._retry_after = retry_after
+
+    def render(self, request: Request) -> bytes:
+        request.setResponseCode(429)
+        request.setHeader(b'Retry-After', str(self._retry_after).encode('ascii'))
+        request.setHeader(b'Content-Type', b'text/plain; charset=ascii')
+        return b'Too many requests\n'
+
+
+class RateLimitedHTTPService(Resource):
+    """Wrapper of an HTTP service rate limiting each (source IP, path) pair.
+
+    Every pair has a token bucket holding up to `burst` tokens, refilled at
+    `rate` tokens per second. A request with no token left is answered with a
+    429 and a Retry-After header instead of going through the wrapped service.
+    """
+
+    _MAX_BUCKETS = 4096
+
+    def __init__(
+        self,
+        service: Resource,
+        rate: float = 1.0,
+        burst: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._service = service
+        super().__init__()
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._buckets: OrderedDict[Any, tuple[float, float]] = OrderedDict()
+        self.accepted = 0
+        self.rejected = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # e.g. path_preprocess
+        return getattr(self._service, name)
+
+    def _limit(self, request: Request) -> Resource | None:
+        key = (request.getClientAddress().host, request.path)
+        now = self._clock()
+        tokens, last = self._buckets.pop(key, (self._burst, now))
+        tokens = min(self._burst, tokens + (now - last) * self._rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            resource = None
+            self.accepted += 1
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = max(1, math.ceil((1 - tokens) / self._rate))
+            resource = TooManyRequestsResource(retry_after)
+            self.rejected += 1
+            logger.debug('Rate limiting %s requests to %s', key[0], key[1])
+        if len(self._buckets) > self._MAX_BUCKETS:
+            self._buckets.popitem(last=False)
+        return resource
+
+    def getChildWithDefault(self, path: bytes, request: Request) -> Resource:
+        resource = self._limit(request)
+        if resource is None:
+            return self._service.getChildWithDefault(path, request)
+        return resource
+
+    def render(self, request: Request) -> bytes:
+        resource = self._limit(request)
+        if resource is None:
+            return self._service.render(request)
+        return resource.render(request)
+
+
+_TIMEZONE_CACHE = TimezoneCache()
+
+
+def _config_signature(raw_config: dict[str, Any], keys: tuple[str, ...]) -> tuple:
+    return tuple((key in raw_config, repr(raw_config.get(key))) for key in keys)
+
+
+class SharedConfigCache:
+    """Compute once what only depends on settings shared by many devices.
+
+    func(device, raw_config) must only add values to raw_config, computed from
+    the device model and from the values of keys, the only keys of the raw
+    config it is given. The values it adds are remembered by model and by the
+    values of keys, and func is only called again for devices differing on one
+    of them. Each device gets its own deep copy of the values.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[dict[str, Any], dict[str, Any]], None],
+        keys: tuple[str, ...],
+    ) -> None:
+        self._func = func
+        self._keys = keys
+        self._updates: dict[tuple, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def apply(self, device: dict[str, Any], raw_config: dict[str, Any]) -> None:
+        signature = (device.get('model'), _config_signature(raw_config, self._keys))
+        updates = self._updates.get(signature)
+        if updates is None:
+            self.misses += 1
+            shared_config = {
+                key: copy.deepcopy(raw_config[key])
+                for key in self._keys
+                if key in raw_config
+            }
+            self._func(device, shared_config)
+            updates = {
+                key: value
+                for key, value in shared_config.items()
+                if key not in self._keys
+            }
+            self._updates[signature] = updates
+        else:
+            self.hits += 1
+        raw_config.update(copy.deepcopy(updates))
+
+
 class BaseYealinkPlugin(StandardPlugin):
     _ENCODING = 'UTF-8'
     _LOCALE = {
@@ -362,17 +537,39 @@ class BaseYealinkPlugin(StandardPlugin):
         'W52P': 5,
     }
     _SENSITIVE_FILENAME_REGEX = re.compile(r'^[0-9a-f]{12}\.cfg')
+    _DEVICE_FILENAME_REGEX = re.compile(rb'[0-9a-f]{10}([0-9a-f]{2})\.cfg')
+    # The raw config keys read by _add_shared_config
+    _SHARED_CONFIG_KEYS = (
+        'locale',
+        'timezone',
+        'sip_transport',
+        'http_base_url',
+        'ip',
+        'http_port',
+    )
 
     def __init__(self, app, plugin_dir, gen_cfg, spec_cfg):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
 
         self.services = fetchfw_helper.services()
-        self.http_service = HTTPNoListingFileService(self._tftpboot_dir)
+        self._device_file_index = DeviceFileIndex(
+            self._tftpboot_dir,
+            b'/',
+            self._DEVICE_FILENAME_REGEX,
+            sharded=spec_cfg.get('sharded_device_files') is True,
+        )
+        self.http_service = RateLimitedHTTPService(
+            DeviceFileHTTPService(
+                HTTPNoListingFileService(self._tftpboot_dir),
+                self._device_file_index,
+            )
+        )
 
     http_dev_info_extractor = BaseYealinkHTTPDeviceInfoExtractor()
 
@@ -440,11 +637,11 @@ class BaseYealinkPlugin(StandardPlugin):
     def _add_timezone(self, raw_config):
         if 'timezone' in raw_config:
             try:
-                tzinfo = tzinform.get_timezone_info(raw_config['timezone'])
+                raw_config['XX_timezone'] = _TIMEZONE_CACHE.format(
+                    raw_config['timezone'], self._format_tz_info
+                )
             except tzinform.TimezoneNotFoundError as e:
                 logger.warning('Unknown timezone: %s', e)
-            else:
-                raw_config['XX_timezone'] = self._format_tz_info(tzinfo)
 
     def _add_sip_transport(self, raw_config):
         raw_config['XX_sip_transport'] = self._SIP_TRANSPORT.get(
@@ -510,33 +707,73 @@ class BaseYealinkPlugin(StandardPlugin):
         if 'mac' not in device:
             raise Exception('MAC address needed for device configuration')
 
+    def _add_shared_config(self, device, raw_config):
+        # Only what depends on the device model and on settings shared by
+        # many devices, see configure_many
+        self._add_country_and_lang(raw_config)
+        self._add_timezone(raw_config)
+        self._add_sip_transport(raw_config)
+        self._add_server_url(raw_config)
+        self._add_firmware_url(device, raw_config)
+
     def configure(self, device, raw_config):
+        self._configure(device, raw_config, self._add_shared_config)
+
+    def configure_many(self, devices_raw_configs):
+        """Configure each (device, raw_config) of devices_raw_configs.
+
+        This is like calling configure for each of them, except that what only
+        depends on the device model and on settings shared by many devices is
+        computed once per distinct model and settings.
+
+        Return the list of (device, exception) of the devices that could not
+        be configured.
+        """
+        shared_config_cache = SharedConfigCache(
+            self._add_shared_config, self._SHARED_CONFIG_KEYS
+        )
+        written, skipped = self._config_writer.written, self._config_writer.skipped
+        failures = []
+        for device, raw_config in devices_raw_configs:
+            try:
+                self._configure(device, raw_config, shared_config_cache.apply)
+            except Exception as e:
+                failures.append((device, e))
+        logger.info(
+            'Configured devices: %d files written, %d unchanged, %d failures',
+            self._config_writer.written - written,
+            self._config_writer.skipped - skipped,
+            len(failures),
+        )
+        return failures
+
+    def _configure(self, device, raw_config, add_shared_config):
         self._check_config(raw_config)
         self._check_device(device)
         filename = self._dev_specific_filename(device)
         tpl = self._tpl_helper.get_dev_template(filename, device)
 
         self._add_fkeys(device, raw_config)
-        self._add_country_and_lang(raw_config)
-        self._add_timezone(raw_config)
-        self._add_sip_transport(raw_config)
+        add_shared_config(device, raw_config)
+        self._add_xivo_phonebook_url(raw_config)
         self._update_sip_lines(raw_config)
         self._add_xx_sip_lines(device, raw_config)
-        self._add_xivo_phonebook_url(raw_config)
-        self._add_server_url(raw_config)
-        self._add_firmware_url(device, raw_config)
         raw_config['XX_options'] = device.get('options', {})
 
-        path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        path = self._device_file_index.new_path(filename)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
+        self._device_file_index.add(filename)
 
     def deconfigure(self, device):
-        path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))
+        filename = self._dev_specific_filename(device)
+        path = self._device_file_index.path(filename)
         try:
             os.remove(path)
         except OSError as e:
             # ignore
             logger.info('error while removing file: %s', e)
+        else:
+            self._device_file_index.discard(filename)
 
     def synchronize(self, device, raw_config):
         return synchronize.standard_sip_synchronize(device)
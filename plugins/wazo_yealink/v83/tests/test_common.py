@@ -190,11 +190,12 @@ class TestPlugin:
             'http_base_url': 'http://localhost:8667',
         }
         v83_plugin._tpl_helper.get_dev_template.return_value = 'template'
+        v83_plugin._config_writer = MagicMock()
         v83_plugin.configure(device, raw_config)
         v83_plugin._tpl_helper.get_dev_template.assert_called_with(
             '805ec0d57d72.cfg', device
         )
-        v83_plugin._tpl_helper.dump.assert_called_with(
+        v83_plugin._config_writer.dump.assert_called_with(
             'template', raw_config, 'test_dir/var/tftpboot/805ec0d57d72.cfg', 'UTF-8'
         )
 
@@ -187,11 +187,12 @@ class TestPlugin:
             'http_base_url': 'http://localhost:8667',
         }
         v84_plugin._tpl_helper.get_dev_template.return_value = 'template'
+        v84_plugin._config_writer = MagicMock()
         v84_plugin.configure(device, raw_config)
         v84_plugin._tpl_helper.get_dev_template.assert_called_with(
             '805ec0d57d72.cfg', device
         )
-        v84_plugin._tpl_helper.dump.assert_called_with(
+        v84_plugin._config_writer.dump.assert_called_with(
             'template', raw_config, 'test_dir/var/tftpboot/805ec0d57d72.cfg', 'UTF-8'
         )
 
@@ -4,14 +4,21 @@
 from __future__ import annotations
 
 from textwrap import dedent
-from unittest.mock import MagicMock, patch, sentinel
+from typing import Any
+from unittest.mock import ANY, MagicMock, patch, sentinel
 
 import pytest
 from wazo_provd.devices.config import RawConfigError
 from wazo_provd.devices.pgasso import DeviceSupport
 from wazo_provd.tzinform import TimezoneNotFoundError
 
-from ..common import BaseYealinkHTTPDeviceInfoExtractor, BaseYealinkPgAssociator
+from ....shared.support_table import support_level
+from ..common import (
+    BaseYealinkHTTPDeviceInfoExtractor,
+    BaseYealinkPgAssociator,
+    RateLimitedHTTPService,
+    SharedConfigCache,
+)
 
 TEST_LINES = """\
 linekey.1.type = 13
@@ -69,6 +76,21 @@ class TestInfoExtraction:
     def test_http_ua_extractor_when_no_info(self):
         assert self.http_info_extractor._extract_from_ua('') is None
 
+    def test_http_ua_extractor_when_not_first_pattern(self):
+        ua_info = {
+            b'Yealink W90DM 130.85.0.15 80:5e:c0:d9:c7:44': ('W90DM', '130.85.0.15'),
+            b'W60B 77.81.0.35 80:5e:c0:09:ab:dc': ('W60B', '77.81.0.35'),
+        }
+
+        for ua, (model, version) in ua_info.items():
+            result = self.http_info_extractor._do_extract(self._mock_request(ua=ua))
+            assert result['model'] == model
+            assert result['version'] == version
+
+    def test_http_ua_extractor_when_other_vendor(self):
+        request = self._mock_request(ua=b'Fanvil X4 2.10.2.6887 0c383e07e16c')
+        assert self.http_info_extractor._do_extract(request) is None
+
     @patch('plugins.wazo_yealink.v86.common.defer')
     def test_extract(self, mocked_defer):
         self.http_info_extractor.extract(
@@ -99,6 +121,22 @@ class TestInfoExtraction:
                 raise Exception(path, mac)
             assert {'vendor': 'Yealink', 'mac': mac}.items() <= result.items()
 
+    def test_http_extractor_caches_results(self):
+        extractor = BaseYealinkHTTPDeviceInfoExtractor()
+        ua = b'Yealink SIP-T31G 124.85.257.55 80:5e:c0:d5:7d:72'
+        request = self._mock_request(ua=ua, path=b'/805ec0d57d72.cfg')
+        other_request = self._mock_request(ua=b'Fanvil X4', path=b'/x.cfg')
+
+        first = extractor._do_extract(request)
+        first['model'] = 'modified'
+        second = extractor._do_extract(request)
+        assert extractor._do_extract(other_request) is None
+        assert extractor._do_extract(other_request) is None
+
+        assert second['model'] == 'T31G'
+        assert extractor._extraction_cache.hits == 2
+        assert extractor._extraction_cache.misses == 2
+
     @patch('plugins.wazo_yealink.v86.common.logger')
     def test_invalid_mac(self, mocked_logger):
         self.http_info_extractor._extract_from_ua(
@@ -150,6 +188,116 @@ class TestPluginAssociation:
         plugin_associator = BaseYealinkPgAssociator(v86_entry.MODEL_INFO)
         assert plugin_associator._do_associate('', '', '') == DeviceSupport.IMPROBABLE
 
+    def test_support_table_matches_association(self, v86_entry):
+        plugin_associator = BaseYealinkPgAssociator(v86_entry.MODEL_INFO)
+        support_table = plugin_associator.support_table()
+
+        models = [*v86_entry.MODEL_INFO, 'T99X', '', None]
+        versions = [info['version'] for info in v86_entry.MODEL_INFO.values()]
+        for vendor in ['Yealink', 'Snom', '']:
+            for model in models:
+                for version in [*versions, '0.0.0', '', None]:
+                    assert support_level(
+                        support_table, vendor, model, version
+                    ) == plugin_associator._do_associate(vendor, model, version)
+
+
+class TestRateLimitedHTTPService:
+    @staticmethod
+    def _mock_request(host='10.0.0.1', path=b'/y000000000000.cfg'):
+        request = MagicMock()
+        request.getClientAddress.return_value.host = host
+        request.path = path
+        return request
+
+    def test_rate_limit(self):
+        now = [0.0]
+        wrapped_service = MagicMock()
+        service = RateLimitedHTTPService(
+            wrapped_service, rate=0.5, burst=2, clock=lambda: now[0]
+        )
+        request = self._mock_request()
+
+        for _ in range(2):
+            service.getChildWithDefault(b'y000000000000.cfg', request)
+        assert wrapped_service.getChildWithDefault.call_count == 2
+        resource = service.getChildWithDefault(b'y000000000000.cfg', request)
+        assert wrapped_service.getChildWithDefault.call_count == 2
+        assert resource.render(request) == b'Too many requests\n'
+        request.setResponseCode.assert_called_once_with(429)
+        request.setHeader.assert_any_call(b'Retry-After', b'2')
+
+        service.render(self._mock_request(host='10.0.0.2'))
+        service.render(self._mock_request(path=b'/805ec0d57d72.cfg'))
+        assert wrapped_service.render.call_count == 2
+
+        now[0] = 2.0
+        service.getChildWithDefault(b'y000000000000.cfg', request)
+        assert wrapped_service.getChildWithDefault.call_count == 3
+        assert service.accepted == 5
+        assert service.rejected == 1
+
+    def test_attributes_of_wrapped_service(self):
+        wrapped_service = MagicMock()
+        service = RateLimitedHTTPService(wrapped_service)
+        assert service.path_preprocess is wrapped_service.path_preprocess
+
+
+class TestSharedConfigCache:
+    @staticmethod
+    def _add_lang(device, raw_config):
+        raw_config['XX_lang'] = f"{device['model']}-{raw_config.get('locale')}"
+
+    def test_apply(self):
+        func = MagicMock(side_effect=self._add_lang)
+        cache = SharedConfigCache(func, ('locale',))
+        raw_configs: list[dict[str, Any]] = [
+            {'locale': 'fr_FR', 'sip_lines': {'1': {}}},
+            {'locale': 'fr_FR', 'sip_lines': {'2': {}}},
+            {'locale': 'en_US', 'sip_lines': {'1': {}}},
+            {'sip_lines': {}},
+            {'sip_lines': {'3': {}}},
+        ]
+
+        for raw_config in raw_configs:
+            cache.apply({'model': 'T31G'}, raw_config)
+        cache.apply({'model': 'T57W'}, raw_configs[1])
+
+        assert [raw_config.get('XX_lang') for raw_config in raw_configs] == [
+            'T31G-fr_FR',
+            'T57W-fr_FR',
+            'T31G-en_US',
+            'T31G-None',
+            'T31G-None',
+        ]
+        assert (cache.hits, cache.misses) == (2, 4)
+        assert func.call_count == 4
+
+    def test_apply_only_gives_keys(self):
+        def add_options(device, raw_config):
+            raw_config['XX_options'] = {'keys': sorted(raw_config)}
+
+        cache = SharedConfigCache(add_options, ('locale', 'timezone'))
+        raw_configs: list[dict[str, Any]] = [
+            {'locale': 'fr_FR', 'sip_lines': {'1': {}}} for _ in range(2)
+        ]
+
+        for raw_config in raw_configs:
+            cache.apply({'model': 'T31G'}, raw_config)
+        raw_configs[0]['XX_options']['keys'].append('sip_lines')
+
+        assert raw_configs[1]['XX_options'] == {'keys': ['locale']}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_apply_error_not_cached(self):
+        func = MagicMock(side_effect=KeyError)
+        cache = SharedConfigCache(func, ('locale',))
+
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                cache.apply({'model': 'T31G'}, {'locale': 'fr_FR'})
+        assert func.call_count == 2
+
 
 class TestPlugin:
     @patch('plugins.wazo_yealink.v86.common.FetchfwPluginHelper')
@@ -178,14 +326,58 @@ class TestPlugin:
             'http_base_url': 'http://localhost:8667',
         }
         v86_plugin._tpl_helper.get_dev_template.return_value = 'template'
+        v86_plugin._config_writer = MagicMock()
         v86_plugin.configure(device, raw_config)
         v86_plugin._tpl_helper.get_dev_template.assert_called_with(
             '805ec0d57d72.cfg', device
         )
-        v86_plugin._tpl_helper.dump.assert_called_with(
+        v86_plugin._config_writer.dump.assert_called_with(
             'template', raw_config, 'test_dir/var/tftpboot/805ec0d57d72.cfg', 'UTF-8'
         )
 
+    def test_configure_many(self, v86_plugin):
+        devices = [
+            {'model': 'T31G', 'mac': f'80:5e:c0:d5:7d:7{i}'} for i in range(3)
+        ] + [{'model': 'T31G'}]
+        raw_configs: list[dict[str, Any]] = [
+            {
+                'http_port': '80',
+                'locale': 'fr_FR',
+                'funckeys': {},
+                'sip_proxy_ip': '1.1.1.1',
+                'sip_lines': {'1': {'number': f'100{i}'}},
+                'http_base_url': 'http://localhost:8667',
+            }
+            for i in range(4)
+        ]
+        v86_plugin._tpl_helper.get_dev_template.return_value = 'template'
+        v86_plugin._config_writer = MagicMock(written=5, skipped=0)
+
+        def dump(*args):
+            v86_plugin._config_writer.written += 1
+
+        v86_plugin._config_writer.dump.side_effect = dump
+
+        with patch.object(
+            v86_plugin,
+            '_add_country_and_lang',
+            wraps=v86_plugin._add_country_and_lang,
+        ) as add_country_and_lang, patch(
+            'plugins.wazo_yealink.v86.common.logger'
+        ) as logger:
+            failures = v86_plugin.configure_many(zip(devices, raw_configs))
+
+        assert failures == [(devices[3], ANY)]
+        logger.info.assert_called_with(ANY, 3, 0, 1)
+        add_country_and_lang.assert_called_once()
+        assert v86_plugin._config_writer.dump.call_count == 3
+        for raw_config in raw_configs[:3]:
+            assert raw_config['XX_lang'] == raw_configs[0]['XX_lang']
+            assert raw_config['XX_server_url'] == 'http://localhost:8667'
+        assert [
+            raw_config['XX_sip_lines']['1']['number'] for raw_config in raw_configs[:3]
+        ] == ['1000', '1001', '1002']
+
     @patch('os.remove')
     def test_deconfigure(self, mocked_remove, v86_plugin):
         v86_plugin.deconfigure({'mac': '80:5e:c0:d5:7d:72'})
@@ -13,6 +13,7 @@ import urllib.error
 import urllib.parse
 import urllib.request
 from operator import itemgetter
+from typing import TYPE_CHECKING
 
 try:
     from wazo_provd.devices.config import RawConfigError
@@ -41,11 +42,20 @@ except ImportError:
 
 from twisted.internet import defer, threads
 
+if TYPE_CHECKING or 'ConfigFileWriter' not in globals():
+    # Executed beforehand from config_files.py by entry.py in a built plugin
+    from ...shared.config_files import ConfigFileWriter
+
+if TYPE_CHECKING or 'VendorSupport' not in globals():
+    # Executed beforehand from support_table.py by entry.py in a built plugin
+    from ...shared.support_table import VendorSupport
+
 logger = logging.getLogger('plugin.wazo-zenitel')
 
 
 class BaseZenitelTFTPDeviceInfoExtractor:
-    _FILENAME_REGEX = re.compile(r'^ipst_config((?:_\w\w){6})?\.cfg$')
+    _FILENAME_PREFIX = b'ipst_config'
+    _FILENAME_REGEX = re.compile(rb'^ipst_config((?:_\w\w){6})?\.cfg$')
 
     def extract(self, request: TFTPRequest, request_type: RequestType):
         return defer.succeed(self._do_extract(request))
@@ -54,13 +64,15 @@ class BaseZenitelTFTPDeviceInfoExtractor:
         # filename:
         #   "ipst_config.cfg"
         #   "ipst_config_01_02_03_04_05_ab.cfg"
-        filename = request['packet']['filename'].decode('ascii')
+        filename: bytes = request['packet']['filename']
+        if not filename.startswith(self._FILENAME_PREFIX):
+            return None
         m = self._FILENAME_REGEX.match(filename)
         if m:
             dev_info = {'vendor': 'Zenitel', 'model': 'IP station'}
             raw_mac = m.group(1)
             if raw_mac:
-                raw_mac = raw_mac.replace('_', '')
+                raw_mac = raw_mac.replace(b'_', b'').decode('ascii')
                 try:
                     dev_info['mac'] = norm_mac(raw_mac)
                 except ValueError as e:
@@ -70,6 +82,11 @@ class BaseZenitelTFTPDeviceInfoExtractor:
 
 
 class BaseZenitelPgAssociator(BasePgAssociator):
+    def support_table(self) -> dict[str, VendorSupport]:
+        """Return the support table equivalent to _do_associate, see support_table.py."""
+        models: dict[str, str | None] = {'IP station': None}
+        return {'Zenitel': VendorSupport(models, DeviceSupport.UNKNOWN)}
+
     def _do_associate(
         self, vendor: str, model: str | None, version: str | None
     ) -> DeviceSupport:
@@ -139,6 +156,7 @@ class BaseZenitelPlugin(StandardPlugin):
         super().__init__(app, plugin_dir, gen_cfg, spec_cfg)
 
         self._tpl_helper = TemplatePluginHelper(plugin_dir)
+        self._config_writer = ConfigFileWriter(self._tpl_helper)
 
         downloaders = FetchfwPluginHelper.new_downloaders(gen_cfg.get('proxies'))
         fetchfw_helper = FetchfwPluginHelper(plugin_dir, downloaders)
@@ -209,7 +227,7 @@ class BaseZenitelPlugin(StandardPlugin):
         self._add_fkeys(raw_config)
 
         path = os.path.join(self._tftpboot_dir, filename)
-        self._tpl_helper.dump(tpl, raw_config, path, self._ENCODING)
+        self._config_writer.dump(tpl, raw_config, path, self._ENCODING)
 
     def deconfigure(self, device):
         path = os.path.join(self._tftpboot_dir, self._dev_specific_filename(device))